@@ -2,18 +2,22 @@
 """
 AI Job Applier - Indeed + LinkedIn with separate cookies
 """
-import json, time, random, logging, base64, hashlib, re
+import json, time, random, logging, base64, hashlib, re, sys
 from pathlib import Path
 from datetime import datetime
 from playwright.sync_api import sync_playwright
 import requests
 from cloudflare_handler import solve_cloudflare
 
-QUEUE_DIR = Path('/root/job_bot/queue')
-PENDING = QUEUE_DIR / 'pending.json'
-APPLIED = QUEUE_DIR / 'applied.json'
-FAILED = QUEUE_DIR / 'failed.json'
-MANUAL = QUEUE_DIR / 'manual.json'
+sys.path.insert(0, '/root/job_bot')
+import queue_store
+from artifact_index import get_artifact_index
+
+# Queue names in the shared queue store
+PENDING = 'pending'
+APPLIED = 'applied'
+FAILED = 'failed'
+MANUAL = 'manual'
 SCREENSHOTS = Path('/root/job_bot/screenshots')
 OUTPUT_DIR = Path('/root/output')
 INDEED_COOKIES = Path('/root/job_bot/agent/cookies.json')
@@ -48,29 +52,17 @@ CONTACT = {
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
 log = logging.getLogger(__name__)
 
-def load_queue(f): 
-    try: return json.loads(f.read_text()) if f.exists() else []
-    except: return []
-
-def save_queue(f, q): 
-    f.parent.mkdir(parents=True, exist_ok=True)
-    f.write_text(json.dumps(q, indent=2))
+def load_queue(name): 
+    return queue_store.load_queue(name)
 
 def move_job(job, src, dst, status, error=None):
-    q = [j for j in load_queue(src) if j.get('id') != job.get('id')]
-    save_queue(src, q)
-    job['status'] = status
-    job['updated_at'] = datetime.now().isoformat()
-    if error: job['error'] = str(error)[:500]
-    dq = load_queue(dst)
-    dq.append(job)
-    save_queue(dst, dq)
+    updates = {'status': status, 'updated_at': datetime.now().isoformat()}
+    if error: updates['error'] = str(error)[:500]
+    queue_store.move_job(job, src, dst, **updates)
 
 def find_resume(job):
-    num = job.get('application_number')
-    for f in OUTPUT_DIR.glob(f"*_{num}_Resume.pdf"):
-        return f
-    return None
+    path = get_artifact_index().path(job.get('application_number'), 'resume')
+    return Path(path) if path else None
 
 def img_hash(data):
     return hashlib.md5(data).hexdigest()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Gemini Engine - asyncio client for scoring requests
+===================================================
+One event loop thread owns one GenerativeModel, so every request reuses the
+same async gRPC channel instead of 20 threads blocking in generate_content.
+Callers in ordinary threads submit coroutines with call() and get a
+concurrent.futures.Future back (usable with wait()/as_completed()).
+
+Concurrency is adaptive (AIMD): it starts at GEMINI_CONCURRENCY, grows by
+one after a full window of fast successes, is halved on a 429 (and all
+requests pause for the backoff) and shrinks by one when latency exceeds
+GEMINI_LATENCY_TARGET. Transient failures (429, 5xx, timeouts) are retried
+with full-jitter exponential backoff inside a per-request time budget; when
+that runs out the caller gets ScoringUnavailable - never a fake verdict.
+
+Every response's usage metadata goes into a token/cost ledger that the
+hunter reads (and resets) once per hunt. Cached prompt tokens (context
+caching) are billed at GEMINI_PRICE_CACHED_PER_M. With `model_ttl` the
+model is rebuilt by the factory before its context cache expires.
+
+Settings (env):
+    GEMINI_CONCURRENCY        Starting concurrent requests (default 8)
+    GEMINI_MAX_CONCURRENCY    Upper bound for the adaptive limit (default 20)
+    GEMINI_LATENCY_TARGET     Seconds; slower responses shrink the limit (default 30)
+    GEMINI_TIMEOUT            Seconds per attempt (default 90)
+    GEMINI_RETRIES            Retries after the first attempt (default 4)
+    GEMINI_RETRY_BUDGET       Seconds per request including retries (default 300)
+    GEMINI_PRICE_IN_PER_M     USD per 1M input tokens (default 0.30)
+    GEMINI_PRICE_OUT_PER_M    USD per 1M output + thinking tokens (default 2.50)
+    GEMINI_PRICE_CACHED_PER_M USD per 1M cached input tokens (default 0.03)
+"""
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+GEMINI_CONCURRENCY = int(os.getenv('GEMINI_CONCURRENCY', '8'))
+GEMINI_MAX_CONCURRENCY = int(os.getenv('GEMINI_MAX_CONCURRENCY', '20'))
+GEMINI_LATENCY_TARGET = float(os.getenv('GEMINI_LATENCY_TARGET', '30'))
+GEMINI_TIMEOUT = float(os.getenv('GEMINI_TIMEOUT', '90'))
+GEMINI_RETRIES = int(os.getenv('GEMINI_RETRIES', '4'))
+GEMINI_RETRY_BUDGET = float(os.getenv('GEMINI_RETRY_BUDGET', '300'))
+GEMINI_BACKOFF = 2.0      # seconds, base of the jittered exponential backoff
+GEMINI_BACKOFF_MAX = 60.0
+GEMINI_PRICE_IN_PER_M = float(os.getenv('GEMINI_PRICE_IN_PER_M', '0.30'))
+GEMINI_PRICE_OUT_PER_M = float(os.getenv('GEMINI_PRICE_OUT_PER_M', '2.50'))
+GEMINI_PRICE_CACHED_PER_M = float(os.getenv('GEMINI_PRICE_CACHED_PER_M', '0.03'))
+
+# google.api_core exception class names, matched by name so this module
+# does not import api_core directly
+THROTTLED_ERRORS = {'ResourceExhausted', 'TooManyRequests'}
+TRANSIENT_ERRORS = THROTTLED_ERRORS | {
+    'ServiceUnavailable', 'InternalServerError', 'DeadlineExceeded',
+    'GatewayTimeout', 'BadGateway', 'Aborted', 'Unknown',
+}
+# Setup problems (bad or missing API key, no access to the model): no job
+# will score until someone fixes the config
+CONFIG_ERRORS = {'Unauthenticated', 'PermissionDenied', 'DefaultCredentialsError'}
+
+
+class ScoringUnavailable(Exception):
+    """Gemini did not answer. `transient` is False for errors retrying won't fix,
+    `config` is True when the setup (API key, permissions) is at fault, not the job."""
+
+    def __init__(self, message: str, transient: bool = True, config: bool = False):
+        super().__init__(message)
+        self.transient = transient
+        self.config = config
+
+
+def is_throttled(error: Exception) -> bool:
+    return type(error).__name__ in THROTTLED_ERRORS or getattr(error, 'code', None) == 429
+
+
+def is_transient(error: Exception) -> bool:
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    return (type(error).__name__ in TRANSIENT_ERRORS or is_throttled(error)
+            or getattr(error, 'code', None) in (500, 502, 503, 504))
+
+
+def is_config_error(error: Exception) -> bool:
+    return (type(error).__name__ in CONFIG_ERRORS or getattr(error, 'code', None) in (401, 403)
+            or 'API key' in str(error) or 'API_KEY' in str(error))
+
+
+# ============================================
+# USAGE LEDGER
+# ============================================
+
+class UsageLedger:
+    """Thread-safe request/token/cost counters."""
+
+    FIELDS = ('requests', 'retries', 'throttled', 'failures',
+              'prompt_tokens', 'output_tokens', 'cached_tokens')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(self.FIELDS, 0)
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                self._counts[name] += value or 0
+
+    def record_usage(self, response):
+        usage = getattr(response, 'usage_metadata', None)
+        if usage is None:
+            return
+        self.add(
+            prompt_tokens=getattr(usage, 'prompt_token_count', 0),
+            output_tokens=(getattr(usage, 'candidates_token_count', 0) or 0)
+            + (getattr(usage, 'thoughts_token_count', 0) or 0),
+            cached_tokens=getattr(usage, 'cached_content_token_count', 0),
+        )
+
+    def snapshot(self, reset: bool = False) -> Dict[str, float]:
+        with self._lock:
+            counts = dict(self._counts)
+            if reset:
+                self._counts = dict.fromkeys(self.FIELDS, 0)
+        uncached = counts['prompt_tokens'] - counts['cached_tokens']
+        counts['cost'] = round(uncached / 1e6 * GEMINI_PRICE_IN_PER_M
+                               + counts['cached_tokens'] / 1e6 * GEMINI_PRICE_CACHED_PER_M
+                               + counts['output_tokens'] / 1e6 * GEMINI_PRICE_OUT_PER_M, 4)
+        return counts
+
+
+# ============================================
+# ADAPTIVE CONCURRENCY
+# ============================================
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit driven by 429s and latency (event-loop only)."""
+
+    def __init__(self, initial: int = GEMINI_CONCURRENCY, maximum: int = GEMINI_MAX_CONCURRENCY,
+                 latency_target: float = GEMINI_LATENCY_TARGET):
+        self.maximum = max(1, maximum)
+        self.limit = min(max(1, initial), self.maximum)
+        self.latency_target = latency_target
+        self.in_flight = 0
+        self._fast = 0
+        self._paused_until = 0.0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._cond:
+            while self.in_flight >= self.limit:
+                await self._cond.wait()
+            self.in_flight += 1
+        delay = self._paused_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def release(self, latency: Optional[float] = None, throttled: bool = False,
+                      pause: float = 0.0):
+        async with self._cond:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(1, self.limit // 2)
+                self._fast = 0
+                self._paused_until = max(self._paused_until, time.monotonic() + pause)
+                logger.warning(f"Gemini 429: concurrency -> {self.limit}, pausing {pause:.0f}s")
+            elif latency is not None and latency > self.latency_target:
+                self.limit = max(1, self.limit - 1)
+                self._fast = 0
+            elif latency is not None:
+                self._fast += 1
+                if self._fast >= self.limit and self.limit < self.maximum:
+                    self.limit += 1
+                    self._fast = 0
+            self._cond.notify_all()
+
+
+# ============================================
+# ENGINE
+# ============================================
+
+class GeminiEngine:
+    """Shared model + event loop thread + limiter + ledger."""
+
+    def __init__(self, model_factory, retries: int = GEMINI_RETRIES,
+                 timeout: float = GEMINI_TIMEOUT, budget: float = GEMINI_RETRY_BUDGET,
+                 model_ttl: Optional[float] = None):
+        self._model_factory = model_factory
+        self._model = None
+        self._model_lock = asyncio.Lock()  # Only used on the engine loop
+        self._model_expires = 0.0
+        self.model_ttl = model_ttl
+        self.retries = retries
+        self.timeout = timeout
+        self.budget = budget
+        self.ledger = UsageLedger()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='gemini-engine', daemon=True)
+        self._thread.start()
+        self.limiter = self.call(self._make_limiter()).result()
+
+    @staticmethod
+    async def _make_limiter() -> AdaptiveLimiter:
+        return AdaptiveLimiter()
+
+    def call(self, coro) -> Future:
+        """Schedule a coroutine on the engine loop from any thread."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def _model_stale(self) -> bool:
+        return self._model is None or bool(self.model_ttl and time.monotonic() >= self._model_expires)
+
+    async def get_model(self):
+        """The shared model, built (or rebuilt before its TTL) in a worker thread:
+        the factory may make blocking network calls (context cache creation) that
+        would stall every request on the engine loop. The async channel is still
+        opened by the model's first generate_content_async on this loop."""
+        if self._model_stale():
+            async with self._model_lock:
+                if self._model_stale():
+                    self._model = await asyncio.to_thread(self._model_factory)
+                    self._model_expires = time.monotonic() + (self.model_ttl or 0)
+        return self._model
+
+    async def generate(self, prompt: str):
+        """generate_content with adaptive concurrency, retries and accounting.
+        Raises ScoringUnavailable when the request can't be completed."""
+        deadline = time.monotonic() + self.budget
+        for attempt in range(self.retries + 1):
+            await self.limiter.acquire()
+            start = time.monotonic()
+            try:
+                model = await self.get_model()
+                response = await asyncio.wait_for(model.generate_content_async(prompt), timeout=self.timeout)
+            except Exception as e:
+                delay = min(GEMINI_BACKOFF_MAX, GEMINI_BACKOFF * 2 ** attempt)
+                throttled = is_throttled(e)
+                await self.limiter.release(throttled=throttled, pause=delay if throttled else 0.0)
+                self.ledger.add(requests=1, throttled=int(throttled))
+                transient = is_transient(e)
+                if not transient or attempt == self.retries or time.monotonic() + delay > deadline:
+                    self.ledger.add(failures=1)
+                    raise ScoringUnavailable(f"{type(e).__name__}: {e}", transient, is_config_error(e)) from e
+                self.ledger.add(retries=1)
+                # Full jitter keeps retries from a 429 burst from landing together
+                await asyncio.sleep(random.uniform(0, delay))
+                continue
+            await self.limiter.release(latency=time.monotonic() - start)
+            self.ledger.add(requests=1)
+            self.ledger.record_usage(response)
+            return response
+        raise ScoringUnavailable("retries exhausted")
+
+    def shutdown(self):
+        if self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
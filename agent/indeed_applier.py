@@ -1,15 +1,18 @@
 #!/usr/bin/env python3
-import json, time, random, logging
+import time, random, logging, sys
 from pathlib import Path
 from datetime import datetime
 from playwright.sync_api import sync_playwright, TimeoutError
 from playwright_stealth import Stealth
 
-QUEUE_DIR = Path('/root/job_bot/queue')
-PENDING_FILE = QUEUE_DIR / 'pending.json'
-APPLIED_FILE = QUEUE_DIR / 'applied.json'
-FAILED_FILE = QUEUE_DIR / 'failed.json'
-MANUAL_FILE = QUEUE_DIR / 'manual.json'
+sys.path.insert(0, '/root/job_bot')
+import queue_store
+
+# Queue names in the shared queue store
+PENDING_FILE = 'pending'
+APPLIED_FILE = 'applied'
+FAILED_FILE = 'failed'
+MANUAL_FILE = 'manual'
 SCREENSHOTS_DIR = Path('/root/job_bot/screenshots')
 OUTPUT_DIR = Path('/root/output')
 
@@ -32,21 +35,12 @@ def human_type(page, selector, text):
         return True
     except: return False
 
-def load_queue(filepath):
-    try: return json.loads(filepath.read_text())
-    except: return []
-
-def save_queue(filepath, queue): filepath.write_text(json.dumps(queue, indent=2))
+def load_queue(name): return queue_store.load_queue(name)
 
-def move_job(job, from_file, to_file, status, error=None):
-    from_queue = [j for j in load_queue(from_file) if j.get('id') != job.get('id')]
-    save_queue(from_file, from_queue)
-    job['status'] = status
-    job['updated_at'] = datetime.now().isoformat()
-    if error: job['error'] = error
-    to_queue = load_queue(to_file)
-    to_queue.append(job)
-    save_queue(to_file, to_queue)
+def move_job(job, from_queue, to_queue, status, error=None):
+    updates = {'status': status, 'updated_at': datetime.now().isoformat()}
+    if error: updates['error'] = error
+    queue_store.move_job(job, from_queue, to_queue, **updates)
 
 def find_pdf_files(job):
     app_num = job.get('application_number')
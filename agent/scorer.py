@@ -1,11 +1,27 @@
-import google.generativeai as genai
+import asyncio
+import atexit
 import json
 import os
 import re
+import sys
+import time
 import hashlib
 import logging
+import math
+import threading
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+import pandas as pd
 from dotenv import load_dotenv
-from candidate_profile import CANDIDATE_FULL_PROFILE
+from candidate_profile import CANDIDATE_FULL_PROFILE, CANDIDATE_SCORING_PROFILE
+from gemini_engine import GeminiEngine, ScoringUnavailable
+
+# Persistent dedup index (shared with the hunter and applier)
+sys.path.insert(0, '/root/job_bot')
+from dedup_index import get_index, job_hash
+from queue_store import SQLiteStore
+from prompt_assembly import PROMPT_CACHE_TTL, PromptPrefix, get_prompt_stats, profile_digest
 
 load_dotenv()
 
@@ -18,13 +34,62 @@ logger = logging.getLogger(__name__)
 # CONFIGURATION
 # ============================================
 GEMINI_MODEL = os.getenv("GEMINI_SCORER_MODEL", "gemini-2.5-flash")
-
-# Configure Gemini with JSON response mode
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-model = genai.GenerativeModel(
-    GEMINI_MODEL,
-    generation_config={"response_mime_type": "application/json"},
-)
+# 'full' embeds CANDIDATE_FULL_PROFILE; 'digest' a token-budgeted summary (cheap tier)
+SCORER_PROFILE = os.getenv("SCORER_PROFILE", "full")
+# Explicit context cache for the static prefix (falls back to implicit caching)
+SCORER_CONTEXT_CACHE = os.getenv("SCORER_CONTEXT_CACHE", "1") != "0"
+
+
+def _make_model():
+    """Gemini model with JSON response mode and the static scorer prefix as its
+    system instruction (called by the engine; again before the cache expires).
+    genai is imported here, not at module level: its gRPC stack is the bulk of
+    this module's import time and only matters once Gemini is actually called."""
+    import google.generativeai as genai
+    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+    generation_config = {"response_mime_type": "application/json"}
+    if SCORER_CONTEXT_CACHE and SCORER_PREFIX.cacheable:
+        try:
+            from google.generativeai import caching
+            from datetime import timedelta
+            cached = caching.CachedContent.create(
+                model=GEMINI_MODEL if GEMINI_MODEL.startswith("models/") else f"models/{GEMINI_MODEL}",
+                display_name=f"scorer-{PROMPT_VERSION}",
+                system_instruction=SCORER_PREFIX.text,
+                ttl=timedelta(seconds=PROMPT_CACHE_TTL),
+            )
+            logger.info(f"Scorer prefix cached: {cached.name} (~{SCORER_PREFIX.tokens:,} tokens)")
+            return genai.GenerativeModel.from_cached_content(
+                cached_content=cached, generation_config=generation_config)
+        except Exception as e:
+            logger.warning(f"Context cache unavailable, using implicit prefix caching: {e}")
+    return genai.GenerativeModel(
+        GEMINI_MODEL,
+        system_instruction=SCORER_PREFIX.text,
+        generation_config=generation_config,
+    )
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> GeminiEngine:
+    """Process-wide async Gemini client (shared model, adaptive concurrency, ledger)."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                # Rebuild the model (and its context cache) a little before the cache TTL runs out
+                _engine = GeminiEngine(_make_model, model_ttl=PROMPT_CACHE_TTL * 0.9
+                                       if SCORER_CONTEXT_CACHE and SCORER_PREFIX.cacheable else None)
+                atexit.register(_engine.shutdown)
+    return _engine
+
+
+def gemini_usage(reset: bool = False) -> dict:
+    """Requests, retries, 429s, failures, tokens and cost since the last reset."""
+    return get_engine().ledger.snapshot(reset)
 
 # ============================================
 # PRE-LLM FILTERS (saves API calls)
@@ -68,6 +133,48 @@ MANAGER_PATTERN = re.compile(r'\bmanager\b', re.IGNORECASE)
 IT_MANAGER_OK = re.compile(r'\b(?:it|help desk|service desk|network|infrastructure)\s+manager\b', re.IGNORECASE)
 
 
+MANAGER_REASON = "Manager title without IT context"
+
+
+class PreFilterEngine:
+    """All blocklist patterns compiled into one alternation.
+
+    Each pattern is wrapped in its own named group, so one scan of the title
+    both finds a hit and tells us which rule fired (match.lastgroup). If a
+    title hits several rules, the leftmost match is reported.
+    """
+
+    def __init__(self, rules: list):
+        # rules: [(pattern, reason_prefix), ...]
+        self.rules = rules
+        self.groups = [f"r{i}" for i in range(len(rules))]
+        self.pattern = "|".join(f"(?P<{g}>{p})" for g, (p, _) in zip(self.groups, rules))
+        self.regex = re.compile(self.pattern)
+        self.reasons = {
+            g: f"{prefix}: matches '{p}'" for g, (p, prefix) in zip(self.groups, rules)
+        }
+
+    def reason(self, text: str):
+        """Reject reason for an already-lowercased title, or None."""
+        m = self.regex.search(text)
+        return self.reasons[m.lastgroup] if m else None
+
+    def reasons_for(self, texts: pd.Series) -> pd.Series:
+        """Vectorized reason() over a lowercased Series (None where nothing matched)."""
+        if texts.empty:
+            return pd.Series(index=texts.index, dtype=object)
+        hits = texts.str.extract(self.pattern, expand=True)
+        matched = hits.notna()
+        first_group = matched.idxmax(axis=1).where(matched.any(axis=1))
+        return first_group.map(self.reasons).astype(object).where(first_group.notna(), None)
+
+
+PRE_FILTER_ENGINE = PreFilterEngine(
+    [(p, "Title blocked") for p in TITLE_BLOCKLIST]
+    + [(p, "Wrong tech track") for p in TECH_BLOCKLIST]
+)
+
+
 def pre_filter_job(title: str) -> tuple:
     """Fast Python-based pre-filter. Returns (pass, reason) without API call.
 
@@ -77,67 +184,55 @@ def pre_filter_job(title: str) -> tuple:
     """
     t = title.lower().strip()
 
-    # Check title blocklist
-    for pattern in TITLE_BLOCKLIST:
-        if re.search(pattern, t):
-            return False, f"Title blocked: matches '{pattern}'"
-
-    # Check tech blocklist
-    for pattern in TECH_BLOCKLIST:
-        if re.search(pattern, t):
-            return False, f"Wrong tech track: matches '{pattern}'"
+    # Title + tech blocklists: single pass over the title
+    reason = PRE_FILTER_ENGINE.reason(t)
+    if reason:
+        return False, reason
 
     # Manager check: block unless IT-context manager
     if MANAGER_PATTERN.search(t) and not IT_MANAGER_OK.search(t):
-        return False, "Manager title without IT context"
+        return False, MANAGER_REASON
 
     return True, None
 
 
-# ============================================
-# DEDUPLICATION
-# ============================================
+def pre_filter_titles(titles: pd.Series) -> pd.Series:
+    """Vectorized pre_filter_job() over a column of titles.
 
-_seen_hashes = set()
+    Returns a Series aligned with `titles`: the reject reason, or None if the
+    title should proceed to LLM scoring.
+    """
+    t = titles.fillna('').astype(str).str.lower().str.strip()
+    reasons = PRE_FILTER_ENGINE.reasons_for(t)
+    manager_reject = t.str.contains(MANAGER_PATTERN) & ~t.str.contains(IT_MANAGER_OK)
+    return reasons.where(reasons.notna() | ~manager_reject, MANAGER_REASON)
 
 
-def job_hash(company: str, title: str) -> str:
-    """Create a normalized hash for company+title dedup."""
-    key = f"{company.lower().strip()}|{title.lower().strip()}"
-    return hashlib.md5(key.encode()).hexdigest()[:12]
+# ============================================
+# DEDUPLICATION
+# ============================================
 
+# job_hash() lives in dedup_index so the applier can use it without genai.
+# Seen hashes persist across --loop iterations and processes.
 
 def is_duplicate(company: str, title: str) -> bool:
-    """Check if we've already seen this company+title combo."""
-    h = job_hash(company, title)
-    if h in _seen_hashes:
-        return True
-    _seen_hashes.add(h)
-    return False
+    """Check if we've already seen this company+title combo (records it if not)."""
+    return get_index().check_and_add(company, title)
 
 
 # ============================================
 # LLM SCORER
 # ============================================
 
-def score_job(job: dict) -> dict:
-    """Score a job listing. Applies pre-filter first, then LLM if needed."""
-    title = job.get('title', 'Unknown')
-    company = job.get('company', 'Unknown')
+# Batch size for score_jobs_batch(): jobs per Gemini request
+BATCH_SIZE = int(os.getenv("GEMINI_SCORER_BATCH_SIZE", "8"))
 
-    # Pre-filter: fast Python check
-    passes, reject_reason = pre_filter_job(title)
-    if not passes:
-        logger.debug(f"Pre-filtered: {company} - {title} | {reject_reason}")
-        return {
-            "score": 0,
-            "recommendation": "NO",
-            "estimated_salary": "Unknown",
-            "reason": f"Pre-filter: {reject_reason}",
-        }
+# Profile section of the preamble: the full profile, or a digest for the cheap tier
+SCORER_PROFILE_TEXT = (f"PROFILE SUMMARY:\n{profile_digest(CANDIDATE_SCORING_PROFILE)}"
+                       if SCORER_PROFILE == "digest" else f"FULL PROFILE:\n{CANDIDATE_FULL_PROFILE}")
 
-    # LLM scoring
-    prompt = f"""You are a strict job-fit scorer for an IT support/infrastructure professional.
+# Static prompt prefix - identical for every job, sent as the system instruction
+SCORER_PREAMBLE = f"""You are a strict job-fit scorer for an IT support/infrastructure professional.
 
 CANDIDATE CONTEXT:
 - NO formal degree (100% self-taught)
@@ -147,18 +242,9 @@ CANDIDATE CONTEXT:
 - Location: Anaheim, CA / Orange County
 - Available: On-site (OC/LA), Hybrid, Limited Remote
 
-FULL PROFILE:
-{CANDIDATE_FULL_PROFILE}
-
-JOB TO SCORE:
-Company: {company}
-Title: {title}
-Location: {job.get('location', 'Unknown')}
-Pay: {job.get('pay', 'Not listed')}
-Description:
-{job.get('description', 'No description')[:3000]}
+{SCORER_PROFILE_TEXT}"""
 
-============================================================
+SCORING_RULES = """============================================================
 SCORING RULES
 ============================================================
 
@@ -199,54 +285,605 @@ STEP 4: SALARY
 STEP 5: LOCATION
 - On-site roles must be within reasonable commute of Anaheim/OC/LA area
 - Remote roles anywhere in the US are fine
-- On-site roles in other states: Score NO unless relocation offered
+- On-site roles in other states: Score NO unless relocation offered"""
 
-Return JSON with these exact keys:
-- "score": integer 1-10
+RESULT_KEYS = """- "score": integer 1-10
 - "recommendation": "YES" or "NO"
 - "estimated_salary": string like "$65,000"
 - "reason": one sentence explaining the score
-- "degree_required": true/false (is a degree strictly required with no equivalent?)
+- "degree_required": true/false (is a degree strictly required with no equivalent?)"""
 
-THRESHOLD: Score 6+ = YES. Score 5 or below = NO.
+THRESHOLD_RULE = """THRESHOLD: Score 6+ = YES. Score 5 or below = NO.
 Be STRICT. When in doubt, NO."""
 
-    try:
-        response = model.generate_content(prompt)
-        text = response.text.strip()
 
-        # Clean markdown blocks (safety fallback even with JSON mode)
-        if text.startswith("```"):
-            lines = text.splitlines()
-            if lines[0].startswith("```"):
-                lines = lines[1:]
-            if lines and lines[-1].strip() == "```":
-                lines = lines[:-1]
-            text = "\n".join(lines).strip()
+# Preamble + rules + threshold never change between jobs, so they form the cached
+# prefix; the prompts below are only the per-job suffix
+SCORER_PREFIX = PromptPrefix("score", "\n\n".join([SCORER_PREAMBLE, SCORING_RULES, THRESHOLD_RULE]))
+
+
+def _job_block(job: dict) -> str:
+    """Per-job part of the prompt."""
+    return f"""Company: {job.get('company', 'Unknown')}
+Title: {job.get('title', 'Unknown')}
+Location: {job.get('location', 'Unknown')}
+Pay: {job.get('pay', 'Not listed')}
+Description:
+{job.get('description', 'No description')[:3000]}"""
+
+
+def build_prompt(job: dict) -> str:
+    """Single-job scoring prompt (suffix of SCORER_PREFIX)."""
+    return f"""JOB TO SCORE:
+{_job_block(job)}
+
+Return JSON with these exact keys:
+{RESULT_KEYS}"""
+
+
+def build_batch_prompt(batch: list) -> str:
+    """Multi-job scoring prompt (suffix of SCORER_PREFIX). `batch` is a list of (job_id, job) pairs."""
+    blocks = "\n\n".join(f"--- JOB {job_id} ---\n{_job_block(job)}" for job_id, job in batch)
+    return f"""JOBS TO SCORE ({len(batch)} jobs, score each one independently):
+
+{blocks}
+
+Return a JSON array with exactly one object per job. Each object has these exact keys:
+- "job_id": the id from the job's "--- JOB <id> ---" header, copied exactly
+{RESULT_KEYS}"""
+
 
-        result = json.loads(text)
+def _parse_json_text(text: str):
+    """Parse model output, stripping markdown blocks (safety fallback even with JSON mode)."""
+    text = text.strip()
+    if text.startswith("```"):
+        lines = text.splitlines()
+        if lines[0].startswith("```"):
+            lines = lines[1:]
+        if lines and lines[-1].strip() == "```":
+            lines = lines[:-1]
+        text = "\n".join(lines).strip()
+    return json.loads(text)
 
-        # Enforce no MAYBE
-        if result.get('recommendation') == 'MAYBE':
-            result['recommendation'] = 'NO'
-            result['reason'] = f"Borderline - defaulting to NO. {result.get('reason', '')}"
 
-        logger.info(f"Scored: {company[:20]} - {title[:35]} | {result.get('score')}/10 {result.get('recommendation')} | {result.get('reason', '')[:60]}")
-        return result
+# Verdict for a job Gemini could not score. Never cached and never a NO:
+# callers should retry the job later instead of dropping it.
+SCORE_ERROR = "ERROR"
 
-    except json.JSONDecodeError as e:
-        raw = response.text[:200] if 'response' in dir() else 'No response'
-        logger.error(f"JSON parse error for {company} - {title}: {e} | Raw: {raw}")
-        return {"score": 0, "recommendation": "NO", "estimated_salary": "Unknown", "reason": f"JSON parse error: {e}"}
 
-    except Exception as e:
-        logger.error(f"Scoring error for {company} - {title}: {e}")
-        return {"score": 0, "recommendation": "NO", "estimated_salary": "Unknown", "reason": f"Scoring error: {e}"}
+def error_result(reason: str, transient: bool = True, config: bool = False) -> dict:
+    return {
+        "score": None,
+        "recommendation": SCORE_ERROR,
+        "estimated_salary": "Unknown",
+        "reason": f"Scoring error: {reason}",
+        "transient": transient,
+        "config": config,
+    }
+
+
+def is_score_error(result: dict) -> bool:
+    return result.get('recommendation') == SCORE_ERROR
+
+
+def _finalize_result(result: dict, company: str, title: str) -> dict:
+    """Enforce no MAYBE and log the verdict."""
+    if result.get('recommendation') == 'MAYBE':
+        result['recommendation'] = 'NO'
+        result['reason'] = f"Borderline - defaulting to NO. {result.get('reason', '')}"
+
+    logger.info(f"Scored: {company[:20]} - {title[:35]} | {result.get('score')}/10 {result.get('recommendation')} | {result.get('reason', '')[:60]}")
+    return result
+
+
+def _pre_filter_result(job: dict):
+    """Pre-filter verdict for a job, or None if it should go to the LLM."""
+    passes, reject_reason = pre_filter_job(job.get('title', 'Unknown'))
+    if passes:
+        return None
+    logger.debug(f"Pre-filtered: {job.get('company', 'Unknown')} - {job.get('title', 'Unknown')} | {reject_reason}")
+    return {
+        "score": 0,
+        "recommendation": "NO",
+        "estimated_salary": "Unknown",
+        "reason": f"Pre-filter: {reject_reason}",
+    }
+
+
+# ============================================
+# SCORE CACHE (content-addressed, survives across hunts)
+# ============================================
+
+SCORE_CACHE_PATH = Path(os.getenv("SCORER_CACHE_PATH", "/root/job_bot/queue/score_cache.db"))
+SCORE_CACHE_TTL_DAYS = float(os.getenv("SCORER_CACHE_TTL_DAYS", "14"))
+SCORE_CACHE_MAX_ENTRIES = int(os.getenv("SCORER_CACHE_MAX_ENTRIES", "20000"))
+
+# Any change to the prompt text or candidate profile changes this version,
+# which changes every cache key -> stale verdicts are never reused.
+PROMPT_VERSION = hashlib.sha256(
+    "\x1f".join([SCORER_PREFIX.text, RESULT_KEYS]).encode()
+).hexdigest()[:16]
+
+
+def normalize_description(desc: str) -> str:
+    """Description as the scorer sees it, with formatting noise removed."""
+    desc = str(desc or '')[:3000]
+    desc = desc.replace('\\-', '-').replace('\\*', '*').replace('\\_', '_')
+    return ' '.join(desc.lower().split())
+
+
+def score_cache_key(job: dict) -> str:
+    """Hash of (title, company, normalized description, prompt version, model)."""
+    parts = [
+        ' '.join(str(job.get('title', '')).lower().split()),
+        ' '.join(str(job.get('company', '')).lower().split()),
+        normalize_description(job.get('description', '')),
+        PROMPT_VERSION,
+        GEMINI_MODEL,
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+SCORE_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS score_cache (
+    key TEXT PRIMARY KEY,
+    result TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_hit REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_score_cache_last_hit ON score_cache(last_hit);
+"""
+
+
+class ScoreCache(SQLiteStore):
+    """SQLite-backed LLM verdict cache with TTL and LRU size bound."""
+
+    EVICT_EVERY = 100  # Check the size bound every N stores
+
+    def __init__(self, path: Path = SCORE_CACHE_PATH, ttl_days: float = SCORE_CACHE_TTL_DAYS,
+                 max_entries: int = SCORE_CACHE_MAX_ENTRIES):
+        super().__init__(path, SCORE_CACHE_SCHEMA)
+        self.ttl_s = ttl_days * 86400
+        self.max_entries = max_entries
+        self.hits = self.misses = self.stores = self.evictions = 0
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, created_at FROM score_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row and now - row[1] <= self.ttl_s:
+                self._conn.execute("UPDATE score_cache SET last_hit = ? WHERE key = ?", (now, key))
+                self.hits += 1
+                return json.loads(row[0])
+            if row:
+                self._conn.execute("DELETE FROM score_cache WHERE key = ?", (key,))
+                self.evictions += 1
+            self.misses += 1
+        return None
+
+    def put(self, key: str, result: dict):
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO score_cache (key, result, created_at, last_hit) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(result), now, now),
+            )
+            self.stores += 1
+            if self.stores % self.EVICT_EVERY == 0:
+                self._evict(now)
+
+    def _evict(self, now: float):
+        """Drop expired rows, then least-recently-hit rows above max_entries."""
+        cur = self._conn.execute("DELETE FROM score_cache WHERE created_at < ?", (now - self.ttl_s,))
+        self.evictions += cur.rowcount
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM score_cache").fetchone()
+        if count > self.max_entries:
+            cur = self._conn.execute(
+                "DELETE FROM score_cache WHERE key IN ("
+                "SELECT key FROM score_cache ORDER BY last_hit LIMIT ?)",
+                (count - self.max_entries,),
+            )
+            self.evictions += cur.rowcount
+
+    def stats(self) -> dict:
+        with self._transaction():
+            self._evict(time.time())
+        with self._lock:
+            (size,) = self._conn.execute("SELECT COUNT(*) FROM score_cache").fetchone()
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'stores': self.stores,
+                'evictions': self.evictions,
+                'size': size,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = self.stores = self.evictions = 0
+
+
+_score_cache = None
+_score_cache_lock = threading.Lock()
+
+
+def get_score_cache() -> ScoreCache:
+    global _score_cache
+    if _score_cache is None:
+        with _score_cache_lock:
+            if _score_cache is None:
+                _score_cache = ScoreCache()
+    return _score_cache
+
+
+def score_cache_stats() -> dict:
+    """Hit/miss counters for this process (for the hunt summary)."""
+    return get_score_cache().stats()
+
+
+# ============================================
+# LOCAL RELEVANCE TIER (between pre-filter and Gemini)
+# ============================================
+# Naive Bayes over title unigrams/bigrams, trained on our own LLM verdicts:
+# NO = skipped entries the LLM rejected, YES = every job that passed scoring
+# (pending/applied/failed/external/manual). Only titles are used because
+# skipped entries do not store descriptions. The reject threshold is picked on
+# a held-out 20% so that auto-rejected jobs agree with the LLM at least
+# RELEVANCE_MIN_PRECISION of the time (and never above P(yes) = 0.5);
+# everything above it goes to Gemini.
+
+RELEVANCE_MODEL_PATH = Path(os.getenv("RELEVANCE_MODEL_PATH", "/root/job_bot/queue/relevance_model.json"))
+RELEVANCE_ENABLED = os.getenv("RELEVANCE_TIER", "1") != "0"
+RELEVANCE_MIN_PRECISION = 0.98   # Held-out share of auto-rejects the LLM also said NO to
+RELEVANCE_MIN_EXAMPLES = 200     # Labeled jobs needed before the tier turns on
+RELEVANCE_MIN_PER_CLASS = 30
+RELEVANCE_MIN_REJECTS = 20       # Held-out rejects needed to trust a threshold
+RELEVANCE_MAX_THRESHOLD = 0.5    # Never auto-reject a job the model leans YES on
+RELEVANCE_RETRAIN_HOURS = 24
+RELEVANCE_REASON = "Local model"
+PASSED_STATUSES = ('pending', 'applying', 'applied', 'failed', 'external', 'manual')
+
+# Skipped reasons that are not LLM verdicts (never used as training labels)
+_NON_LLM_REASONS = ("Pre-filter", "Near-duplicate", "Scoring error", RELEVANCE_REASON)
+_TITLE_WORD = re.compile(r"[a-z0-9+#]+")
+
+
+def title_features(title: str) -> set:
+    words = _TITLE_WORD.findall(str(title or '').lower())
+    return set(words) | {f"{a} {b}" for a, b in zip(words, words[1:])}
+
+
+class RelevanceModel:
+    """Title Naive Bayes with a calibrated auto-reject threshold."""
+
+    def __init__(self, weights: dict, bias: float, threshold: float, report: dict):
+        self.weights = weights      # feature -> log P(f|YES)/P(f|NO); unseen features count 0
+        self.bias = bias            # log prior ratio
+        self.threshold = threshold  # Auto-reject when P(YES) < threshold
+        self.report = report
+
+    @classmethod
+    def fit(cls, examples: list, threshold: float = 0.0, report: dict = None) -> 'RelevanceModel':
+        """examples: [(title, is_yes)]"""
+        counts = {True: Counter(), False: Counter()}
+        docs = Counter()
+        for title, label in examples:
+            counts[label].update(title_features(title))
+            docs[label] += 1
+        vocab = set(counts[True]) | set(counts[False])
+        totals = {label: sum(c.values()) + len(vocab) + 1 for label, c in counts.items()}
+        weights = {
+            f: math.log((counts[True][f] + 1) / totals[True]) - math.log((counts[False][f] + 1) / totals[False])
+            for f in vocab
+        }
+        return cls(
+            weights=weights,
+            bias=math.log((docs[True] + 1) / (docs[False] + 1)),
+            threshold=threshold,
+            report=report or {},
+        )
+
+    def p_yes(self, title: str) -> float:
+        z = self.bias + sum(self.weights.get(f, 0.0) for f in title_features(title))
+        return 1 / (1 + math.exp(-max(min(z, 50), -50)))
+
+    def verdict(self, job: dict):
+        """NO result for a clear reject, else None (escalate to the LLM)."""
+        p = self.p_yes(job.get('title', ''))
+        if p >= self.threshold:
+            return None
+        return {
+            "score": 0,
+            "recommendation": "NO",
+            "estimated_salary": "Unknown",
+            "reason": f"{RELEVANCE_REASON}: P(yes)={p:.3f} < {self.threshold:.3f}",
+        }
+
+    def save(self, path: Path = None):
+        path = path or RELEVANCE_MODEL_PATH
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({
+            'weights': self.weights, 'bias': self.bias,
+            'threshold': self.threshold, 'report': self.report,
+        }))
+
+    @classmethod
+    def load(cls, path: Path = None) -> 'RelevanceModel':
+        data = json.loads((path or RELEVANCE_MODEL_PATH).read_text())
+        return cls(data['weights'], data['bias'], data['threshold'], data['report'])
+
+
+def relevance_examples() -> list:
+    """(job key, title, is_yes) for every job the LLM gave a verdict on."""
+    from queue_store import get_store, job_key
+    store = get_store()
+    examples = [(job_key(job), job.get('title', ''), True)
+                for status in PASSED_STATUSES for job in store.iter_jobs(status)]
+    for job in store.iter_jobs('skipped'):
+        reason = str(job.get('reason', ''))
+        if job.get('recommendation') == 'NO' and not reason.startswith(_NON_LLM_REASONS):
+            examples.append((job_key(job), job.get('title', ''), False))
+    return examples
+
+
+def calibrate(train: list, holdout: list) -> tuple:
+    """Pick the highest reject threshold whose held-out auto-rejects meet
+    RELEVANCE_MIN_PRECISION. Returns (threshold, report); threshold 0 = tier off."""
+    model = RelevanceModel.fit(train)
+    scored = sorted((model.p_yes(title), label) for title, label in holdout)
+    agreement = sum((p >= 0.5) == label for p, label in scored) / len(scored) if scored else 0.0
+
+    threshold, rejected, wrong = 0.0, 0, 0
+    for i, (p, label) in enumerate(scored):
+        wrong_here = wrong + label
+        if i + 1 >= RELEVANCE_MIN_REJECTS and 1 - wrong_here / (i + 1) >= RELEVANCE_MIN_PRECISION:
+            # Reject everything strictly below the next score
+            next_p = scored[i + 1][0] if i + 1 < len(scored) else 1.0
+            cut = min((p + next_p) / 2, RELEVANCE_MAX_THRESHOLD)
+            if next_p > p and cut > p:
+                threshold, rejected = cut, i + 1
+        wrong = wrong_here
+    misses = sum(label for p, label in scored if p < threshold)
+    yes_total = sum(label for _, label in scored)
+    report = {
+        'trained_at': datetime.now().isoformat(),
+        'train': len(train),
+        'holdout': len(scored),
+        'agreement_at_0.5': round(agreement, 3),
+        'threshold': round(threshold, 4),
+        'holdout_rejected': rejected,
+        'holdout_reject_rate': round(rejected / len(scored), 3) if scored else 0.0,
+        'holdout_no_precision': round(1 - misses / rejected, 3) if rejected else None,
+        'holdout_yes_lost': misses,
+        'holdout_yes': yes_total,
+    }
+    return threshold, report
+
+
+def train_relevance_model(save: bool = True):
+    """Train on current verdicts; returns the model, or None if there is too little data."""
+    examples = relevance_examples()
+    yes = sum(label for _, _, label in examples)
+    if len(examples) < RELEVANCE_MIN_EXAMPLES or min(yes, len(examples) - yes) < RELEVANCE_MIN_PER_CLASS:
+        logger.info(f"Relevance tier: not enough verdicts to train ({yes} YES / {len(examples) - yes} NO)")
+        return None
+    # Deterministic 80/20 split by job key, so a retrain sees the same holdout
+    holdout_of = lambda key: int(hashlib.md5(key.encode()).hexdigest(), 16) % 5 == 0
+    train = [(title, label) for key, title, label in examples if not holdout_of(key)]
+    holdout = [(title, label) for key, title, label in examples if holdout_of(key)]
+    threshold, report = calibrate(train, holdout)
+    model = RelevanceModel.fit([(title, label) for _, title, label in examples], threshold, report)
+    if save:
+        model.save()
+    logger.info(f"Relevance tier trained: {report}")
+    return model
+
+
+_relevance = None
+_relevance_lock = threading.Lock()
+_relevance_counts = Counter()
+
+
+def get_relevance_model(retrain: bool = True):
+    """Loaded (and, when older than RELEVANCE_RETRAIN_HOURS, retrained) model or None."""
+    global _relevance
+    if not RELEVANCE_ENABLED:
+        return None
+    with _relevance_lock:
+        stale = (not RELEVANCE_MODEL_PATH.exists()
+                 or time.time() - RELEVANCE_MODEL_PATH.stat().st_mtime > RELEVANCE_RETRAIN_HOURS * 3600)
+        if retrain and stale:
+            try:
+                _relevance = train_relevance_model() or _relevance
+            except Exception as e:
+                logger.error(f"Relevance tier training failed: {e}")
+        elif _relevance is None and RELEVANCE_MODEL_PATH.exists():
+            _relevance = RelevanceModel.load()
+    return _relevance
+
+
+def _relevance_result(job: dict):
+    """Local-tier NO for a clear reject, else None. Counts checks/rejects."""
+    model = _relevance
+    if model is None or model.threshold <= 0:
+        return None
+    result = model.verdict(job)
+    with _relevance_lock:
+        _relevance_counts['checked'] += 1
+        _relevance_counts['rejected'] += result is not None
+    if result:
+        logger.debug(f"Local reject: {job.get('company', 'Unknown')} - {job.get('title', 'Unknown')} | {result['reason']}")
+    return result
+
+
+def relevance_stats(reset: bool = False) -> dict:
+    """Jobs the local tier checked / auto-rejected (LLM calls saved) since the last reset."""
+    with _relevance_lock:
+        stats = {'checked': _relevance_counts['checked'], 'rejected': _relevance_counts['rejected']}
+        if reset:
+            _relevance_counts.clear()
+    return stats
+
+
+def score_job(job: dict) -> dict:
+    """Score a job listing (blocking). See score_job_async()."""
+    return get_engine().call(score_job_async(job)).result()
+
+
+def score_jobs_batch(jobs: list, batch_size: int = BATCH_SIZE) -> dict:
+    """Blocking score_jobs_batch_async() for callers outside the engine loop."""
+    return get_engine().call(score_jobs_batch_async(jobs, batch_size)).result()
+
+
+async def score_job_async(job: dict) -> dict:
+    """Score a job listing. Applies pre-filter first, then cache, then the local
+    relevance tier, then LLM if needed."""
+    title = job.get('title', 'Unknown')
+    company = job.get('company', 'Unknown')
+
+    # Pre-filter: fast Python check
+    pre_filtered = _pre_filter_result(job)
+    if pre_filtered:
+        return pre_filtered
+
+    # Cache: same content already scored with the same prompt + model
+    cache_key = score_cache_key(job)
+    cached = get_score_cache().get(cache_key)
+    if cached:
+        logger.info(f"Cached: {company[:20]} - {title[:35]} | {cached.get('score')}/10 {cached.get('recommendation')}")
+        return cached
+
+    # Local tier: clear NOs never reach Gemini
+    local = _relevance_result(job)
+    if local:
+        return local
+
+    return await _score_with_llm(job, cache_key)
+
+
+async def _score_with_llm(job: dict, cache_key: str) -> dict:
+    """Single-job Gemini call; successful verdicts are written to the cache.
+    Failures return error_result(), not a NO."""
+    title = job.get('title', 'Unknown')
+    company = job.get('company', 'Unknown')
+    prompt = build_prompt(job)
+
+    try:
+        response = await get_engine().generate(prompt)
+    except ScoringUnavailable as e:
+        logger.error(f"Scoring unavailable for {company} - {title}: {e}")
+        return error_result(str(e), e.transient, e.config)
+    get_prompt_stats().record(SCORER_PREFIX, prompt, response)
+
+    try:
+        result = _parse_json_text(response.text)
+        if not isinstance(result, dict):
+            raise ValueError(f"expected an object, got {type(result).__name__}")
+    except ValueError as e:  # JSONDecodeError is a ValueError
+        logger.error(f"JSON parse error for {company} - {title}: {e} | Raw: {response.text[:200]}")
+        return error_result(f"JSON parse error: {e}", transient=False)
+
+    result = _finalize_result(result, company, title)
+    get_score_cache().put(cache_key, result)
+    return result
+
+
+def _job_id(job: dict, position: int) -> str:
+    """Caller-visible id used to key batch results."""
+    return str(job.get('id') or job.get('job_url') or job.get('url') or position)
+
+
+async def score_jobs_batch_async(jobs: list, batch_size: int = BATCH_SIZE) -> dict:
+    """Score many jobs with one Gemini request per `batch_size` jobs.
+
+    Output-format instructions and request overhead are paid once per batch
+    (the profile + rules prefix is cached either way), and the batches run
+    concurrently under the engine's limiter.
+    Returns {job_id: result}, where job_id is the job's 'id', else 'job_url'/'url',
+    else its position in `jobs`. Jobs missing from (or malformed in) the model's
+    array fall back to a single-job request. If Gemini is unavailable the whole
+    batch gets error_result() (no per-job fan-out into a 429 storm). Cached
+    verdicts and local-tier rejects never reach Gemini.
+    """
+    results = {}
+    to_llm = []
+    cache = get_score_cache()
+    for position, job in enumerate(jobs):
+        job_id = _job_id(job, position)
+        pre_filtered = _pre_filter_result(job)
+        if pre_filtered:
+            results[job_id] = pre_filtered
+            continue
+        cache_key = score_cache_key(job)
+        cached = cache.get(cache_key)
+        if cached:
+            results[job_id] = cached
+            continue
+        local = _relevance_result(job)
+        if local:
+            results[job_id] = local
+        else:
+            to_llm.append((job_id, job, cache_key))
+
+    async def score_chunk(chunk):
+        # Short prompt-local ids keep the model from mangling long URLs
+        local = {f"J{i + 1}": entry for i, entry in enumerate(chunk)}
+        parsed = {}
+        if len(chunk) > 1:
+            prompt = build_batch_prompt([(local_id, job) for local_id, (_, job, _) in local.items()])
+            try:
+                response = await get_engine().generate(prompt)
+            except ScoringUnavailable as e:
+                logger.error(f"Scoring unavailable for batch of {len(chunk)}: {e}")
+                for job_id, _, _ in chunk:
+                    results[job_id] = error_result(str(e), e.transient, e.config)
+                return
+            get_prompt_stats().record(SCORER_PREFIX, prompt, response, kind="score_batch")
+            try:
+                items = _parse_json_text(response.text)
+                if isinstance(items, dict):
+                    items = items.get('results') or items.get('jobs') or []
+                for item in items:
+                    if not isinstance(item, dict):
+                        continue
+                    local_id = str(item.pop('job_id', '')).strip()
+                    if local_id in local and isinstance(item.get('score'), (int, float)) and item.get('recommendation'):
+                        parsed[local_id] = item
+            except Exception as e:
+                logger.error(f"Batch scoring error ({len(chunk)} jobs), falling back to single-job scoring: {e}")
+
+        missing = []
+        for local_id, (job_id, job, cache_key) in local.items():
+            if local_id in parsed:
+                results[job_id] = _finalize_result(
+                    parsed[local_id], job.get('company', 'Unknown'), job.get('title', 'Unknown'))
+                cache.put(cache_key, results[job_id])
+            else:
+                missing.append((job_id, job, cache_key))
+        if len(chunk) > 1 and missing:
+            logger.warning(f"Batch of {len(chunk)}: {len(missing)} job(s) re-scored individually")
+        singles = await asyncio.gather(*(_score_with_llm(job, cache_key) for _, job, cache_key in missing))
+        for (job_id, _, _), result in zip(missing, singles):
+            results[job_id] = result
+
+    step = max(batch_size, 1)
+    await asyncio.gather(*(score_chunk(to_llm[i:i + step]) for i in range(0, len(to_llm), step)))
+    return results
 
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
 
+    # python3 scorer.py --train-relevance   Retrain the local tier and print its calibration report
+    if '--train-relevance' in sys.argv:
+        trained = train_relevance_model()
+        print(json.dumps(trained.report if trained else {'error': 'not enough verdicts'}, indent=2))
+        sys.exit(0)
+
     test_jobs = [
         # Should be YES -- core fit
         {"company": "Kaiser Permanente", "title": "IT Support Specialist", "location": "Irvine, CA",
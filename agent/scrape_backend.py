@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Scrape Backend - where JobSpy searches run, and how fast each site is hit
+=========================================================================
+JobSpy parses HTML/JSON into pandas under the GIL, so PARALLEL_SEARCHES
+threads mostly take turns on one core. The 'process' backend runs each
+search in a worker process (frames come back pickled) and keeps the
+calling thread free; the 'thread' backend runs it in the calling thread
+as before.
+
+Either way, every search first takes a slot from its site's limiter:
+at most N searches in flight per site and a minimum gap between starts,
+so LinkedIn can be paced harder than Indeed. Per-site and per-backend
+counters (searches, rows, busy and waiting time) are reported per hunt.
+
+Settings (env):
+    HUNTER_SCRAPE_BACKEND      'process' (default) or 'thread'
+    HUNTER_SCRAPE_WORKERS      Worker processes (default 3, one per core)
+    INDEED_MAX_IN_FLIGHT       Concurrent Indeed searches (default 3)
+    INDEED_MIN_INTERVAL        Seconds between Indeed search starts (default 1)
+    LINKEDIN_MAX_IN_FLIGHT     Concurrent LinkedIn searches (default 1)
+    LINKEDIN_MIN_INTERVAL      Seconds between LinkedIn search starts (default 5)
+"""
+
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+SCRAPE_BACKEND = os.getenv('HUNTER_SCRAPE_BACKEND', 'process')
+SCRAPE_WORKERS = int(os.getenv('HUNTER_SCRAPE_WORKERS', '3'))  # VPS has 3 cores
+
+# site -> (max in flight, min seconds between starts)
+SITE_LIMITS = {
+    'indeed': (int(os.getenv('INDEED_MAX_IN_FLIGHT', '3')),
+               float(os.getenv('INDEED_MIN_INTERVAL', '1'))),
+    'linkedin': (int(os.getenv('LINKEDIN_MAX_IN_FLIGHT', '1')),
+                 float(os.getenv('LINKEDIN_MIN_INTERVAL', '5'))),
+}
+DEFAULT_SITE_LIMIT = (1, 5.0)
+
+
+def new_meter() -> Dict[str, float]:
+    return {'searches': 0, 'failed': 0, 'rows': 0, 'busy_seconds': 0.0, 'wait_seconds': 0.0}
+
+
+# ============================================
+# PER-SITE LIMITER
+# ============================================
+
+class SiteLimiter:
+    """Concurrency cap plus start spacing for one site (thread-safe)."""
+
+    def __init__(self, max_in_flight: int, min_interval: float):
+        self.min_interval = min_interval
+        self._slots = threading.BoundedSemaphore(max(1, max_in_flight))
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    @contextmanager
+    def slot(self):
+        """Hold a slot for one search. Yields the seconds spent waiting for it."""
+        start = time.monotonic()
+        self._slots.acquire()
+        try:
+            with self._lock:
+                now = time.monotonic()
+                delay = max(0.0, self._next_start - now)
+                self._next_start = max(now, self._next_start) + self.min_interval
+            if delay:
+                time.sleep(delay)
+            yield time.monotonic() - start
+        finally:
+            self._slots.release()
+
+
+# ============================================
+# BACKEND
+# ============================================
+
+class ScrapeBackend:
+    """Runs search callables on threads or in a process pool, per-site limited."""
+
+    def __init__(self, kind: str = SCRAPE_BACKEND, workers: int = SCRAPE_WORKERS):
+        if kind not in ('thread', 'process'):
+            raise ValueError(f"Unknown scrape backend: {kind}")
+        self.kind = kind
+        self.workers = max(1, workers)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._limiters = {site: SiteLimiter(*limits) for site, limits in SITE_LIMITS.items()}
+        self._meters: Dict[str, Dict[str, float]] = {}
+
+    def _limiter(self, site: str) -> SiteLimiter:
+        with self._lock:
+            if site not in self._limiters:
+                self._limiters[site] = SiteLimiter(*DEFAULT_SITE_LIMIT)
+            return self._limiters[site]
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        # spawn, not fork: the hunter forks from a threaded process holding SQLite handles
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+            return self._pool
+
+    def run(self, site: str, fn: Callable, *args):
+        """Run fn(*args) under the site's limiter. fn must be picklable
+        (module-level) for the process backend; it returns a DataFrame or None."""
+        result = None
+        with self._limiter(site).slot() as waited:
+            start = time.monotonic()
+            try:
+                if self.kind == 'process':
+                    result = self._process_pool().submit(fn, *args).result()
+                else:
+                    result = fn(*args)
+            finally:
+                self._record(site, result, time.monotonic() - start, waited)
+        return result
+
+    def _record(self, site: str, result, busy: float, waited: float):
+        with self._lock:
+            for name in (site, self.kind):
+                meter = self._meters.setdefault(name, new_meter())
+                meter['searches'] += 1
+                meter['failed'] += result is None
+                meter['rows'] += 0 if result is None else len(result)
+                meter['busy_seconds'] += busy
+                meter['wait_seconds'] += waited
+
+    def report(self, reset: bool = False) -> Dict[str, Dict[str, float]]:
+        """Counters keyed by site and by backend name."""
+        with self._lock:
+            report = {name: dict(meter) for name, meter in self._meters.items()}
+            if reset:
+                self._meters = {}
+        return report
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+_backend: Optional[ScrapeBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> ScrapeBackend:
+    """Process-wide backend; the worker pool is reused across hunts (run_loop)."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = ScrapeBackend()
+                atexit.register(_backend.shutdown)
+    return _backend
+
+
+def set_backend(kind: str, workers: int = SCRAPE_WORKERS) -> ScrapeBackend:
+    """Replace the process-wide backend (CLI --scrape-backend)."""
+    global _backend
+    with _backend_lock:
+        if _backend is not None:
+            _backend.shutdown()
+        _backend = ScrapeBackend(kind, workers)
+        atexit.register(_backend.shutdown)
+    return _backend
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Search Scheduler - adaptive SEARCH_TERMS selection
+==================================================
+Every hunt used to run every search term at RESULTS_PER_SEARCH, although
+many terms return almost only duplicates or pre-filtered titles. This module
+keeps per-(search_type, term) yield stats across runs (in queue.db, next to
+the dedup index) and plans each hunt under a scrape budget:
+
+    1. Terms never run are probed at full depth (as many as the budget allows).
+    2. Terms not run for REPROBE_DAYS are re-probed at MIN_RESULTS.
+    3. The rest get results_wanted in proportion to their passing-job yield,
+       best first, until the budget is spent.
+
+Yields are EWMAs of passing jobs (and new unique jobs) per requested result.
+Old evidence decays toward the average term with a HALF_LIFE_DAYS half-life,
+so a term that was bad a month ago gets another chance.
+
+It also keeps a high-water mark per (site, query, location): the start time
+of the last successful scrape. A hunt then asks JobSpy only for the hours
+since then plus OVERLAP_HOURS, instead of the full HOURS_OLD window, with a
+full-window sweep every FULL_SWEEP_HOURS as a safety net.
+
+Usage:
+    python3 search_scheduler.py --stats     # Per-term yield table
+    python3 search_scheduler.py --reset     # Forget all term stats and scrape marks
+"""
+
+import math
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, '/root/job_bot')
+from queue_store import DB_PATH, SQLiteStore
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+SCRAPE_BUDGET = int(os.getenv('HUNTER_SCRAPE_BUDGET', '900'))  # Sum of results_wanted per hunt
+MAX_RESULTS = 50      # Per search (old RESULTS_PER_SEARCH)
+MIN_RESULTS = 15      # Shallowest search worth a scrape
+EWMA_ALPHA = 0.4      # Weight of the latest run in the yield estimate
+HALF_LIFE_DAYS = 14   # Stale evidence regresses to the mean with this half-life
+REPROBE_DAYS = 7      # Terms skipped this long get a shallow re-probe
+
+# Incremental scraping (high-water marks)
+FULL_WINDOW_HOURS = 72   # Hunter HOURS_OLD: the window a full sweep asks for
+OVERLAP_HOURS = 2        # Re-fetch this much before the mark (late indexing, clock skew)
+FULL_SWEEP_HOURS = 24    # Force a full-window scrape at least this often
+PAGE_SIZE = {'indeed': 100, 'linkedin': 25}  # JobSpy results per page request
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_terms (
+    search_type TEXT NOT NULL,
+    term TEXT NOT NULL,
+    runs INTEGER NOT NULL DEFAULT 0,
+    rows INTEGER NOT NULL DEFAULT 0,
+    new_jobs INTEGER NOT NULL DEFAULT 0,
+    pre_filtered INTEGER NOT NULL DEFAULT 0,
+    scored INTEGER NOT NULL DEFAULT 0,
+    passed INTEGER NOT NULL DEFAULT 0,
+    yes INTEGER NOT NULL DEFAULT 0,
+    factory_ok INTEGER NOT NULL DEFAULT 0,
+    pass_rate REAL NOT NULL DEFAULT 0,
+    new_rate REAL NOT NULL DEFAULT 0,
+    last_results INTEGER NOT NULL DEFAULT 0,
+    last_run TEXT,
+    PRIMARY KEY (search_type, term)
+);
+"""
+
+CREATE_WATERMARKS = """
+CREATE TABLE IF NOT EXISTS scrape_watermarks (
+    site TEXT NOT NULL,
+    query TEXT NOT NULL,
+    location TEXT NOT NULL,
+    last_success TEXT NOT NULL,
+    last_full TEXT,
+    full_rows REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (site, query, location)
+) WITHOUT ROWID;
+"""
+
+# Per-run counters recorded for each search
+RUN_COUNTERS = ('rows', 'new_jobs', 'pre_filtered', 'scored', 'passed', 'yes', 'factory_ok')
+
+SearchKey = Tuple[str, str]  # (search_type, term)
+
+
+def new_run_stats() -> Dict[str, int]:
+    return {name: 0 for name in RUN_COUNTERS}
+
+
+def new_scrape_report() -> Dict[str, float]:
+    return {'full': 0, 'incremental': 0, 'rows': 0, 'pages': 0,
+            'rows_saved': 0, 'pages_saved': 0, 'hours_requested': 0}
+
+
+# ============================================
+# SCHEDULER
+# ============================================
+
+class SearchScheduler(SQLiteStore):
+    """Persistent per-term yield stats and the budgeted hunt planner."""
+
+    def __init__(self, db_path: Path = DB_PATH):
+        super().__init__(db_path, SCHEMA + CREATE_WATERMARKS)
+        self._conn.row_factory = sqlite3.Row
+        self._scrape_report = new_scrape_report()
+
+    def stats(self) -> Dict[SearchKey, sqlite3.Row]:
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM search_terms").fetchall()
+        return {(r['search_type'], r['term']): r for r in rows}
+
+    def effective_rate(self, row: sqlite3.Row, prior: float, now: datetime) -> float:
+        """Pass-rate estimate, decayed toward `prior` as the evidence ages."""
+        if not row['last_run']:
+            return prior
+        age_days = (now - datetime.fromisoformat(row['last_run'])).total_seconds() / 86400
+        weight = 0.5 ** (age_days / HALF_LIFE_DAYS)
+        return prior + (row['pass_rate'] - prior) * weight
+
+    def plan(self, searches: List[SearchKey], budget: int = SCRAPE_BUDGET,
+             now: Optional[datetime] = None) -> List[Tuple[str, str, int]]:
+        """Pick (search_type, term, results_wanted) for this hunt under `budget`."""
+        now = now or datetime.now()
+        known = self.stats()
+        rates = [r['pass_rate'] for r in known.values() if r['runs']]
+        prior = sorted(rates)[len(rates) // 2] if rates else 0.0
+
+        cold, stale, ranked = [], [], []
+        for key in searches:
+            row = known.get(key)
+            if row is None or not row['runs']:
+                cold.append(key)
+            elif (now - datetime.fromisoformat(row['last_run'])).days >= REPROBE_DAYS:
+                stale.append(key)
+            else:
+                ranked.append((self.effective_rate(row, prior, now), row['new_rate'], key))
+
+        plan = []
+        remaining = budget
+
+        def take(key: SearchKey, results: int) -> bool:
+            nonlocal remaining
+            results = min(results, remaining)
+            if results < MIN_RESULTS:
+                return False
+            plan.append((key[0], key[1], results))
+            remaining -= results
+            return True
+
+        for key in cold:
+            take(key, MAX_RESULTS)
+        for key in stale:
+            take(key, MIN_RESULTS)
+
+        ranked.sort(reverse=True)
+        best = ranked[0][0] if ranked and ranked[0][0] > 0 else 0.0
+        for rate, _, key in ranked:
+            share = rate / best if best else 0.0
+            if not take(key, max(MIN_RESULTS, round(MAX_RESULTS * share))):
+                break
+        return plan
+
+    def record(self, results: Dict[SearchKey, Dict[str, int]], requested: Dict[SearchKey, int]):
+        """Fold one hunt's per-search counters into the persistent stats."""
+        now = datetime.now().isoformat()
+        with self._transaction() as conn:
+            for key, run in results.items():
+                wanted = max(requested.get(key, MAX_RESULTS), 1)
+                pass_rate = run['passed'] / wanted
+                new_rate = run['new_jobs'] / wanted
+                conn.execute(
+                    "INSERT INTO search_terms (search_type, term, runs, rows, new_jobs, pre_filtered, "
+                    "scored, passed, yes, factory_ok, pass_rate, new_rate, last_results, last_run) "
+                    "VALUES (?, ?, 1, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(search_type, term) DO UPDATE SET "
+                    "runs = runs + 1, rows = rows + excluded.rows, "
+                    "new_jobs = new_jobs + excluded.new_jobs, "
+                    "pre_filtered = pre_filtered + excluded.pre_filtered, "
+                    "scored = scored + excluded.scored, passed = passed + excluded.passed, "
+                    "yes = yes + excluded.yes, factory_ok = factory_ok + excluded.factory_ok, "
+                    f"pass_rate = {EWMA_ALPHA} * excluded.pass_rate + {1 - EWMA_ALPHA} * pass_rate, "
+                    f"new_rate = {EWMA_ALPHA} * excluded.new_rate + {1 - EWMA_ALPHA} * new_rate, "
+                    "last_results = excluded.last_results, last_run = excluded.last_run",
+                    (key[0], key[1], run['rows'], run['new_jobs'], run['pre_filtered'],
+                     run['scored'], run['passed'], run['yes'], run['factory_ok'],
+                     pass_rate, new_rate, wanted, now),
+                )
+
+    # ---------- high-water marks ----------
+
+    def scrape_window(self, site: str, query: str, location: str,
+                      now: Optional[datetime] = None) -> int:
+        """hours_old to request: time since the last successful scrape plus
+        OVERLAP_HOURS, or the full window when there is no mark or a sweep is due."""
+        now = now or datetime.now()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_success, last_full FROM scrape_watermarks "
+                "WHERE site = ? AND query = ? AND location = ?", (site, query, location)
+            ).fetchone()
+        if row is None or not row['last_full']:
+            return FULL_WINDOW_HOURS
+        if (now - datetime.fromisoformat(row['last_full'])).total_seconds() >= FULL_SWEEP_HOURS * 3600:
+            return FULL_WINDOW_HOURS
+        since = (now - datetime.fromisoformat(row['last_success'])).total_seconds() / 3600
+        return max(1, min(FULL_WINDOW_HOURS, math.ceil(since + OVERLAP_HOURS)))
+
+    def mark_scraped(self, site: str, query: str, location: str, started: datetime,
+                     hours_old: int, rows: int, results_wanted: int):
+        """Advance the mark after a successful scrape and add it to the run report.
+
+        A scrape that hit results_wanted may have stopped before the oldest
+        postings in its window, so it leaves the mark where it was and the
+        next scrape asks for the same hours again.
+        """
+        full = hours_old >= FULL_WINDOW_HOURS
+        truncated = rows >= results_wanted
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT full_rows FROM scrape_watermarks WHERE site = ? AND query = ? AND location = ?",
+                (site, query, location),
+            ).fetchone()
+            full_rows = rows if full else (row['full_rows'] if row else rows)
+            if not truncated:
+                conn.execute(
+                    "INSERT INTO scrape_watermarks (site, query, location, last_success, last_full, full_rows) "
+                    "VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(site, query, location) DO UPDATE SET "
+                    "last_success = excluded.last_success, "
+                    "last_full = COALESCE(excluded.last_full, last_full), full_rows = excluded.full_rows",
+                    (site, query, location, started.isoformat(), started.isoformat() if full else None,
+                     full_rows),
+                )
+
+        # Savings vs. a full-window scrape of the same search (estimated from
+        # the rows the last full sweep returned, capped by results_wanted)
+        page = PAGE_SIZE.get(site, 100)
+        expected = min(results_wanted, full_rows)
+        report = self._scrape_report
+        with self._lock:
+            report['full' if full else 'incremental'] += 1
+            report['rows'] += rows
+            report['pages'] += max(1, math.ceil(rows / page))
+            if not full:
+                report['rows_saved'] += max(0, expected - rows)
+                report['pages_saved'] += max(0, math.ceil(expected / page) - max(1, math.ceil(rows / page)))
+                report['hours_requested'] += hours_old
+
+    def scrape_report(self, reset: bool = False) -> Dict[str, float]:
+        """Per-run scrape counters (full/incremental searches, rows and pages fetched/saved)."""
+        with self._lock:
+            report = dict(self._scrape_report)
+            if reset:
+                self._scrape_report = new_scrape_report()
+        return report
+
+    def reset(self):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM search_terms")
+            conn.execute("DELETE FROM scrape_watermarks")
+
+
+_scheduler: Optional[SearchScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> SearchScheduler:
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = SearchScheduler()
+    return _scheduler
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Adaptive search-term scheduler")
+    parser.add_argument("--stats", action="store_true", help="Print per-term yield stats")
+    parser.add_argument("--reset", action="store_true", help="Forget all term stats and scrape marks")
+    args = parser.parse_args()
+
+    scheduler = get_scheduler()
+    if args.reset:
+        scheduler.reset()
+        print("Search term stats cleared")
+    else:
+        rows = sorted(scheduler.stats().values(), key=lambda r: r['pass_rate'], reverse=True)
+        print(f"{'type':<16}{'term':<32}{'runs':>5}{'new':>6}{'pre':>6}{'pass':>6}{'yes':>5}"
+              f"{'fact':>6}{'pass/res':>10}{'new/res':>9}  last run")
+        for r in rows:
+            print(f"{r['search_type']:<16}{r['term'][:31]:<32}{r['runs']:>5}{r['new_jobs']:>6}"
+                  f"{r['pre_filtered']:>6}{r['passed']:>6}{r['yes']:>5}{r['factory_ok']:>6}"
+                  f"{r['pass_rate']:>10.3f}{r['new_rate']:>9.3f}  {(r['last_run'] or '')[:16]}")
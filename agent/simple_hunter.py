@@ -11,29 +11,41 @@ Usage:
 """
 
 import os
+import re
+import sys
 import json
 import time
+import queue
 import logging
+import threading
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 import requests
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 
-# Job scraping
-from jobspy import scrape_jobs
 import pandas as pd
 
 # Scoring
-from scorer import score_job, pre_filter_job, is_duplicate
+from scorer import (score_job_async, score_jobs_batch_async, get_engine, gemini_usage, error_result,
+                    is_score_error, get_score_cache, score_cache_stats, pre_filter_titles,
+                    get_relevance_model, relevance_stats)
+
+# Queue store (shared with the applier and orchestrator)
+sys.path.insert(0, '/root/job_bot')
+from queue_store import add_job, get_store, get_skipped_log
+from dedup_index import description_simhash, get_index, job_hash, url_key
+from artifact_index import get_artifact_index
+from factory_dispatcher import FACTORY_MAX_IN_FLIGHT, FACTORY_RATE_PER_MIN, dispatch_jobs
+from prompt_assembly import format_prompt_report, get_prompt_stats
+from search_scheduler import FULL_WINDOW_HOURS, SCRAPE_BUDGET, get_scheduler, new_run_stats
+from scrape_backend import get_backend, set_backend
 
 # ============================================
 # CONFIGURATION
 # ============================================
 
-# API endpoint
-N8N_WEBHOOK_URL = os.getenv('N8N_WEBHOOK_URL', 'http://localhost:5678/webhook/incoming-job')
-
 # Search settings
 SEARCH_TERMS = [
     # Core IT Support (strongest match)
@@ -79,10 +91,15 @@ SEARCH_TERMS = [
 LOCATION = 'Anaheim, CA'
 DISTANCE_MILES = 35  # Search radius in miles
 RESULTS_PER_SEARCH = 50  # Get more results per term, dedup handles overlap
-HOURS_OLD = 72  # Jobs posted in last 72 hours
+ADAPTIVE_SEARCH = True  # Let search_scheduler pick terms + depth under HUNTER_SCRAPE_BUDGET
+HOURS_OLD = FULL_WINDOW_HOURS  # Jobs posted in last 72 hours (full sweep)
+INCREMENTAL_SCRAPE = True  # Only ask for hours since each search's last successful scrape
 MAX_JOBS_TOTAL = 50  # Stop after this many jobs sent to factory
-PARALLEL_SEARCHES = 3  # Number of concurrent JobSpy searches (VPS has 3 cores)
-PARALLEL_SCORING = 20  # Number of concurrent job scoring calls
+PARALLEL_SEARCHES = 3  # Concurrent searches; per-site caps + process pool in scrape_backend
+SCORING_BATCH_SIZE = 8  # Jobs per Gemini request (1 = one request per job)
+NEAR_DUP_SIMILARITY = 0.95  # SimHash bit agreement that counts as the same description (>= 0.89)
+NEAR_DUP_RETENTION_DAYS = 30  # Forget description clusters older than this
+MAX_SCORE_ATTEMPTS = 3  # Hunts a job is retried in after Gemini errors before it is skipped
 
 # Remote settings (ratio disabled - keep all remote jobs)
 REMOTE_RATIO = 1.0  # Set to 1.0 to accept ALL remote jobs (no filtering)
@@ -90,16 +107,37 @@ INCLUDE_REMOTE_SEARCHES = True  # Add "remote" suffix searches on Indeed
 INCLUDE_LINKEDIN = False  # Disabled - LinkedIn doesn't return descriptions reliably
 
 # Paths
-OUTPUT_DIR = Path('./output')
+OUTPUT_DIR = Path('/root/job_bot/agent/output')  # Absolute: also run in-process by the orchestrator
 STATS_FILE = OUTPUT_DIR / '.counter.json'
 LOG_FILE = OUTPUT_DIR / 'applications.csv'
 QUEUE_DIR = Path('/root/job_bot/queue')
-SKIPPED_FILE = QUEUE_DIR / 'skipped.json'
 
-# Rate limiting
-DELAY_BETWEEN_JOBS = 10  # seconds
+# Rate limiting (factory pacing lives in factory_dispatcher: FACTORY_RATE_PER_MIN)
 DELAY_BETWEEN_SEARCHES = 5  # seconds between search queries
 
+# ============================================
+# RESULT
+# ============================================
+
+@dataclass
+class HuntResult:
+    """What one run_hunt() did - returned to the orchestrator instead of parsed from stdout."""
+    dry_run: bool
+    scored: int = 0
+    passed: int = 0
+    skipped: int = 0
+    sent_to_factory: int = 0
+    pre_filtered: int = 0
+    deduped: int = 0
+    score_errors: int = 0
+    llm_cost: float = 0.0
+    duration: float = 0.0
+
+    @property
+    def processed(self) -> int:
+        """Jobs that reached the pending queue (live) or passed scoring (dry run)."""
+        return self.passed if self.dry_run else self.sent_to_factory
+
 # ============================================
 # LOGGING
 # ============================================
@@ -129,47 +167,33 @@ def save_stats(stats: Dict):
     with open(STATS_FILE, 'w') as f:
         json.dump(stats, f, indent=2)
 
-def is_remote(job: pd.Series) -> bool:
-    """Check if job is remote"""
-    keywords = ['remote', 'work from home', 'wfh', 'anywhere']
-    text = f"{job.get('title', '')} {job.get('description', '')} {job.get('location', '')}".lower()
-    return any(kw in text for kw in keywords)
+REMOTE_KEYWORDS = ['remote', 'work from home', 'wfh', 'anywhere']
+
+def remote_flags(jobs: pd.DataFrame) -> pd.Series:
+    """Vectorized remote check over title + description + location"""
+    text = (jobs['title'] + ' ' + jobs['description'] + ' ' + jobs['location']).str.lower()
+    return text.str.contains('|'.join(re.escape(kw) for kw in REMOTE_KEYWORDS), regex=True)
 
-def should_apply(job: pd.Series, stats: Dict) -> bool:
-    """Apply ratio logic - disabled when REMOTE_RATIO >= 1.0"""
+def remote_quota_full(stats: Dict) -> bool:
+    """Apply ratio logic - True when new remote jobs should be dropped.
+    Disabled when REMOTE_RATIO >= 1.0"""
     # If ratio is 1.0 or higher, accept all jobs (no filtering)
     if REMOTE_RATIO >= 1.0:
-        return True
+        return False
 
     if stats['total'] == 0:
-        return True
+        return False
 
     current_remote_ratio = stats['remote'] / stats['total']
-
-    if is_remote(job):
-        return current_remote_ratio < REMOTE_RATIO
-
-    return True
+    return current_remote_ratio >= REMOTE_RATIO
 
 # ============================================
 # SKIPPED JOBS LOG
 # ============================================
 
-def load_skipped() -> list:
-    if SKIPPED_FILE.exists():
-        try:
-            return json.loads(SKIPPED_FILE.read_text())
-        except (json.JSONDecodeError, ValueError):
-            return []
-    return []
-
-def save_skipped(skipped: list):
-    SKIPPED_FILE.write_text(json.dumps(skipped, indent=2))
-
-def log_skipped_job(job: pd.Series, score_result: dict):
-    """Log a skipped job to skipped.json for review"""
-    skipped = load_skipped()
-    skipped.append({
+def log_skipped_job(job: dict, score_result: dict):
+    """Log a skipped job to the skipped queue for review (buffered, flushed in batches)"""
+    get_skipped_log().add({
         'title': str(job.get('title', 'Unknown')),
         'company': str(job.get('company', 'Unknown')),
         'location': str(job.get('location', '')),
@@ -179,65 +203,37 @@ def log_skipped_job(job: pd.Series, score_result: dict):
         'reason': score_result.get('reason', ''),
         'skipped_at': datetime.now().isoformat(),
     })
-    save_skipped(skipped)
-
-# ============================================
-# N8N INTEGRATION
-# ============================================
 
-def clean_description(desc: str) -> str:
-    """Clean job description for n8n - normalize whitespace and fix escapes"""
-    if not desc:
-        return ""
-    # Fix escaped markdown characters
-    desc = desc.replace('\\-', '-').replace('\\*', '*').replace('\\_', '_')
-    # Normalize all whitespace to single spaces (fixes n8n JSON parsing issues)
-    desc = ' '.join(desc.split())
-    return desc[:3000]  # Truncate to 3000 chars
-
-def send_to_factory(job: pd.Series) -> Dict:
-    """Send job to n8n and get back PDF info"""
-    import urllib.request
-
-    payload = {
-        'title': str(job.get('title', 'Unknown')),
-        'company': str(job.get('company', 'Unknown')),
-        'description': clean_description(str(job.get('description', ''))),
-        'url': str(job.get('job_url', '')),
-        'location': str(job.get('location', ''))
-    }
-
-    try:
-        logger.info(f"  Sending to factory: {payload['company']} - {payload['title']}")
-
-        data = json.dumps(payload).encode('utf-8')
-        req = urllib.request.Request(
-            N8N_WEBHOOK_URL,
-            data=data,
-            headers={'Content-Type': 'application/json'}
-        )
-
-        with urllib.request.urlopen(req, timeout=120) as response:
-            result_text = response.read().decode('utf-8')
-            if result_text:
-                result = json.loads(result_text)
-                logger.info(f"  Factory success: Application #{result.get('application_number')}")
-                return result
-            else:
-                logger.error(f"  Factory error: Empty response")
-                return None
-
-    except Exception as e:
-        logger.error(f"  Connection failed: {e}")
-        return None
+def log_skipped_jobs(jobs: pd.DataFrame, reasons: pd.Series, prefix: str = 'Pre-filter'):
+    """Log pre-filter (or near-duplicate) rejects to the skipped queue in one batch"""
+    now = datetime.now().isoformat()
+    get_skipped_log().extend([{
+        'title': title,
+        'company': company,
+        'location': location,
+        'url': url,
+        'score': 0,
+        'recommendation': 'NO',
+        'reason': f'{prefix}: {reason}',
+        'skipped_at': now,
+    } for title, company, location, url, reason in zip(
+        jobs['title'], jobs['company'], jobs['location'], jobs['job_url'], reasons)])
 
 # ============================================
 # JOB SCRAPER
 # ============================================
 
-def search_jobs(search_term: str, location: str) -> pd.DataFrame:
-    """Scrape jobs from Indeed with Easy Apply"""
-    logger.info(f"Searching: '{search_term}' in '{location}'")
+def scrape_jobs(**kwargs) -> pd.DataFrame:
+    """jobspy.scrape_jobs, imported on the first search: commands that never
+    scrape (--stats, dry runs, the orchestrator's imports) skip jobspy's import."""
+    from jobspy import scrape_jobs as jobspy_scrape_jobs
+    return jobspy_scrape_jobs(**kwargs)
+
+
+def search_jobs(search_term: str, location: str, results_wanted: int = RESULTS_PER_SEARCH,
+                hours_old: int = HOURS_OLD) -> Optional[pd.DataFrame]:
+    """Scrape jobs from Indeed with Easy Apply. None if the scrape failed."""
+    logger.info(f"Searching: '{search_term}' in '{location}' (last {hours_old}h)")
 
     try:
         jobs = scrape_jobs(
@@ -245,8 +241,8 @@ def search_jobs(search_term: str, location: str) -> pd.DataFrame:
             search_term=search_term,
             location=location,
             distance=DISTANCE_MILES,
-            results_wanted=RESULTS_PER_SEARCH,
-            hours_old=HOURS_OLD,
+            results_wanted=results_wanted,
+            hours_old=hours_old,
             country_indeed='USA',
             easy_apply=True
         )
@@ -256,13 +252,14 @@ def search_jobs(search_term: str, location: str) -> pd.DataFrame:
 
     except Exception as e:
         logger.error(f"   Search failed: {e}")
-        return pd.DataFrame()
+        return None
 
 
-def search_remote_indeed(search_term: str) -> pd.DataFrame:
+def search_remote_indeed(search_term: str, results_wanted: int = RESULTS_PER_SEARCH,
+                         hours_old: int = HOURS_OLD) -> Optional[pd.DataFrame]:
     """Search Indeed for remote jobs (without easy_apply to allow is_remote)"""
     remote_term = f"{search_term} remote"
-    logger.info(f"Searching remote: '{remote_term}'")
+    logger.info(f"Searching remote: '{remote_term}' (last {hours_old}h)")
 
     try:
         # Note: Can't use easy_apply with is_remote on Indeed
@@ -271,8 +268,8 @@ def search_remote_indeed(search_term: str) -> pd.DataFrame:
             site_name=["indeed"],
             search_term=remote_term,
             location="USA",  # Broader location for remote
-            results_wanted=RESULTS_PER_SEARCH,
-            hours_old=HOURS_OLD,
+            results_wanted=results_wanted,
+            hours_old=hours_old,
             country_indeed='USA',
             easy_apply=True  # Keep Easy Apply filter
         )
@@ -282,20 +279,21 @@ def search_remote_indeed(search_term: str) -> pd.DataFrame:
 
     except Exception as e:
         logger.error(f"   Remote search failed: {e}")
-        return pd.DataFrame()
+        return None
 
 
-def search_linkedin_remote(search_term: str) -> pd.DataFrame:
+def search_linkedin_remote(search_term: str, results_wanted: int = RESULTS_PER_SEARCH,
+                           hours_old: int = HOURS_OLD) -> Optional[pd.DataFrame]:
     """Search LinkedIn for remote jobs"""
-    logger.info(f"Searching LinkedIn remote: '{search_term}'")
+    logger.info(f"Searching LinkedIn remote: '{search_term}' (last {hours_old}h)")
 
     try:
         jobs = scrape_jobs(
             site_name=["linkedin"],
             search_term=search_term,
             location="USA",
-            results_wanted=RESULTS_PER_SEARCH,
-            hours_old=HOURS_OLD,
+            results_wanted=results_wanted,
+            hours_old=hours_old,
             is_remote=True,  # LinkedIn supports is_remote
             linkedin_fetch_description=True,  # Fetch full descriptions
         )
@@ -305,122 +303,361 @@ def search_linkedin_remote(search_term: str) -> pd.DataFrame:
 
     except Exception as e:
         logger.error(f"   LinkedIn search failed: {e}")
-        return pd.DataFrame()
+        return None
 
 
-def run_parallel_searches(search_list: List[tuple]) -> List[pd.DataFrame]:
-    """Run multiple searches in parallel using ThreadPoolExecutor"""
-    results = []
+def search_target(search_type: str, term: str) -> tuple:
+    """(site, query, location) actually sent to JobSpy - the high-water mark key."""
+    if search_type == 'indeed_local':
+        return ('indeed', term, LOCATION)
+    elif search_type == 'indeed_remote':
+        return ('indeed', f"{term} remote", 'USA')
+    return ('linkedin', term, 'USA')
 
-    def execute_search(search_tuple):
-        search_type, term = search_tuple
-        try:
-            if search_type == 'indeed_local':
-                return search_jobs(term, LOCATION)
-            elif search_type == 'indeed_remote':
-                return search_remote_indeed(term)
-            elif search_type == 'linkedin_remote':
-                return search_linkedin_remote(term)
-        except Exception as e:
-            logger.error(f"Search failed for {term}: {e}")
-            return pd.DataFrame()
 
-    logger.info(f"Running {len(search_list)} searches with {PARALLEL_SEARCHES} threads...")
-    start_time = time.time()
+def scrape_search(search_type: str, term: str, results_wanted: int, hours_old: int) -> Optional[pd.DataFrame]:
+    """One JobSpy search. Module-level so the process backend can run it in a worker."""
+    if search_type == 'indeed_local':
+        return search_jobs(term, LOCATION, results_wanted, hours_old)
+    elif search_type == 'indeed_remote':
+        return search_remote_indeed(term, results_wanted, hours_old)
+    elif search_type == 'linkedin_remote':
+        return search_linkedin_remote(term, results_wanted, hours_old)
+    return None
 
-    with ThreadPoolExecutor(max_workers=PARALLEL_SEARCHES) as executor:
-        futures = {executor.submit(execute_search, s): s for s in search_list}
-        for future in as_completed(futures):
-            try:
-                result = future.result()
-                if result is not None and not result.empty:
-                    results.append(result)
-            except Exception as e:
-                logger.error(f"Search error: {e}")
 
-    elapsed = time.time() - start_time
-    logger.info(f"Completed {len(search_list)} searches in {elapsed:.1f}s ({elapsed/len(search_list):.2f}s/search avg)")
-    return results
+def execute_search(search_tuple: tuple) -> pd.DataFrame:
+    """Run one (search_type, term[, results_wanted]) search. Never raises.
+
+    With INCREMENTAL_SCRAPE, asks only for the hours since this search last
+    succeeded (see search_scheduler) and advances its mark unless the scrape
+    was capped by results_wanted. The scrape itself runs on the scrape
+    backend under its site's rate limiter.
+    """
+    search_type, term = search_tuple[:2]
+    results_wanted = search_tuple[2] if len(search_tuple) > 2 else RESULTS_PER_SEARCH
+    target = search_target(search_type, term)
+    hours_old = get_scheduler().scrape_window(*target) if INCREMENTAL_SCRAPE else HOURS_OLD
+    started = datetime.now()
+    jobs = None
+    try:
+        jobs = get_backend().run(target[0], scrape_search, search_type, term, results_wanted, hours_old)
+    except Exception as e:
+        logger.error(f"Search failed for {term}: {e}")
+    if jobs is None:
+        return pd.DataFrame()
+    try:
+        get_scheduler().mark_scraped(*target, started, hours_old, len(jobs), results_wanted)
+    except Exception as e:
+        logger.warning(f"Could not record scrape mark for {term}: {e}")
+    return jobs
 
 # ============================================
 # MAIN LOOP
 # ============================================
 
-def load_queue(name: str) -> list:
-    path = QUEUE_DIR / f"{name}.json"
-    if path.exists():
-        try:
-            return json.loads(path.read_text())
-        except (json.JSONDecodeError, ValueError):
-            return []
-    return []
-
-def save_queue(name: str, data: list):
-    path = QUEUE_DIR / f"{name}.json"
-    path.write_text(json.dumps(data, indent=2))
-
-def get_seen_urls() -> set:
-    """Get all URLs already in any queue to avoid duplicates"""
-    seen = set()
-    for queue_name in ['pending', 'applied', 'failed', 'skipped']:
-        for job in load_queue(queue_name):
-            seen.add(job.get('url', ''))
-    return seen
-
-def score_single_job(job_data: dict) -> tuple:
-    """Score a single job. Returns (job_data, score_result) for parallel processing."""
+PHASE1_COLUMNS = {
+    'job_url': '',
+    'company': 'Unknown',
+    'title': 'Unknown',
+    'location': '',
+    'description': '',
+}
+
+class HuntDedup:
+    """One hunt's view of the persistent dedup index.
+
+    Phase 1 only reads the index, plus the keys this hunt has already taken
+    so that its searches still dedup against each other. A job's keys are
+    written by remember() once it lands in skipped, pending or unscored, and
+    never on a dry run: jobs a hunt found but did not queue (dry runs, over
+    the factory limit, failed factory calls) come back next hunt.
+    """
+
+    def __init__(self, index, dry_run: bool = False):
+        self.index = index
+        self.record = not dry_run
+        self.url_keys = set()
+        self.hashes = set()
+        self.reps: List[tuple] = []  # (simhash, url) cluster representatives taken this hunt
+
+    def take(self, jobs: List[dict]):
+        """Count jobs that skip phase 1 (carried from the unscored queue) as taken this hunt."""
+        self.url_keys.update(key for key in (url_key(job['job_url']) for job in jobs) if key)
+        self.hashes.update(job_hash(job['company'], job['title']) for job in jobs)
+
+    def remember(self, jobs: List[dict], near_dup_reps: bool = True):
+        """Record jobs that landed in a queue (job_url/company/title[/description])."""
+        if not self.record or not jobs:
+            return
+        self.index.add_urls(job['job_url'] for job in jobs)
+        self.index.add_hashes(job_hash(job['company'], job['title']) for job in jobs)
+        if near_dup_reps:
+            simhashes = ((description_simhash(job.get('description', '')), job['job_url']) for job in jobs)
+            self.index.add_simhashes((h, url) for h, url in simhashes if h is not None)
+
+def build_jobs_to_score(jobs: pd.DataFrame, stats: Dict, dedup: HuntDedup) -> tuple:
+    """Phase 1 as a columnar pipeline (no per-row Series).
+
+    normalize -> URL dedup -> company+title dedup -> vectorized pre-filter
+    -> remote flag + ratio gate -> near-duplicate descriptions. Pre-filter and
+    near-duplicate rejects are logged to skipped in one batch each (and
+    remembered); survivors are only taken for this hunt.
+
+    Returns (jobs_to_score, counts) where jobs_to_score is a list of dicts
+    with job_url/company/title/location/description/is_remote.
+    """
+    counts = {'rows': len(jobs), 'url_dupes': 0, 'deduped': 0, 'pre_filtered': 0, 'ratio_skipped': 0,
+              'near_dupes': 0}
+    if jobs.empty:
+        return [], counts
+
+    # Vectorized string normalization (same values str() gave per row)
+    df = pd.DataFrame(index=jobs.index)
+    for col, default in PHASE1_COLUMNS.items():
+        df[col] = jobs[col].map(str) if col in jobs else default
+
+    # URL dedup: within this hunt, then against every previous run
+    before = len(df)
+    df['url_key'] = df['job_url'].map(url_key)
+    df = df.drop_duplicates(subset='url_key', keep='first')
+    unseen = dedup.index.unseen_urls(df['job_url'])
+    df = df[(df['url_key'] == '') | (df['job_url'].isin(unseen) & ~df['url_key'].isin(dedup.url_keys))]
+    dedup.url_keys.update(key for key in df['url_key'] if key)
+    counts['url_dupes'] = before - len(df)
+
+    # Company+title dedup (catches Multi-Comm etc.): this hunt, then persistent index
+    before = len(df)
+    df['hash'] = [job_hash(company, title) for company, title in zip(df['company'], df['title'])]
+    df = df.drop_duplicates(subset='hash', keep='first')
+    already_seen = dedup.index.seen_hashes(df['hash']) | (set(df['hash']) & dedup.hashes)
+    df = df[~df['hash'].isin(already_seen)]
+    dedup.hashes.update(df['hash'])
+    counts['deduped'] = before - len(df)
+
+    # Pre-filter: one vectorized regex pass before wasting API calls
+    reasons = pre_filter_titles(df['title'])
+    rejected = reasons.notna()
+    counts['pre_filtered'] = int(rejected.sum())
+    if counts['pre_filtered']:
+        log_skipped_jobs(df[rejected], reasons[rejected])
+        dedup.remember(df.loc[rejected, ['job_url', 'company', 'title']].to_dict('records'),
+                       near_dup_reps=False)
+    df = df[~rejected].copy()
+
+    # Remote flag as a column + 75/25 ratio gate
+    df['is_remote'] = remote_flags(df)
+    if remote_quota_full(stats):
+        counts['ratio_skipped'] = int(df['is_remote'].sum())
+        df = df[~df['is_remote']]
+
+    # Near-duplicate descriptions (agency reposts, multi-location clones):
+    # the first posting of a cluster is scored, the rest never reach the LLM
+    simhashes = [(description_simhash(desc), url) for desc, url in zip(df['description'], df['job_url'])]
+    simhashes = [(h, url) for h, url in simhashes if h is not None]
+    if simhashes:
+        max_distance = round(64 * (1 - NEAR_DUP_SIMILARITY))
+        clones = dedup.index.near_dupes(simhashes, max_distance, dedup.reps)
+        if clones:
+            is_clone = df['job_url'].isin(clones)
+            counts['near_dupes'] = int(is_clone.sum())
+            log_skipped_jobs(df[is_clone], df.loc[is_clone, 'job_url'].map(clones), 'Near-duplicate of')
+            dedup.remember(df.loc[is_clone, ['job_url', 'company', 'title']].to_dict('records'),
+                           near_dup_reps=False)
+            df = df[~is_clone]
+
+    jobs_to_score = df[list(PHASE1_COLUMNS) + ['is_remote']].to_dict('records')
+    return jobs_to_score, counts
+
+def _score_payload(job_data: dict, job_id: str = None) -> dict:
+    payload = {
+        'company': job_data['company'],
+        'title': job_data['title'],
+        'location': job_data['location'],
+        'description': job_data['description'][:3000],
+    }
+    if job_id is not None:
+        payload['id'] = job_id
+    return payload
+
+async def score_job_batch_async(batch: list) -> list:
+    """Score a batch of jobs in one Gemini request. Returns [(job_data, score_result), ...].
+
+    Runs on the scorer's engine loop. A job Gemini could not score gets an
+    error_result() (recommendation ERROR), never a made-up verdict.
+    """
     try:
-        score_result = score_job({
-            'company': job_data['company'],
-            'title': job_data['title'],
-            'location': job_data['location'],
-            'description': job_data['description'][:3000],
-        })
-        return (job_data, score_result)
+        if len(batch) == 1:
+            return [(batch[0], await score_job_async(_score_payload(batch[0])))]
+        scored = await score_jobs_batch_async(
+            [_score_payload(job_data, str(i)) for i, job_data in enumerate(batch)], batch_size=len(batch))
+        return [(job_data, scored[str(i)]) for i, job_data in enumerate(batch)]
     except Exception as e:
-        logger.error(f"Error scoring {job_data.get('title', 'Unknown')}: {e}")
-        return (job_data, {'score': 5, 'recommendation': 'MAYBE', 'reason': f'Error: {e}'})
+        logger.error(f"Error scoring batch of {len(batch)}: {e}")
+        # Unexpected (locked cache DB, bug): retry next hunt; MAX_SCORE_ATTEMPTS decides when to give up
+        return [(job_data, error_result(str(e), transient=True)) for job_data in batch]
 
-def run_parallel_scoring(jobs_to_score: list) -> list:
-    """Score multiple jobs in parallel. Returns list of (job_data, score_result) tuples."""
-    results = []
-    total = len(jobs_to_score)
+def submit_score_batch(batch: list):
+    """Schedule a batch on the Gemini engine; returns a concurrent.futures.Future."""
+    return get_engine().call(score_job_batch_async(batch))
 
-    logger.info(f"Scoring {total} jobs with {PARALLEL_SCORING} parallel threads...")
+def iter_parallel_scoring(jobs_to_score: list, batch_size: int = None):
+    """Score multiple jobs concurrently, yielding (job_data, score_result) as each batch finishes.
 
-    with ThreadPoolExecutor(max_workers=PARALLEL_SCORING) as executor:
-        future_to_job = {executor.submit(score_single_job, job): job for job in jobs_to_score}
+    With batch_size > 1, each request scores a batch of jobs. Concurrency is
+    the Gemini engine's adaptive limit.
+    """
+    batch_size = SCORING_BATCH_SIZE if batch_size is None else max(batch_size, 1)
+    total = len(jobs_to_score)
 
-        completed = 0
-        for future in as_completed(future_to_job):
-            completed += 1
-            try:
-                job_data, score_result = future.result()
-                results.append((job_data, score_result))
+    if batch_size > 1:
+        batches = [jobs_to_score[i:i + batch_size] for i in range(0, total, batch_size)]
+        logger.info(f"Scoring {total} jobs in {len(batches)} batches of {batch_size} "
+                    f"(Gemini concurrency {get_engine().limiter.limit}, adaptive)...")
+    else:
+        batches = [[job] for job in jobs_to_score]
+        logger.info(f"Scoring {total} jobs (Gemini concurrency {get_engine().limiter.limit}, adaptive)...")
 
-                # Log progress
-                rec = score_result.get('recommendation', 'MAYBE')
-                score = score_result.get('score', 5)
-                logger.info(f"[{completed}/{total}] {job_data['company'][:20]} - {job_data['title'][:30]} | {score}/10 {rec}")
-            except Exception as e:
-                logger.error(f"Scoring failed: {e}")
+    futures = [submit_score_batch(batch) for batch in batches]
+    completed = 0
+    for future in as_completed(futures):
+        try:
+            batch_results = future.result()
+        except Exception as e:
+            logger.error(f"Scoring failed: {e}")
+            continue
+        for job_data, score_result in batch_results:
+            completed += 1
 
-    return results
+            # Log progress
+            rec = score_result.get('recommendation', 'MAYBE')
+            score = score_result.get('score', 5)
+            logger.info(f"[{completed}/{total}] {job_data['company'][:20]} - {job_data['title'][:30]} | {score}/10 {rec}")
+            yield job_data, score_result
 
-def run_hunt(dry_run=False, max_factory=None):
+def run_parallel_scoring(jobs_to_score: list, batch_size: int = None) -> list:
+    """Score multiple jobs in parallel. Returns list of (job_data, score_result) tuples."""
+    return list(iter_parallel_scoring(jobs_to_score, batch_size))
+
+def iter_streaming_scores(search_list: List[tuple], stats: Dict, dedup: HuntDedup, counts: Dict,
+                          batch_size: int = None, carried: List[dict] = None):
+    """Producer/consumer hunt pipeline: scrape, phase 1 and scoring overlap.
+
+    Each search DataFrame goes through build_jobs_to_score() the moment it
+    finishes (`dedup`, a HuntDedup, catches duplicates across searches),
+    and its survivors are submitted to the scoring pool in batches while other
+    searches are still running. Yields (job_data, score_result) as batches
+    finish. `counts` accumulates the phase 1 counters plus timings, and
+    counts['by_search'][(search_type, term)] the per-search yield counters
+    (job_data['search'] carries the same key for later attribution).
+    `carried` jobs (already through phase 1, e.g. left unscored by Gemini
+    errors last hunt) are scored first.
+    """
+    batch_size = SCORING_BATCH_SIZE if batch_size is None else max(batch_size, 1)
+    for key in ('rows', 'url_dupes', 'deduped', 'pre_filtered', 'ratio_skipped', 'near_dupes', 'queued', 'scored'):
+        counts.setdefault(key, 0)
+    counts.setdefault('phase1_seconds', 0.0)
+    by_search = counts.setdefault('by_search', {})
+    start_time = time.time()
+    buffer = list(carried or [])  # Survivors waiting for a full scoring batch
+    for job in buffer:
+        by_search.setdefault(job['search'], new_run_stats())
+
+    logger.info(f"Streaming {len(search_list)} searches ({PARALLEL_SEARCHES} threads) into scoring "
+                f"(Gemini concurrency {get_engine().limiter.limit}, adaptive, batches of {batch_size})...")
+
+    with ThreadPoolExecutor(max_workers=PARALLEL_SEARCHES) as search_pool:
+        search_of = {search_pool.submit(execute_search, s): tuple(s[:2]) for s in search_list}
+        searches = set(search_of)
+        scoring = set()
+
+        def submit(batch):
+            counts['queued'] += len(batch)
+            scoring.add(submit_score_batch(batch))
+
+        while len(buffer) >= batch_size or (buffer and not searches):
+            submit(buffer[:batch_size])
+            del buffer[:batch_size]
+
+        while searches or scoring:
+            done, _ = wait(searches | scoring, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in searches:
+                    searches.discard(future)
+                    try:
+                        frame = future.result()
+                    except Exception as e:
+                        logger.error(f"Search error: {e}")
+                        continue
+                    if frame is None or frame.empty:
+                        continue
+                    phase1_start = time.time()
+                    jobs, frame_counts = build_jobs_to_score(frame, stats, dedup)
+                    counts['phase1_seconds'] += time.time() - phase1_start
+                    for key, value in frame_counts.items():
+                        counts[key] += value
+                    search_key = search_of[future]
+                    yields = by_search.setdefault(search_key, new_run_stats())
+                    yields['rows'] += frame_counts['rows']
+                    yields['new_jobs'] += (frame_counts['rows'] - frame_counts['url_dupes']
+                                           - frame_counts['deduped'] - frame_counts['near_dupes'])
+                    yields['pre_filtered'] += frame_counts['pre_filtered']
+                    for job in jobs:
+                        job['search'] = search_key
+                    buffer.extend(jobs)
+                    while len(buffer) >= batch_size:
+                        submit(buffer[:batch_size])
+                        del buffer[:batch_size]
+                    if not searches:
+                        counts['scrape_seconds'] = time.time() - start_time
+                        logger.info(f"All searches done in {counts['scrape_seconds']:.1f}s "
+                                    f"({counts['rows']} rows, {counts['queued'] + len(buffer)} to score)")
+                else:
+                    scoring.discard(future)
+                    try:
+                        batch_results = future.result()
+                    except Exception as e:
+                        logger.error(f"Scoring failed: {e}")
+                        continue
+                    for job_data, score_result in batch_results:
+                        counts['scored'] += 1
+                        rec = score_result.get('recommendation', 'MAYBE')
+                        score = score_result.get('score', 5)
+                        logger.info(f"[{counts['scored']}/{counts['queued']}] {job_data['company'][:20]} - "
+                                    f"{job_data['title'][:30]} | {score}/10 {rec}")
+                        yield job_data, score_result
+            # Scrape finished: the last partial batch need not wait any longer
+            if not searches and buffer:
+                submit(buffer)
+                buffer = []
+
+    counts.setdefault('scrape_seconds', time.time() - start_time)
+    counts['total_seconds'] = time.time() - start_time
+
+def run_hunt(dry_run=False, max_factory=None, on_pending=None) -> HuntResult:
     """Main hunting loop.
 
     Args:
         dry_run: If True, scrape and score only — do NOT send to n8n factory.
                  Saves passing jobs to queue/dry_run.json for review.
         max_factory: Override MAX_JOBS_TOTAL for how many jobs to send to factory.
+        on_pending: Optional callback(queue_entry), called from the factory
+                    thread each time a job lands in the pending queue.
     """
+    hunt_start = time.time()
     factory_limit = max_factory if max_factory is not None else MAX_JOBS_TOTAL
     OUTPUT_DIR.mkdir(exist_ok=True)
     QUEUE_DIR.mkdir(exist_ok=True)
     Path('/root/job_bot/logs').mkdir(exist_ok=True)
     stats = load_stats()
-    seen_urls = get_seen_urls()
+    index = get_index()  # Persistent URL + company/title index (no queue scan)
+    index.prune_near_dupes(NEAR_DUP_RETENTION_DAYS)
+    dedup = HuntDedup(index, dry_run)
+    get_score_cache().reset_stats()  # Hit-rate is reported per hunt
+    gemini_usage(reset=True)  # Token/cost ledger is reported per hunt
+    get_prompt_stats().report(reset=True)
+    relevance = get_relevance_model()  # Local tier; retrained from our verdicts once a day
+    relevance_stats(reset=True)
 
     # Ensure stats has scoring counters
     for key in ['scored_yes', 'scored_no', 'scored_maybe']:
@@ -436,15 +673,24 @@ def run_hunt(dry_run=False, max_factory=None):
     if not dry_run:
         logger.info(f"   Factory limit: {factory_limit}")
     logger.info(f"   Current stats: {stats}")
-    logger.info(f"   Already seen URLs: {len(seen_urls)}")
+    logger.info(f"   Dedup index: {index.count()} keys")
+    if relevance and relevance.threshold > 0:
+        report = relevance.report
+        logger.info(f"   Local tier: reject below P(yes)={relevance.threshold:.3f} "
+                    f"(held-out: {report.get('holdout_reject_rate', 0) * 100:.0f}% rejected, "
+                    f"{report.get('holdout_no_precision')} agree with LLM)")
+    else:
+        logger.info("   Local tier: off (not enough verdicts or no safe threshold)")
     logger.info("=" * 50)
 
     total_processed = 0
     total_scored = 0
     total_skipped = 0
     total_passed = 0
-    pending = load_queue('pending')
+    score_errors = []  # Jobs Gemini could not score - retried next hunt
     dry_run_results = []  # For dry run output
+    factory_scores = {}  # id(job_data) -> score_result for jobs handed to the factory
+    factory_elapsed = 0.0
 
     # Build list of all searches to run
     all_searches = []
@@ -473,155 +719,189 @@ def run_hunt(dry_run=False, max_factory=None):
         for term in linkedin_terms:
             all_searches.append(('linkedin_remote', term))
 
-    logger.info(f"Total searches to run: {len(all_searches)} (parallel: {PARALLEL_SEARCHES})")
-
-    # Run all searches in parallel
-    all_job_results = run_parallel_searches(all_searches)
-
-    # Combine all results into one dataframe
-    if all_job_results:
-        combined_jobs = pd.concat(all_job_results, ignore_index=True)
-        logger.info(f"Total jobs found: {len(combined_jobs)}")
+    if ADAPTIVE_SEARCH:
+        planned = get_scheduler().plan(all_searches, budget=SCRAPE_BUDGET)
+        logger.info(f"Search plan: {len(planned)}/{len(all_searches)} searches, "
+                    f"{sum(n for _, _, n in planned)} results (budget {SCRAPE_BUDGET}, "
+                    f"full run {len(all_searches) * RESULTS_PER_SEARCH})")
+        all_searches = planned
     else:
-        combined_jobs = pd.DataFrame()
-        logger.info("No jobs found")
+        all_searches = [(search_type, term, RESULTS_PER_SEARCH) for search_type, term in all_searches]
 
-    # === PHASE 1: Collect jobs to score (filter duplicates and ratio) ===
-    jobs_to_score = []
-    job_raw_data = {}  # Map job_url -> original job row for later processing
-
-    pre_filtered_count = 0
-    dedup_count = 0
-
-    for _, job in combined_jobs.iterrows():
-        job_url = str(job.get('job_url', ''))
-        company = str(job.get('company', 'Unknown'))
-        title = str(job.get('title', 'Unknown'))
-
-        # Skip URL duplicates
-        if job_url in seen_urls:
-            continue
-
-        # Skip company+title duplicates (catches Multi-Comm etc.)
-        if is_duplicate(company, title):
-            dedup_count += 1
-            continue
-
-        # Pre-filter: fast Python check before wasting API call
-        passes, reject_reason = pre_filter_job(title)
-        if not passes:
-            pre_filtered_count += 1
-            log_skipped_job(job, {
-                'score': 0, 'recommendation': 'NO',
-                'reason': f'Pre-filter: {reject_reason}'
-            })
-            seen_urls.add(job_url)
-            continue
+    logger.info(f"Total searches to run: {len(all_searches)} (parallel: {PARALLEL_SEARCHES})")
 
-        # Check 75/25 ratio
-        if not should_apply(job, stats):
-            continue
+    # === Streaming pipeline: search -> phase 1 -> scoring -> factory ===
+    # Each search is deduped/pre-filtered as soon as it returns and its survivors
+    # are scored while other searches run. Live runs dispatch each passing job to
+    # the factory as soon as it is scored, so pending entries (and an overlapping
+    # applier) start while later searches are still scraping and scoring.
+    phase1 = {}
+    last_id = 0
+
+    def enqueue_factory_result(job_data: dict, result: dict):
+        """Stream each finished factory job straight into the pending queue"""
+        nonlocal total_processed, last_id
+        score_result = factory_scores[id(job_data)]
+        phase1['by_search'][job_data['search']]['factory_ok'] += 1
+        stats['total'] += 1
+        if job_data['is_remote']:
+            stats['remote'] += 1
+        else:
+            stats['local'] += 1
+        total_processed += 1
 
-        # Prepare job data for scoring
-        job_data = {
-            'job_url': job_url,
-            'company': company,
-            'title': title,
-            'location': str(job.get('location', '')),
-            'description': str(job.get('description', '')),
+        # Millisecond ids, kept unique when several results land together
+        last_id = max(last_id + 1, int(time.time() * 1000))
+        queue_entry = {
+            'id': str(last_id),
+            'title': job_data['title'],
+            'company': job_data['company'],
+            'url': job_data['job_url'],
+            'location': job_data['location'],
+            'description': job_data['description'],  # Store for n8n resume factory
+            'application_number': str(result.get('application_number', '')),
+            'score': score_result.get('score', 5),
+            'recommendation': score_result.get('recommendation', 'MAYBE'),
+            'estimated_salary': score_result.get('estimated_salary', 'Unknown'),
+            'status': 'pending',
+            'created_at': datetime.now().isoformat(),
         }
-        jobs_to_score.append(job_data)
-        job_raw_data[job_url] = job
-        seen_urls.add(job_url)
+        add_job('pending', queue_entry)
+        dedup.remember([job_data])
+        try:
+            get_artifact_index().record_result(result)  # Applier finds the PDFs by application number
+        except Exception as e:
+            logger.warning(f"   Artifact index update failed: {e}")
+        logger.info(f"   Added to pending queue (#{result.get('application_number')})")
+        if on_pending:
+            on_pending(queue_entry)
 
-    logger.info(f"Pre-filtered (no API call): {pre_filtered_count}")
-    logger.info(f"Company+title deduped: {dedup_count}")
-    logger.info(f"Jobs to score (after dedup + pre-filter): {len(jobs_to_score)}")
-
-    # === PHASE 2: Parallel scoring ===
-    scored_results = run_parallel_scoring(jobs_to_score)
-
-    # === PHASE 3: Process scored results ===
-    for job_data, score_result in scored_results:
-        job_url = job_data['job_url']
-        company = job_data['company']
-        title = job_data['title']
-        original_job = job_raw_data.get(job_url)
-
-        recommendation = score_result.get('recommendation', 'MAYBE')
-        score = score_result.get('score', 5)
-        reason = score_result.get('reason', '')
-        total_scored += 1
-
-        # Skip jobs scored NO
-        if recommendation == "NO":
-            log_skipped_job(original_job, score_result)
-            stats['scored_no'] += 1
-            total_skipped += 1
-            continue
+    def run_factory():
+        try:
+            dispatch_jobs(iter(factory_feed.get, None), on_result=enqueue_factory_result, limit=factory_limit)
+        except Exception as e:
+            logger.error(f"Factory dispatcher failed: {e}")
 
-        # Track YES/MAYBE
-        total_passed += 1
-        if recommendation == "YES":
-            stats['scored_yes'] += 1
-        else:
-            stats['scored_maybe'] += 1
-
-        if dry_run:
-            # Dry run: log the result but don't send to factory
-            dry_run_results.append({
-                'title': title,
-                'company': company,
-                'url': job_url,
-                'location': job_data['location'],
-                'description': job_data['description'],  # Store for n8n resume factory
-                'score': score,
-                'recommendation': recommendation,
-                'reason': reason,
-                'estimated_salary': score_result.get('estimated_salary', 'Unknown'),
-                'scored_at': datetime.now().isoformat(),
-            })
-        else:
-            # Live run: send to factory (but limit to factory_limit)
-            if total_processed >= factory_limit:
-                continue
+    factory_feed = queue.Queue()  # Passing jobs; None marks the end of scoring
+    factory_thread = None
+    if not dry_run:
+        logger.info(f"Factory: up to {factory_limit} jobs ({FACTORY_MAX_IN_FLIGHT} in flight, "
+                    f"{FACTORY_RATE_PER_MIN:g}/min), dispatched as they pass scoring")
+        factory_start = time.time()
+        factory_thread = threading.Thread(target=run_factory, name='factory-dispatch', daemon=True)
+        factory_thread.start()
 
-            logger.info(f"Sending to factory: {company} - {title[:40]}")
-            result = send_to_factory(original_job)
+    carried = load_unscored()
+    dedup.take(carried)
+    if carried:
+        logger.info(f"Retrying {len(carried)} job(s) left unscored by Gemini errors")
 
-            if result:
-                stats['total'] += 1
-                if is_remote(original_job):
-                    stats['remote'] += 1
-                else:
-                    stats['local'] += 1
+    try:
+        for job_data, score_result in iter_streaming_scores(all_searches, stats, dedup, phase1, carried=carried):
+            job_url = job_data['job_url']
+            company = job_data['company']
+            title = job_data['title']
+
+            # Gemini errors are not verdicts: keep the job for the next hunt
+            if is_score_error(score_result):
+                score_errors.append((job_data, score_result))
+                continue
+            if 'score_attempts' in job_data:
+                # Carried from the unscored queue and now has a verdict - drop its row
+                get_store().remove(job_data, 'unscored')
+
+            recommendation = score_result.get('recommendation', 'MAYBE')
+            score = score_result.get('score', 5)
+            reason = score_result.get('reason', '')
+            total_scored += 1
+            search_yield = phase1['by_search'][job_data['search']]
+            search_yield['scored'] += 1
+
+            # Skip jobs scored NO
+            if recommendation == "NO":
+                log_skipped_job(job_data, score_result)
+                dedup.remember([job_data])
+                stats['scored_no'] += 1
+                total_skipped += 1
+                continue
 
-                total_processed += 1
+            # Track YES/MAYBE
+            total_passed += 1
+            search_yield['passed'] += 1
+            if recommendation == "YES":
+                stats['scored_yes'] += 1
+                search_yield['yes'] += 1
+            else:
+                stats['scored_maybe'] += 1
 
-                queue_entry = {
-                    'id': str(int(time.time() * 1000)),
+            if dry_run:
+                # Dry run: log the result but don't send to factory
+                dry_run_results.append({
                     'title': title,
                     'company': company,
                     'url': job_url,
                     'location': job_data['location'],
                     'description': job_data['description'],  # Store for n8n resume factory
-                    'application_number': str(result.get('application_number', '')),
                     'score': score,
                     'recommendation': recommendation,
+                    'reason': reason,
                     'estimated_salary': score_result.get('estimated_salary', 'Unknown'),
-                    'status': 'pending',
-                    'created_at': datetime.now().isoformat(),
-                }
-                pending.append(queue_entry)
-                save_queue('pending', pending)
-
-                logger.info(f"   Added to pending queue (#{result.get('application_number')})")
-
-            # Rate limiting between factory calls
-            time.sleep(DELAY_BETWEEN_JOBS)
-
-    # Save stats once at end
+                    'scored_at': datetime.now().isoformat(),
+                })
+            else:
+                # Live run: hand to the factory dispatcher (it enforces factory_limit)
+                factory_scores[id(job_data)] = score_result
+                factory_feed.put(job_data)
+    finally:
+        # Even if scoring dies, let the dispatcher finish the jobs it was fed
+        if factory_thread:
+            factory_feed.put(None)
+            factory_thread.join()
+            factory_elapsed = time.time() - factory_start
+    # Jobs still queued once the dispatcher stopped pulling (it hit factory_limit)
+    unsent = 0
+    while not factory_feed.empty():
+        unsent += factory_feed.get_nowait() is not None
+    if unsent:
+        logger.info(f"Factory limit ({factory_limit}) reached: {unsent} passing job(s) not sent, "
+                    f"they come back next hunt")
+
+    phase1_elapsed = phase1['phase1_seconds']
+    phase1_rate = phase1['rows'] / phase1_elapsed if phase1_elapsed > 0 else 0.0
+    pre_filtered_count = phase1['pre_filtered']
+    dedup_count = phase1['deduped']
+    logger.info(f"Total jobs found: {phase1['rows']}")
+    logger.info(f"Phase 1: {phase1['rows']} rows in {phase1_elapsed:.2f}s ({phase1_rate:,.0f} rows/s)")
+    logger.info(f"URL duplicates: {phase1['url_dupes']}")
+    logger.info(f"Pre-filtered (no API call): {pre_filtered_count}")
+    logger.info(f"Company+title deduped: {dedup_count}")
+    logger.info(f"Near-duplicate descriptions: {phase1['near_dupes']}")
+    logger.info(f"Queued for scoring: {phase1['queued']}; scrape took {phase1['scrape_seconds']:.1f}s, "
+                f"scrape+score {phase1['total_seconds']:.1f}s")
+    scrape = get_scheduler().scrape_report(reset=True)
+    logger.info(f"Scrape windows: {scrape['full']} full, {scrape['incremental']} incremental; "
+                f"{scrape['rows']} rows over ~{scrape['pages']} pages")
+    backend = get_backend()
+    meters = backend.report(reset=True)
+    scrape_meter = meters.pop(backend.kind, None)
+    if scrape_meter:
+        scrape_wall = phase1['scrape_seconds']
+        logger.info(f"Scrape backend '{backend.kind}': {scrape_meter['searches']} searches, "
+                    f"{scrape_meter['rows']} rows in {scrape_wall:.1f}s wall "
+                    f"({scrape_meter['rows'] / scrape_wall if scrape_wall > 0 else 0:.1f} rows/s, "
+                    f"{scrape_meter['busy_seconds']:.1f}s busy)")
+    for site, meter in sorted(meters.items()):
+        logger.info(f"   {site}: {meter['searches']} searches ({meter['failed']} failed), {meter['rows']} rows, "
+                    f"{meter['busy_seconds'] / max(meter['searches'], 1):.1f}s/search, "
+                    f"{meter['wait_seconds']:.1f}s waiting on the site limiter")
+
+    # Save stats, unscored jobs, remaining skipped entries and per-term yields once at end
     save_stats(stats)
+    requeue_unscored(score_errors)
+    dedup.remember([job_data for job_data, _ in score_errors])  # Now in unscored or skipped
+    get_skipped_log().flush()
+    get_scheduler().record(phase1.get('by_search', {}),
+                           {(search_type, term): n for search_type, term, n in all_searches})
 
     # Save dry run results
     if dry_run and dry_run_results:
@@ -635,8 +915,8 @@ def run_hunt(dry_run=False, max_factory=None):
     logger.info(f"   Skipped (NO): {total_skipped}")
     logger.info(f"   Passed (YES/MAYBE): {total_passed}")
     if not dry_run:
-        logger.info(f"   Sent to factory: {total_processed}")
-        logger.info(f"   Pending queue: {len(pending)} jobs")
+        logger.info(f"   Sent to factory: {total_processed} in {factory_elapsed:.0f}s")
+        logger.info(f"   Pending queue: {get_store().count('pending')} jobs")
     else:
         est_cost_low = total_passed * 0.30
         est_cost_high = total_passed * 0.60
@@ -645,19 +925,109 @@ def run_hunt(dry_run=False, max_factory=None):
         logger.info(f"   Then run live: python3 simple_hunter.py --max {total_passed}")
     logger.info(f"   Pre-filtered (saved API): {pre_filtered_count}")
     logger.info(f"   Company+title deduped: {dedup_count}")
+    if phase1['near_dupes']:
+        # Estimates: clones would have been scored in SCORING_BATCH_SIZE batches
+        # and passed at this run's rate
+        near_dupes = phase1['near_dupes']
+        pass_rate = total_passed / total_scored if total_scored else 0.0
+        logger.info(f"   Near-duplicates collapsed: {near_dupes} "
+                    f"(~{-(-near_dupes // SCORING_BATCH_SIZE)} LLM calls, "
+                    f"~{near_dupes * pass_rate:.0f} factory calls avoided)")
+    logger.info(f"   Phase 1 throughput: {phase1_rate:,.0f} rows/s ({phase1['rows']} rows)")
+    if scrape['incremental']:
+        logger.info(f"   Incremental scrape saved ~{scrape['rows_saved']:.0f} rows / "
+                    f"~{scrape['pages_saved']:.0f} pages "
+                    f"(avg window {scrape['hours_requested'] / scrape['incremental']:.0f}h vs {HOURS_OLD}h)")
+    local = relevance_stats()
+    if local['checked']:
+        logger.info(f"   Local tier: {local['rejected']}/{local['checked']} auto-rejected "
+                    f"(~{local['rejected']} LLM job scorings, "
+                    f"~{-(-local['rejected'] // SCORING_BATCH_SIZE)} requests saved)")
+    usage = gemini_usage()
+    logger.info(f"   Gemini: {usage['requests']} requests ({usage['retries']} retries, "
+                f"{usage['throttled']} throttled, {usage['failures']} failed), "
+                f"{usage['prompt_tokens']:,} in ({usage['cached_tokens']:,} cached) / "
+                f"{usage['output_tokens']:,} out tokens, ${usage['cost']:.4f}")
+    prompts = get_prompt_stats().report()
+    if prompts:
+        logger.info(f"   Prompt tokens billed at full rate: {format_prompt_report(prompts)}")
+    if score_errors:
+        logger.info(f"   Scoring errors (kept for next hunt, not NO): {len(score_errors)}")
+        config_errors = sum(1 for _, score_result in score_errors if score_result.get('config'))
+        if config_errors:
+            logger.warning(f"   {config_errors} of them failed on the Gemini setup (API key/permissions) - fix it")
+    cache_stats = score_cache_stats()
+    logger.info(f"   Score cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+                f"({cache_stats['hit_rate'] * 100:.0f}% hit rate, {cache_stats['size']} entries, "
+                f"{cache_stats['evictions']} evicted)")
     logger.info(f"   Scoring breakdown: YES={stats.get('scored_yes',0)} MAYBE={stats.get('scored_maybe',0)} NO={stats.get('scored_no',0)}")
     if stats['total'] > 0:
         logger.info(f"   Remote: {stats['remote']} ({stats['remote']/stats['total']*100:.1f}%)")
         logger.info(f"   Local:  {stats['local']} ({stats['local']/stats['total']*100:.1f}%)")
     logger.info("=" * 50)
 
-    return total_processed if not dry_run else total_passed
+    return HuntResult(
+        dry_run=dry_run,
+        scored=total_scored,
+        passed=total_passed,
+        skipped=total_skipped,
+        sent_to_factory=total_processed,
+        pre_filtered=pre_filtered_count,
+        deduped=dedup_count,
+        score_errors=len(score_errors),
+        llm_cost=usage['cost'],
+        duration=time.time() - hunt_start,
+    )
+
+def load_unscored() -> List[dict]:
+    """Jobs left unscored by Gemini errors in earlier hunts. Their rows stay in
+    the queue until each one gets a verdict (or is given up on), so a hunt that
+    dies mid-way doesn't lose them."""
+    jobs = get_store().load('unscored')
+    for job in jobs:
+        job['search'] = tuple(job['search'])
+    return jobs
+
+def requeue_unscored(errors: List[tuple]):
+    """Keep Gemini-error jobs for the next hunt; give up after MAX_SCORE_ATTEMPTS hunts,
+    or at once when retrying can't help that job. Config errors (bad API key) are not
+    the job's fault: they stay queued without using up an attempt.
+    Carried jobs (they have score_attempts) already have a row: it is updated or removed."""
+    store = get_store()
+    retry = []
+    for job_data, score_result in errors:
+        carried = 'score_attempts' in job_data
+        config = score_result.get('config', False)
+        attempts = job_data.get('score_attempts', 0) + (0 if config else 1)
+        if not config and (attempts >= MAX_SCORE_ATTEMPTS or not score_result.get('transient', True)):
+            log_skipped_job(job_data, score_result)
+            if carried:
+                store.remove(job_data, 'unscored')
+        elif carried:
+            store.update(job_data, 'unscored', score_attempts=attempts)
+        else:
+            retry.append({**job_data, 'url': job_data['job_url'], 'score_attempts': attempts})
+    if retry:
+        store.add_many('unscored', retry)
+
+def set_search_mode(remote_only: bool = False, local_only: bool = False):
+    """Restrict searches to remote or local jobs (CLI --remote-only / --local-only)"""
+    global INCLUDE_REMOTE_SEARCHES, INCLUDE_LINKEDIN
+    if remote_only:
+        INCLUDE_REMOTE_SEARCHES = True
+        INCLUDE_LINKEDIN = True
+        SEARCH_TERMS.clear()  # Lists can be modified in place
+        logger.info("Remote-only mode: searching only remote jobs")
+    elif local_only:
+        INCLUDE_REMOTE_SEARCHES = False
+        INCLUDE_LINKEDIN = False
+        logger.info("Local-only mode: no remote searches")
 
 def run_loop():
     while True:
         try:
-            processed = run_hunt()
-            time.sleep(1800 if processed == 0 else 900)
+            result = run_hunt()
+            time.sleep(1800 if result.processed == 0 else 900)
         except KeyboardInterrupt:
             break
         except Exception as e:
@@ -672,18 +1042,21 @@ if __name__ == '__main__':
     parser.add_argument('--max', type=int, default=None, help='Max jobs to send to factory (default: 50)')
     parser.add_argument('--remote-only', action='store_true', help='Only search for remote jobs')
     parser.add_argument('--local-only', action='store_true', help='Only search for local jobs (no remote searches)')
+    parser.add_argument('--all-terms', action='store_true', help='Run every search term at full depth (no adaptive scheduler)')
+    parser.add_argument('--full-sweep', action='store_true', help=f'Ignore scrape marks and ask for the full {HOURS_OLD}h window')
+    parser.add_argument('--scrape-backend', choices=['process', 'thread'], default=None,
+                        help='Run JobSpy in worker processes or in threads (default: HUNTER_SCRAPE_BACKEND)')
     args = parser.parse_args()
 
-    # Override remote settings based on flags (use global keyword)
-    if args.remote_only:
-        globals()['INCLUDE_REMOTE_SEARCHES'] = True
-        globals()['INCLUDE_LINKEDIN'] = True
-        SEARCH_TERMS.clear()  # Lists can be modified in place
-        logger.info("Remote-only mode: searching only remote jobs")
-    elif args.local_only:
-        globals()['INCLUDE_REMOTE_SEARCHES'] = False
-        globals()['INCLUDE_LINKEDIN'] = False
-        logger.info("Local-only mode: no remote searches")
+    if args.scrape_backend:
+        set_backend(args.scrape_backend)
+
+    if args.all_terms:
+        ADAPTIVE_SEARCH = False
+    if args.full_sweep:
+        INCREMENTAL_SCRAPE = False
+
+    set_search_mode(remote_only=args.remote_only, local_only=args.local_only)
 
     if args.loop:
         run_loop()
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Artifact Index - resume / cover letter PDFs by application number
+=================================================================
+The n8n factory writes <Company>_<application_number>_Resume.pdf and
+..._CoverLetter.pdf into /root/output. Finding a job's PDFs used to glob
+that directory (thousands of files) and stat every match, per job and per
+import. This index keeps one row per PDF in the queue store's SQLite file:
+
+    application_number, kind ('resume' / 'cover') -> filename, company,
+    size, mtime, sha256, created_at
+
+Rows are written when the factory returns (record_result()) and the
+directory is reconciled at startup (sync()): new files are added, changed
+files re-hashed, deleted files dropped. sync() is skipped while the
+directory's mtime is unchanged, so a quiet startup costs one stat.
+Lookups are primary-key / index probes plus one stat of the file found.
+
+orphans() lists PDFs no queue entry references, and rows whose file is gone.
+
+Usage:
+    python3 artifact_index.py --stats
+    python3 artifact_index.py --sync        # Full rescan (ignores the mtime shortcut)
+    python3 artifact_index.py --orphans     # PDFs no queue entry points at
+"""
+
+import hashlib
+import os
+import re
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from queue_store import DB_PATH, QUEUE_NAMES, SQLiteStore, get_store
+
+OUTPUT_DIR = Path(os.getenv('ARTIFACT_DIR', '/root/output'))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    application_number TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    company TEXT NOT NULL,
+    size INTEGER,
+    mtime REAL,
+    sha256 TEXT,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (application_number, kind)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS artifacts_by_company ON artifacts (company, kind, mtime);
+CREATE INDEX IF NOT EXISTS artifacts_by_mtime ON artifacts (kind, mtime);
+
+CREATE TABLE IF NOT EXISTS artifact_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+KINDS = {'Resume': 'resume', 'CoverLetter': 'cover'}
+ARTIFACT_NAME = re.compile(r"^(?P<company>.*)_(?P<number>\d+)_(?P<kind>Resume|CoverLetter)\.pdf$")
+
+
+def company_key(company: str) -> str:
+    """Company as it appears in factory filenames (n8n strips punctuation,
+    joins words with '_' and cuts at 30 chars), lower-cased."""
+    name = re.sub(r"[^a-zA-Z0-9\s]", "", str(company or ""))
+    return re.sub(r"\s+", "_", name)[:30].lower()
+
+
+def parse_artifact_name(filename: str) -> Optional[tuple]:
+    """(company_key, application_number, kind) for a factory PDF name, else None."""
+    match = ARTIFACT_NAME.match(filename)
+    if not match:
+        return None
+    return match['company'].lower(), match['number'], KINDS[match['kind']]
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ArtifactIndex(SQLiteStore):
+    """Persistent application_number -> PDF paths map for OUTPUT_DIR."""
+
+    def __init__(self, db_path: Path = DB_PATH, output_dir: Path = OUTPUT_DIR):
+        super().__init__(db_path, SCHEMA)
+        self.output_dir = Path(output_dir)
+
+    def _row(self, filename: str, st: Optional[os.stat_result], sha256: Optional[str] = None) -> Optional[tuple]:
+        parsed = parse_artifact_name(filename)
+        if not parsed:
+            return None
+        company, number, kind = parsed
+        if st is not None and sha256 is None:
+            sha256 = file_sha256(self.output_dir / filename)
+        return (number, kind, filename, company,
+                st.st_size if st else None, st.st_mtime if st else None,
+                sha256, datetime.now().isoformat())
+
+    def _upsert(self, conn, rows: List[tuple]):
+        conn.executemany(
+            "INSERT INTO artifacts (application_number, kind, filename, company, size, mtime, sha256, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(application_number, kind) DO UPDATE SET filename = excluded.filename, "
+            "company = excluded.company, size = excluded.size, mtime = excluded.mtime, "
+            "sha256 = excluded.sha256",
+            rows,
+        )
+
+    # ---------- writes ----------
+
+    def record_result(self, result: dict) -> int:
+        """Index the files of a factory response ({'files': {'resume': name, 'cover': name}}).
+        Files not on disk yet are indexed without size/hash; sync() fills them in."""
+        rows = []
+        for filename in (result.get('files') or {}).values():
+            if not filename:
+                continue
+            filename = Path(str(filename)).name
+            try:
+                st = (self.output_dir / filename).stat()
+            except OSError:
+                st = None
+            row = self._row(filename, st)
+            if row:
+                rows.append(row)
+        if rows:
+            with self._transaction() as conn:
+                self._upsert(conn, rows)
+        return len(rows)
+
+    def sync(self, force: bool = False) -> Dict[str, int]:
+        """Reconcile with OUTPUT_DIR in one directory pass. Skipped (all zeros)
+        when the directory mtime matches the last sync, unless `force`."""
+        counts = {'added': 0, 'updated': 0, 'removed': 0, 'unparsed': 0}
+        try:
+            dir_mtime = str(self.output_dir.stat().st_mtime_ns)
+        except OSError:
+            return counts
+        with self._lock:
+            last = self._conn.execute(
+                "SELECT value FROM artifact_meta WHERE key = 'dir_mtime'").fetchone()
+            if not force and last and last[0] == dir_mtime:
+                return counts
+            known = {filename: (size, mtime) for filename, size, mtime in
+                     self._conn.execute("SELECT filename, size, mtime FROM artifacts")}
+
+        rows = []
+        on_disk = set()
+        with os.scandir(self.output_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith('.pdf') or not entry.is_file():
+                    continue
+                if not parse_artifact_name(entry.name):
+                    counts['unparsed'] += 1
+                    continue
+                on_disk.add(entry.name)
+                st = entry.stat()
+                if known.get(entry.name) == (st.st_size, st.st_mtime):
+                    continue
+                counts['updated' if entry.name in known else 'added'] += 1
+                rows.append(self._row(entry.name, st))
+        gone = [name for name in known if name not in on_disk]
+        counts['removed'] = len(gone)
+
+        with self._transaction() as conn:
+            self._upsert(conn, rows)
+            conn.executemany("DELETE FROM artifacts WHERE filename = ?", [(name,) for name in gone])
+            conn.execute("INSERT OR REPLACE INTO artifact_meta (key, value) VALUES ('dir_mtime', ?)",
+                         (dir_mtime,))
+        return counts
+
+    # ---------- lookups ----------
+
+    def _existing(self, row) -> Optional[str]:
+        if not row:
+            return None
+        path = self.output_dir / row[0]
+        return str(path) if path.exists() else None
+
+    def path(self, application_number, kind: str) -> Optional[str]:
+        """PDF for an application number ('resume' or 'cover'), if it exists."""
+        if not application_number:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT filename FROM artifacts WHERE application_number = ? AND kind = ?",
+                (str(application_number), kind)).fetchone()
+        return self._existing(row)
+
+    def latest_for_company(self, company: str, kind: str) -> Optional[str]:
+        key = company_key(company)
+        if not key:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT filename FROM artifacts WHERE company = ? AND kind = ? "
+                "ORDER BY mtime DESC LIMIT 1", (key, kind)).fetchone()
+        return self._existing(row)
+
+    def latest(self, kind: Optional[str] = None) -> Optional[str]:
+        """Most recent PDF of `kind` (any kind if None)."""
+        with self._lock:
+            if kind:
+                row = self._conn.execute(
+                    "SELECT filename FROM artifacts WHERE kind = ? ORDER BY mtime DESC LIMIT 1",
+                    (kind,)).fetchone()
+            else:
+                row = self._conn.execute(
+                    "SELECT filename FROM artifacts ORDER BY mtime DESC LIMIT 1").fetchone()
+        return self._existing(row)
+
+    def find(self, job: dict, kind: str) -> Optional[str]:
+        """The job's own PDF by application number, else the newest one for its company."""
+        return (self.path(job.get('application_number'), kind)
+                or self.latest_for_company(job.get('company', ''), kind))
+
+    # ---------- maintenance ----------
+
+    def count(self) -> int:
+        with self._lock:
+            (n,) = self._conn.execute("SELECT COUNT(*) FROM artifacts").fetchone()
+        return n
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            (n,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM artifacts").fetchone()
+        return n
+
+    def orphans(self) -> Dict[str, List[str]]:
+        """'unreferenced': indexed PDFs whose application number no queue entry has;
+        'missing': indexed rows whose file is gone."""
+        store = get_store()
+        referenced = {str(job.get('application_number')) for name in QUEUE_NAMES
+                      for job in store.iter_jobs(name) if job.get('application_number')}
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT application_number, filename FROM artifacts ORDER BY filename").fetchall()
+        return {
+            'unreferenced': [filename for number, filename in rows if number not in referenced],
+            'missing': [filename for _, filename in rows if not (self.output_dir / filename).exists()],
+        }
+
+
+_index: Optional[ArtifactIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_artifact_index() -> ArtifactIndex:
+    """Process-wide index, synced with OUTPUT_DIR once on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = ArtifactIndex()
+                index.sync()
+                _index = index
+    return _index
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Resume / cover letter artifact index")
+    parser.add_argument("--sync", action="store_true", help="Full rescan of the output directory")
+    parser.add_argument("--orphans", action="store_true", help="List PDFs no queue entry references")
+    parser.add_argument("--stats", action="store_true", help="Print index size")
+    args = parser.parse_args()
+
+    index = get_artifact_index()
+    if args.sync:
+        print(f"Artifact index synced: {index.sync(force=True)}")
+    if args.orphans:
+        orphans = index.orphans()
+        for filename in orphans['unreferenced']:
+            print(f"unreferenced  {filename}")
+        for filename in orphans['missing']:
+            print(f"missing       {filename}")
+        print(f"{len(orphans['unreferenced'])} unreferenced, {len(orphans['missing'])} missing")
+    if not (args.sync or args.orphans):
+        print(f"Artifact index: {index.count()} PDFs, {index.total_bytes() / 1e6:.1f} MB")
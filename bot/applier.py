@@ -16,7 +16,10 @@ IMPROVEMENTS (Feb 2026):
   - Expanded success detection
 """
 import asyncio
+import contextvars
+import functools
 import json
+from dataclasses import dataclass
 import re
 import time
 import base64
@@ -26,7 +29,6 @@ from pathlib import Path
 from dotenv import load_dotenv
 import os
 import aiohttp
-import requests
 
 # Import new utilities
 from utils import (
@@ -60,21 +62,6 @@ from browser_use_sdk import AsyncBrowserUse
 # ============ CAPSOLVER CONFIG ============
 CAPSOLVER_API_KEY = os.getenv("CAPSOLVER_API_KEY", "")
 
-# ============ BLOCKED DOMAINS (Complex ATS - skip these) ============
-BLOCKED_ATS_DOMAINS = [
-    'myworkdayjobs.com',
-    'myworkday.com',
-    'wd1.myworkdayjobs.com',
-    'wd3.myworkdayjobs.com',
-    'wd5.myworkdayjobs.com',
-    'icims.com',
-    'taleo.net',
-    'oraclecloud.com',
-    'brassring.com',
-    'ultipro.com',
-    'successfactors.com',  # Can work but often problematic
-]
-
 # ============ SUCCESS KEYWORDS (flexible matching) ============
 SUCCESS_KEYWORDS = [
     'application submitted',
@@ -97,18 +84,6 @@ SUCCESS_KEYWORDS = [
     'applied successfully',
 ]
 
-# Job unavailable indicators (fast-fail)
-JOB_UNAVAILABLE_KEYWORDS = [
-    'job has expired',
-    'job is no longer available',
-    'no longer accepting applications',
-    'job not found',
-    'this job post is no longer available',
-    'position has been filled',
-    'job listing has expired',
-    'this position is closed',
-]
-
 # Create controller with CAPTCHA solving action
 controller = Controller()
 
@@ -179,6 +154,15 @@ FORM_FILLER_JS = Path("/root/job_bot/skills/form_filler.js").read_text()
 import sys
 sys.path.insert(0, "/root/job_bot")
 from skills.dom_parser import clean_html_for_llm, generate_field_mapping, extract_form_fields, match_field_heuristically
+import queue_store
+from dedup_index import get_index as get_dedup_index
+from artifact_index import file_sha256, get_artifact_index
+# Retries + backoff + pacing, shared with the hunter
+from factory_dispatcher import FACTORY_RETRIES, get_factory_bucket, release_backend, send_with_retry
+from prompt_assembly import PromptPrefix, format_prompt_report, get_prompt_stats
+# Blocked ATS / unavailable keyword lists live with the pre-flight triage
+from job_triage import (BLOCKED_ATS, EASY_APPLY, EXPIRED, EXTERNAL, JOB_UNAVAILABLE_KEYWORDS, UNKNOWN,
+                        JobTriage, blocked_domain, sweep_until)
 
 
 # ============ SESSION LOGGER ============
@@ -195,6 +179,7 @@ class SessionLogger:
         self.steps = []
         self.captcha_events = []
         self.form_events = []
+        self.uploads = []
         self.errors = []
         self.urls_visited = []
         self.cover_letter_available = False
@@ -240,6 +225,18 @@ class SessionLogger:
             'error': error,
         })
 
+    def log_upload(self, file_name: str, size: int, upload_time_s: float, cached: bool, success: bool,
+                   error: str = ""):
+        self.uploads.append({
+            'ts': datetime.now().isoformat(),
+            'file': file_name,
+            'bytes': size,
+            'upload_time_s': round(upload_time_s, 2),
+            'cached': cached,
+            'success': success,
+            'error': error,
+        })
+
     def save(self, result: str, success: bool, total_steps: int = 0) -> str:
         end_time = datetime.now()
         data = {
@@ -260,6 +257,7 @@ class SessionLogger:
             },
             'captcha': self.captcha_events,
             'form_injection': self.form_events,
+            'uploads': self.uploads,
             'cover_letter': {
                 'available': self.cover_letter_available,
             },
@@ -276,8 +274,110 @@ class SessionLogger:
         return str(self.log_file)
 
 
-# Active session logger (set per-job in apply_to_job)
-_active_logger: SessionLogger | None = None
+class JobRunState:
+    """Mutable state for one apply_to_job run.
+
+    Held in a ContextVar so concurrent workers each see their own logger and
+    CAPTCHA/rescue counters; controller actions run inside the agent's task
+    and therefore read the state of the job that started it.
+    """
+
+    def __init__(self, job: dict):
+        self.logger = SessionLogger(job)
+        self.captcha_attempts = {}  # url_key -> attempts on this page
+        self.rescue_attempts = {}   # url_key -> Gemini rescue calls
+
+
+_job_state: contextvars.ContextVar[JobRunState | None] = contextvars.ContextVar('job_state', default=None)
+
+
+def active_logger() -> SessionLogger | None:
+    """Session logger of the job running in the current task (None outside apply_to_job)"""
+    state = _job_state.get()
+    return state.logger if state else None
+
+
+def _attempt_counter(name: str) -> dict:
+    state = _job_state.get()
+    return getattr(state, name) if state else {}
+
+
+# ============ FORM MAPPING PROMPT ============
+# v5.3: Category-first prompt + indirect ref_id mapping + JSON response mode.
+# Instructions + applicant data are identical on every page, so they are built
+# once per profile and sent as the system instruction; each call only sends
+# the page's unmatched fields.
+FORM_MAPPING_MODEL = "gemini-2.5-flash"
+
+FORM_MAPPING_RULES = (
+    "You are a form field mapper for a job application. Map each field to applicant data.\n\n"
+    "STEP 1: Read each field's label to determine its CATEGORY:\n"
+    "  - CONTACT: name, email, phone, address, city, state, zip, linkedin\n"
+    "  - WORK: job title, company, employer, work dates, work city/state\n"
+    "  - EDUCATION: school, degree, major, GPA, graduation, education dates\n"
+    "  - SCREENING: yes/no questions, years of experience, authorization, salary\n\n"
+    "STEP 2: Look up data ONLY in the matching category section below.\n"
+    "STEP 3: If no match exists in that category, use \"__SKIP__\".\n\n"
+    "CRITICAL RULES:\n"
+    "- NEVER put contact data (name/email/phone) into work or education fields\n"
+    "- NEVER put work data into education fields or vice versa\n"
+    "- For screening questions, match by semantic meaning of the label\n"
+    "- Use \"__SKIP__\" liberally — it's better to skip than fill incorrectly"
+)
+
+FORM_MAPPING_FORMAT = "Return JSON mapping field IDs to values: {\"field_0\": \"value\", \"field_1\": \"__SKIP__\"}"
+
+
+def categorize_profile(profile: dict) -> dict:
+    """Category-first profile: separate contact/work/education/screening"""
+    return {
+        "contact": {
+            "first_name": profile.get('first_name', ''),
+            "last_name": profile.get('last_name', ''),
+            "email": profile.get('email', ''),
+            "phone": profile.get('phone', ''),
+            "city": profile.get('city', ''),
+            "state": profile.get('state', ''),
+            "zip": profile.get('zip', ''),
+            "address": profile.get('address', ''),
+            "linkedin": profile.get('linkedin', ''),
+        },
+        "work_history": {
+            "current_title": profile.get('current_job_title', ''),
+            "current_company": profile.get('current_company', ''),
+            "years_experience": profile.get('years_experience', ''),
+            "previous_title": profile.get('previous_job_title', ''),
+            "previous_company": profile.get('previous_company', ''),
+        },
+        "education": {
+            "school": profile.get('school', ''),
+            "degree": profile.get('degree', ''),
+            "graduation_year": profile.get('graduation_year', ''),
+        },
+        "screening_answers": {
+            "authorized_to_work_in_us": "Yes",
+            "require_sponsorship": "No",
+            "years_of_experience": profile.get('years_experience', '5'),
+            "willing_to_relocate": "Yes",
+            "salary_expectation": "70000",
+            "start_date": "Immediately",
+            "has_drivers_license": "Yes",
+            "background_check_ok": "Yes",
+            "drug_test_ok": "Yes",
+        },
+    }
+
+
+@functools.lru_cache(maxsize=8)
+def _form_mapping_prefix(profile_json: str) -> PromptPrefix:
+    categorized = categorize_profile(json.loads(profile_json))
+    return PromptPrefix('form_mapping',
+                        f"{FORM_MAPPING_RULES}\n\nApplicant data:\n{json.dumps(categorized, indent=2)}")
+
+
+def form_mapping_prefix(profile: dict) -> PromptPrefix:
+    """Static form-mapping prefix for `profile` (built once, then memoized)"""
+    return _form_mapping_prefix(json.dumps(profile, sort_keys=True))
 
 
 @controller.action('Inject form data - fill ALL fields at once using JS injection (much faster than clicking each field)')
@@ -330,14 +430,12 @@ async def inject_form_data(browser_session: BrowserSession) -> ActionResult:
         # Generate field mapping (heuristics first, then LLM if needed)
         def llm_callback(unmatched_fields, profile):
             """
-            v5.3: Category-first prompt + indirect ref_id mapping + JSON response mode.
             Uses simple field_0/field_1 keys so LLM doesn't mangle CSS selectors.
+            Prompt layout: see FORM MAPPING PROMPT.
             """
             if not GEMINI_AVAILABLE:
                 return {}
             try:
-                client = genai.Client(api_key=GEMINI_API_KEY)
-
                 # Build ref_id→selector map and field descriptions with labels
                 ref_to_selector = {}
                 field_lines = []
@@ -349,68 +447,18 @@ async def inject_form_data(browser_session: BrowserSession) -> ActionResult:
                     field_lines.append(f"  {ref_id}: type={f.get('type','text')}, label=\"{label}\"")
                 fields_desc = "\n".join(field_lines)
 
-                # Category-first profile: separate contact/work/education/screening
-                categorized_profile = {
-                    "contact": {
-                        "first_name": profile.get('first_name', ''),
-                        "last_name": profile.get('last_name', ''),
-                        "email": profile.get('email', ''),
-                        "phone": profile.get('phone', ''),
-                        "city": profile.get('city', ''),
-                        "state": profile.get('state', ''),
-                        "zip": profile.get('zip', ''),
-                        "address": profile.get('address', ''),
-                        "linkedin": profile.get('linkedin', ''),
-                    },
-                    "work_history": {
-                        "current_title": profile.get('current_job_title', ''),
-                        "current_company": profile.get('current_company', ''),
-                        "years_experience": profile.get('years_experience', ''),
-                        "previous_title": profile.get('previous_job_title', ''),
-                        "previous_company": profile.get('previous_company', ''),
-                    },
-                    "education": {
-                        "school": profile.get('school', ''),
-                        "degree": profile.get('degree', ''),
-                        "graduation_year": profile.get('graduation_year', ''),
-                    },
-                    "screening_answers": {
-                        "authorized_to_work_in_us": "Yes",
-                        "require_sponsorship": "No",
-                        "years_of_experience": profile.get('years_experience', '5'),
-                        "willing_to_relocate": "Yes",
-                        "salary_expectation": "70000",
-                        "start_date": "Immediately",
-                        "has_drivers_license": "Yes",
-                        "background_check_ok": "Yes",
-                        "drug_test_ok": "Yes",
-                    },
-                }
-
-                prompt = (
-                    "You are a form field mapper for a job application. Map each field to applicant data.\n\n"
-                    "STEP 1: Read each field's label to determine its CATEGORY:\n"
-                    "  - CONTACT: name, email, phone, address, city, state, zip, linkedin\n"
-                    "  - WORK: job title, company, employer, work dates, work city/state\n"
-                    "  - EDUCATION: school, degree, major, GPA, graduation, education dates\n"
-                    "  - SCREENING: yes/no questions, years of experience, authorization, salary\n\n"
-                    "STEP 2: Look up data ONLY in the matching category section below.\n"
-                    "STEP 3: If no match exists in that category, use \"__SKIP__\".\n\n"
-                    "CRITICAL RULES:\n"
-                    "- NEVER put contact data (name/email/phone) into work or education fields\n"
-                    "- NEVER put work data into education fields or vice versa\n"
-                    "- For screening questions, match by semantic meaning of the label\n"
-                    "- Use \"__SKIP__\" liberally — it's better to skip than fill incorrectly\n\n"
-                    f"Form fields:\n{fields_desc}\n\n"
-                    f"Applicant data:\n{json.dumps(categorized_profile, indent=2)}\n\n"
-                    "Return JSON mapping field IDs to values: {\"field_0\": \"value\", \"field_1\": \"__SKIP__\"}"
-                )
+                # Static instructions + categorized profile are the system instruction;
+                # only this page's fields are sent as the prompt
+                prefix = form_mapping_prefix(profile)
+                prompt = f"Form fields:\n{fields_desc}\n\n{FORM_MAPPING_FORMAT}"
 
-                response = client.models.generate_content(
-                    model="gemini-2.5-flash",
+                response = gemini_client().models.generate_content(
+                    model=FORM_MAPPING_MODEL,
                     contents=prompt,
-                    config={'temperature': 0.0, 'response_mime_type': 'application/json'}
+                    config={'temperature': 0.0, 'response_mime_type': 'application/json',
+                            'system_instruction': prefix.text}
                 )
+                get_prompt_stats().record(prefix, prompt, response)
 
                 # Parse JSON response (json mode should return clean JSON)
                 text = (response.text or "").strip()
@@ -484,8 +532,9 @@ async def inject_form_data(browser_session: BrowserSession) -> ActionResult:
         print(f"  [Form Injection] {summary}")
 
         # Log to session logger
-        if _active_logger:
-            _active_logger.log_form_inject(len(filled), len(failed), len(files))
+        session_log = active_logger()
+        if session_log:
+            session_log.log_form_inject(len(filled), len(failed), len(files))
 
         return ActionResult(
             extracted_content=f"FORM INJECTED: {summary}. Fields filled: {', '.join(filled[:5])}{'...' if len(filled) > 5 else ''}"
@@ -494,8 +543,9 @@ async def inject_form_data(browser_session: BrowserSession) -> ActionResult:
     except Exception as e:
         error_msg = str(e)
         print(f"  [Form Injection] ERROR: {error_msg}")
-        if _active_logger:
-            _active_logger.log_form_inject(0, 0, 0, error=error_msg)
+        session_log = active_logger()
+        if session_log:
+            session_log.log_form_inject(0, 0, 0, error=error_msg)
         return ActionResult(
             extracted_content=f"Form injection failed: {error_msg[:100]}. "
             "FALLBACK: Type into each field manually using the applicant info. "
@@ -503,13 +553,10 @@ async def inject_form_data(browser_session: BrowserSession) -> ActionResult:
         )
 
 
-_captcha_attempt_count = {}  # Track CAPTCHA attempts per URL
-
 @controller.action('Solve CAPTCHA (Cloudflare Turnstile, reCAPTCHA, or hCaptcha) - max 2 retries per page')
 async def solve_captcha(browser_session: BrowserSession) -> ActionResult:
     """Detect and solve CAPTCHAs using CapSolver API - supports Turnstile, reCAPTCHA, and hCaptcha.
     Max 2 attempts per page - if both fail, the session is tainted. Move on."""
-    global _captcha_attempt_count
 
     if not CAPSOLVER_API_KEY:
         return ActionResult(extracted_content="No CAPSOLVER_API_KEY configured")
@@ -525,13 +572,15 @@ async def solve_captcha(browser_session: BrowserSession) -> ActionResult:
 
         # Track attempts per URL - max 2 before giving up
         url_key = page_url.split('?')[0][:60]
-        _captcha_attempt_count[url_key] = _captcha_attempt_count.get(url_key, 0) + 1
-        attempt = _captcha_attempt_count[url_key]
+        captcha_attempts = _attempt_counter('captcha_attempts')
+        captcha_attempts[url_key] = captcha_attempts.get(url_key, 0) + 1
+        attempt = captcha_attempts[url_key]
 
         if attempt > 3:
             print(f"  [CapSolver] CAPTCHA attempt {attempt} - session tainted, giving up")
-            if _active_logger:
-                _active_logger.log_captcha("unknown", attempt, False)
+            session_log = active_logger()
+            if session_log:
+                session_log.log_captcha("unknown", attempt, False)
             return ActionResult(
                 extracted_content="CAPTCHA_FAILED: Max 3 attempts reached. Session is tainted by anti-bot. "
                 "Stop trying to solve and report failure. Say 'CAPTCHA_BLOCKED' and use done action."
@@ -725,8 +774,9 @@ async def solve_captcha(browser_session: BrowserSession) -> ActionResult:
                 """)
                 solve_time = time.time() - captcha_solve_start
                 print(f"  [CapSolver] hCaptcha solved successfully! ({solve_time:.1f}s)")
-                if _active_logger:
-                    _active_logger.log_captcha("hCaptcha", attempt, True, solve_time)
+                session_log = active_logger()
+                if session_log:
+                    session_log.log_captcha("hCaptcha", attempt, True, solve_time)
                 return ActionResult(extracted_content="CAPTCHA solved - hCaptcha token injected. Click verify/submit.")
 
             elif captcha_type == "AntiTurnstileTaskProxyLess":
@@ -755,8 +805,9 @@ async def solve_captcha(browser_session: BrowserSession) -> ActionResult:
                 """)
                 solve_time = time.time() - captcha_solve_start
                 print(f"  [CapSolver] Turnstile solved successfully! ({solve_time:.1f}s)")
-                if _active_logger:
-                    _active_logger.log_captcha("Turnstile", attempt, True, solve_time)
+                session_log = active_logger()
+                if session_log:
+                    session_log.log_captcha("Turnstile", attempt, True, solve_time)
                 return ActionResult(extracted_content="CAPTCHA solved - Turnstile bypassed. Refresh or click verify.")
 
             elif captcha_type == "ReCaptchaV2TaskProxyLess":
@@ -817,8 +868,9 @@ async def solve_captcha(browser_session: BrowserSession) -> ActionResult:
                 """)
                 solve_time = time.time() - captcha_solve_start
                 print(f"  [CapSolver] reCAPTCHA solved successfully! (attempt {attempt}, {solve_time:.1f}s)")
-                if _active_logger:
-                    _active_logger.log_captcha("reCAPTCHA_v2", attempt, True, solve_time)
+                session_log = active_logger()
+                if session_log:
+                    session_log.log_captcha("reCAPTCHA_v2", attempt, True, solve_time)
                 # Wait 2s for token to propagate before agent clicks submit
                 await asyncio.sleep(2)
                 return ActionResult(
@@ -833,44 +885,6 @@ async def solve_captcha(browser_session: BrowserSession) -> ActionResult:
         return ActionResult(extracted_content=f"CAPTCHA solving error: {str(e)}")
 
 
-# ============ PRE-DETECT EXTERNAL JOBS (avoid wasting browser sessions) ============
-def pre_detect_easy_apply(job_url: str, timeout: int = 10) -> str | None:
-    """Lightweight HTTP check to detect if a job is Easy Apply or external.
-    Returns: 'easy_apply', 'external', or None (uncertain - launch browser to check).
-    Conservative: only returns 'external' on strong signals, defaults to None.
-    """
-    if 'indeed.com' not in job_url:
-        return 'external'
-    try:
-        resp = requests.get(
-            job_url,
-            headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36'},
-            timeout=timeout,
-            allow_redirects=True,
-        )
-        # Non-200 or CAPTCHA page = uncertain, let browser handle it
-        if resp.status_code != 200:
-            return None
-        text = resp.text
-        text_lower = text.lower()
-        # CAPTCHA / bot detection page = uncertain
-        if 'verify you are human' in text_lower or 'captcha' in text_lower:
-            return None
-        # Check if redirected away from Indeed
-        if 'indeed.com' not in resp.url:
-            return 'external'
-        # Strong external indicator: button specifically labeled for company site
-        # Use exact HTML patterns to avoid false positives from footer/sidebar text
-        if 'apply on company site' in text_lower and 'indeedapplybutton' not in text_lower:
-            return 'external'
-        # Strong Easy Apply indicator: the indeedApply widget ID exists in HTML
-        if 'indeedapplybutton' in text_lower or 'indeed-apply-widget' in text_lower:
-            return 'easy_apply'
-    except Exception:
-        pass
-    return None  # Uncertain - let the browser handle it
-
-
 # ============ URL GUARD - Stop if leaving Indeed ============
 ALLOWED_DOMAINS = ['indeed.com', 'indeed.co', 'indeed.ca', 'indeed.co.uk']
 EXTERNAL_ATS_INDICATORS = ['greenhouse.io', 'lever.co', 'workday', 'icims.com', 'taleo', 'brassring', 'ultipro', 'successfactors', 'oraclecloud']
@@ -1008,8 +1022,9 @@ async def check_and_reload_page(browser_session: BrowserSession) -> ActionResult
         # Page seems empty/broken
         if el_count < 3 or body_len < 100:
             print(f"  [SPA Watchdog] Page appears empty ({el_count} elements, {body_len} chars). Reloading...")
-            if _active_logger:
-                _active_logger.log_step(0, 'spa_reload', f"Empty page: {el_count} elements", check.get('url', ''))
+            session_log = active_logger()
+            if session_log:
+                session_log.log_step(0, 'spa_reload', f"Empty page: {el_count} elements", check.get('url', ''))
             await page.reload(timeout=15000)
             await asyncio.sleep(3)
 
@@ -1559,7 +1574,7 @@ async def gemini_rescue_analysis(browser, task_summary: str, attempt: int = 1,
             if history_lines:
                 history_summary = "\n=== AGENT HISTORY (last 10 steps — what was tried) ===\n" + "\n".join(history_lines)
 
-        client = genai.Client(api_key=GEMINI_API_KEY)
+        client = gemini_client()
         thinking_budget = 2048 if attempt == 1 else 4096
         print(f"  [RESCUE ANALYSIS] Gemini 3 Pro ({thinking_budget} thinking, {len(dom_context)} chars DOM)")
 
@@ -1597,9 +1612,17 @@ RESPOND WITH:
 # Always use Gemini 3 Pro with thinking.
 # WAF detection: "Something went wrong" on Indeed = bot block, not logic error.
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")  # Set in .env file
+_gemini_client = None
 
-# Track rescue attempts per session to implement tiered escalation
-_rescue_attempt_count = {}
+
+def gemini_client():
+    """One genai Client per process - reuses its HTTP connections across calls"""
+    global _gemini_client
+    if _gemini_client is None:
+        _gemini_client = genai.Client(api_key=GEMINI_API_KEY)
+    return _gemini_client
+
+# Rescue attempts are tracked per job (JobRunState.rescue_attempts) for tiered escalation
 
 
 @controller.action('Ask Gemini for help when stuck (RESCUE MODE - use when confused or stuck in a loop)')
@@ -1610,7 +1633,6 @@ async def ask_gemini_for_help(browser_session: BrowserSession, problem_descripti
     - Attempt 2+: Pro with 4K thinking — deep analysis, root cause
     - WAF Detection: Identifies bot blocks vs logic errors
     """
-    global _rescue_attempt_count
 
     if not GEMINI_AVAILABLE or not GEMINI_API_KEY:
         return ActionResult(extracted_content="Gemini not available - continue with best guess")
@@ -1625,8 +1647,9 @@ async def ask_gemini_for_help(browser_session: BrowserSession, problem_descripti
 
         # Track attempts for this URL pattern (strip query params for grouping)
         url_key = current_url.split('?')[0][:50]
-        _rescue_attempt_count[url_key] = _rescue_attempt_count.get(url_key, 0) + 1
-        attempt = _rescue_attempt_count[url_key]
+        rescue_attempts = _attempt_counter('rescue_attempts')
+        rescue_attempts[url_key] = rescue_attempts.get(url_key, 0) + 1
+        attempt = rescue_attempts[url_key]
 
         # Get visible text from the page
         visible_text = await page.evaluate("""() => {
@@ -1682,7 +1705,7 @@ Errors: {error_messages or 'None'}
 Buttons: {buttons or 'None'}
 Page: {visible_text[:1000]}"""
 
-        client = genai.Client(api_key=GEMINI_API_KEY)
+        client = gemini_client()
 
         # Scale thinking budget: first rescue = focused 2K, repeat = deep 4K
         thinking_budget = 2048 if attempt == 1 else 4096
@@ -1809,8 +1832,205 @@ APPLICANT = {
     "previous_company": "Fusion Contact Centers",
 }
 
-DELAY_BETWEEN_JOBS = 10
-N8N_WEBHOOK_URL = os.getenv('N8N_WEBHOOK_URL', 'http://localhost:5678/webhook/incoming-job')
+DELAY_BETWEEN_JOBS = 10  # Minimum spacing between cloud browser session starts (all workers)
+APPLIER_WORKERS = int(os.getenv('APPLIER_WORKERS', '1'))  # Concurrent apply_to_job coroutines
+APPLYING_QUEUE = "applying"  # Claimed by a worker, not yet finished
+STALE_CLAIM_SECONDS = 2 * 60 * 60  # Claims older than this are from a dead run
+PENDING_POLL_SECONDS = 5  # How often idle workers re-check pending while the hunter still runs
+BROWSER_SESSION_REUSE = os.getenv('BROWSER_SESSION_REUSE', '1') != '0'  # Keep cloud sessions warm between jobs
+BROWSER_SESSION_MAX_JOBS = int(os.getenv('BROWSER_SESSION_MAX_JOBS', '5'))  # Recycle a session after this many jobs
+BROWSER_SESSION_MAX_AGE = float(os.getenv('BROWSER_SESSION_MAX_AGE', '1500'))  # ...or this many seconds
+PREFETCH_LOOKAHEAD = int(os.getenv('PREFETCH_LOOKAHEAD', '5'))  # Pending jobs ahead of the workers to prefetch for
+PREFETCH_MAX_IN_FLIGHT = int(os.getenv('PREFETCH_MAX_IN_FLIGHT', '2'))  # Background factory calls at once
+# Results that leave a session suspect (bot wall, lost login, broken page) - never reused
+TAINTING_RESULTS = {'exception', 'needs_login', 'captcha_blocked', 'spa_failure', 'rate_limit_exceeded'}
+
+
+class BrowserUseLimiter:
+    """Shared pacing for cloud browser sessions across all workers.
+
+    Session starts are spaced at least `min_interval` apart, and a 429 seen
+    by any worker pauses every worker until the cooldown expires, instead of
+    each one discovering the rate limit on its own. Module-level, so the lock
+    is made per event loop (each asyncio.run gets its own); pacing carries over.
+    """
+
+    def __init__(self, min_interval: float = DELAY_BETWEEN_JOBS):
+        self.min_interval = min_interval
+        self._lock: asyncio.Lock | None = None
+        self._loop = None
+        self._next_start = 0.0
+        self._cooldown_until = 0.0
+
+    def _loop_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._lock = asyncio.Lock()
+            self._loop = loop
+        return self._lock
+
+    async def acquire(self):
+        async with self._loop_lock():
+            now = time.monotonic()
+            wait = max(self._next_start, self._cooldown_until) - now
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next_start = time.monotonic() + self.min_interval
+
+    def rate_limited(self, wait_time: float):
+        """Record a 429: nobody starts a new session for `wait_time` seconds."""
+        self._cooldown_until = max(self._cooldown_until, time.monotonic() + wait_time)
+
+
+_session_limiter = BrowserUseLimiter()
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    error_str = str(error).lower()
+    return "429" in error_str or "too many" in error_str or "rate limit" in error_str
+
+
+# ============ WARM BROWSER SESSIONS ============
+class WarmSession:
+    """One started cloud browser session and its reuse bookkeeping."""
+
+    def __init__(self, browser: BrowserSession):
+        self.browser = browser
+        self.started_at = time.monotonic()
+        self.jobs_served = 0
+        self.uploaded = {}  # sha256 -> cloud file name, for CloudUploader
+        cdp_url = browser.browser_profile.cdp_url or ""
+        session_match = re.search(r'wss://([^.]+)\.cdp', cdp_url)
+        self.cloud_session_id = session_match.group(1) if session_match else None
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def expired(self) -> bool:
+        return self.jobs_served >= BROWSER_SESSION_MAX_JOBS or self.age >= BROWSER_SESSION_MAX_AGE
+
+
+class BrowserSessionPool:
+    """Warm cloud browser sessions shared by the workers.
+
+    A worker acquires a session per job and releases it afterwards. Released
+    sessions are reset (extra tabs closed, page blanked, storage of the last
+    job's site cleared - profile cookies and login are kept) and handed to the
+    next job instead of paying cloud startup + profile load again. A session
+    is closed instead of reused after BROWSER_SESSION_MAX_JOBS jobs, after
+    BROWSER_SESSION_MAX_AGE seconds, when its job ended in TAINTING_RESULTS,
+    or when the reset fails. With reuse off, every job gets a fresh session
+    (the old behaviour, useful as a baseline for the setup timings).
+    """
+
+    def __init__(self, reuse: bool = BROWSER_SESSION_REUSE):
+        self.reuse = reuse
+        self._idle: list[WarmSession] = []
+        self.stats = {'cold_starts': 0, 'warm_reuses': 0, 'cold_setup_s': 0.0, 'warm_setup_s': 0.0,
+                      'recycled': 0, 'tainted': 0, 'reset_failed': 0}
+
+    async def _start(self) -> WarmSession:
+        browser = BrowserSession(
+            use_cloud=True,
+            cloud_proxy_country_code='us',
+            cloud_profile_id=CLOUD_PROFILE_ID,
+            keep_alive=True,  # Agents must not stop it when they finish - the pool decides
+        )
+        # Rate limit retry logic (Gemini Priority 1.3 recommendation)
+        max_retries = 3
+        for attempt in range(max_retries):
+            await _session_limiter.acquire()  # Spacing + shared 429 cooldown
+            try:
+                await browser.start()
+                return WarmSession(browser)
+            except Exception as e:
+                if not is_rate_limit_error(e):
+                    raise  # Re-raise non-rate-limit errors
+                wait_time = 30 * (attempt + 1)  # Exponential: 30s, 60s, 90s
+                print(f"  [RATE LIMIT] Browser-Use 429 error. Pausing all workers {wait_time}s... (attempt {attempt + 1}/{max_retries})")
+                _session_limiter.rate_limited(wait_time)
+        return None
+
+    async def _reset(self, session: WarmSession) -> bool:
+        """Bring a used session back to a clean single blank tab. False if it is unusable."""
+        try:
+            context = session.browser.browser_context
+            pages = list(context.pages) if context else []
+            if not pages:
+                return False
+            keep, extra = pages[0], pages[1:]
+            for page in extra:
+                await page.close()
+            await keep.evaluate("() => { try { sessionStorage.clear(); localStorage.clear(); } catch (e) {} }")
+            await keep.goto("about:blank")
+            await keep.evaluate("() => 1")  # Liveness ping
+            return True
+        except Exception as e:
+            print(f"  [SESSION] Reset failed ({str(e)[:80]}) - starting a fresh session")
+            return False
+
+    async def _close(self, session: WarmSession):
+        try:
+            # kill() ignores keep_alive; older SDKs only have close()
+            await getattr(session.browser, 'kill', session.browser.close)()
+        except Exception:
+            pass
+
+    async def acquire(self) -> WarmSession | None:
+        """A ready session for one job (None if Browser-Use kept rate limiting)."""
+        setup_start = time.monotonic()
+        while self._idle:
+            session = self._idle.pop()
+            if session.expired():
+                self.stats['recycled'] += 1
+                await self._close(session)
+            elif await self._reset(session):
+                elapsed = time.monotonic() - setup_start
+                self.stats['warm_reuses'] += 1
+                self.stats['warm_setup_s'] += elapsed
+                print(f"  [SESSION] Reusing warm session {session.cloud_session_id} "
+                      f"(job {session.jobs_served + 1}, ready in {elapsed:.1f}s)")
+                return session
+            else:
+                self.stats['reset_failed'] += 1
+                await self._close(session)
+        session = await self._start()
+        if session:
+            elapsed = time.monotonic() - setup_start
+            self.stats['cold_starts'] += 1
+            self.stats['cold_setup_s'] += elapsed
+            print(f"  [SESSION] Started cloud session {session.cloud_session_id} in {elapsed:.1f}s")
+        return session
+
+    async def release(self, session: WarmSession, result_reason: str = "", served: bool = True):
+        """Return a session after a job; closed instead if tainted, worn out or reuse is off.
+        `served=False` for checks that don't count towards BROWSER_SESSION_MAX_JOBS."""
+        session.jobs_served += served
+        if result_reason in TAINTING_RESULTS:
+            self.stats['tainted'] += 1
+            await self._close(session)
+        elif not self.reuse or session.expired():
+            if self.reuse:
+                self.stats['recycled'] += 1
+            await self._close(session)
+        else:
+            self._idle.append(session)
+
+    async def close_all(self):
+        idle, self._idle = self._idle, []
+        for session in idle:
+            await self._close(session)
+
+    def report(self) -> str:
+        s = self.stats
+        cold = s['cold_setup_s'] / s['cold_starts'] if s['cold_starts'] else 0.0
+        warm = s['warm_setup_s'] / s['warm_reuses'] if s['warm_reuses'] else 0.0
+        return (f"{s['cold_starts']} cold start(s) avg {cold:.1f}s, {s['warm_reuses']} warm reuse(s) avg {warm:.1f}s, "
+                f"{s['recycled']} recycled, {s['tainted']} tainted, {s['reset_failed']} failed reset")
+
+
+_session_pool = BrowserSessionPool()
 
 
 def is_valid_job(job: dict) -> tuple[bool, str]:
@@ -1832,11 +2052,8 @@ def is_valid_job(job: dict) -> tuple[bool, str]:
 
 def is_blocked_ats(url: str) -> tuple[bool, str]:
     """Check if URL redirects to a blocked ATS domain"""
-    url_lower = url.lower()
-    for domain in BLOCKED_ATS_DOMAINS:
-        if domain in url_lower:
-            return True, domain
-    return False, ""
+    domain = blocked_domain(url)
+    return bool(domain), domain
 
 
 def load_cookies_as_storage_state() -> str:
@@ -1877,126 +2094,118 @@ def load_cookies_as_storage_state() -> str:
 
 
 def load_queue(name: str) -> list:
-    path = QUEUE_DIR / f"{name}.json"
-    if path.exists():
-        return json.loads(path.read_text())
-    return []
+    return queue_store.load_queue(name)
 
 
 def save_queue(name: str, data: list):
-    path = QUEUE_DIR / f"{name}.json"
-    path.write_text(json.dumps(data, indent=2))
+    queue_store.save_queue(name, data)
 
 
-async def upload_file_to_cloud_session(session_id: str, file_path: str) -> str | None:
-    """Upload a local file to Browser-Use Cloud session"""
-    api_key = os.getenv("BROWSER_USE_API_KEY")
-    file_path_obj = Path(file_path)
+def move_job(job: dict, dst: str, src: str = "pending", **updates) -> dict:
+    """Atomically move a job between queues (single-row update, not a file rewrite)"""
+    return queue_store.move_job(job, src, dst, **updates)
 
-    if not file_path_obj.exists():
-        print(f"  Upload skipped: {file_path} does not exist")
-        return None
 
-    file_size = file_path_obj.stat().st_size
-    file_name = file_path_obj.name
+class CloudUploader:
+    """Uploads local PDFs into cloud browser sessions.
 
-    try:
-        client = AsyncBrowserUse(api_key=api_key)
-        presigned = await client.files.browser_session_upload_file_presigned_url(
-            session_id=session_id,
-            file_name=file_name,
-            content_type="application/pdf",
-            size_bytes=file_size,
-        )
+    One Browser-Use SDK client and one pooled aiohttp session serve every
+    upload of the run (the presigned POSTs all go to the same storage host).
+    A job's files are uploaded concurrently, each streamed from an open file
+    handle. `uploaded` is the per-session cache (content sha256 -> cloud file
+    name): a warm session that already holds a file doesn't get it again.
+    """
 
-        form_data = aiohttp.FormData()
-        for key, value in presigned.fields.items():
-            form_data.add_field(key, value)
-        form_data.add_field('file', open(file_path, 'rb'), filename=file_name, content_type='application/pdf')
+    def __init__(self):
+        self._client = None
+        self._http: aiohttp.ClientSession | None = None
+
+    def _clients(self):
+        if self._client is None:
+            self._client = AsyncBrowserUse(api_key=os.getenv("BROWSER_USE_API_KEY"))
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=60))
+        return self._client, self._http
+
+    async def upload(self, session_id: str, file_path: str, uploaded: dict | None = None) -> str | None:
+        """Upload one file to a cloud session. Returns its cloud file name, or None."""
+        file_path_obj = Path(file_path)
+        if not file_path_obj.exists():
+            print(f"  Upload skipped: {file_path} does not exist")
+            return None
 
-        async with aiohttp.ClientSession() as http_session:
-            async with http_session.post(presigned.url, data=form_data) as resp:
-                if resp.status in [200, 201, 204]:
-                    print(f"  Uploaded {file_name} to cloud session ({file_size} bytes)")
-                    return presigned.file_name
-                else:
-                    body = await resp.text()
-                    print(f"  Upload failed: HTTP {resp.status} - {body[:200]}")
-                    return None
+        file_size = file_path_obj.stat().st_size
+        file_name = file_path_obj.name
+        start = time.monotonic()
+        session_log = active_logger()
+        try:
+            digest = await asyncio.to_thread(file_sha256, file_path_obj)
+            if uploaded is not None and digest in uploaded:
+                print(f"  {file_name} already in cloud session - upload skipped")
+                if session_log:
+                    session_log.log_upload(file_name, file_size, 0.0, cached=True, success=True)
+                return uploaded[digest]
+
+            client, http_session = self._clients()
+            presigned = await client.files.browser_session_upload_file_presigned_url(
+                session_id=session_id,
+                file_name=file_name,
+                content_type="application/pdf",
+                size_bytes=file_size,
+            )
 
-    except Exception as e:
-        print(f"  Cloud upload error: {e}")
-        return None
+            form_data = aiohttp.FormData()
+            for key, value in presigned.fields.items():
+                form_data.add_field(key, value)
+            with open(file_path_obj, 'rb') as f:
+                form_data.add_field('file', f, filename=file_name, content_type='application/pdf')
+                async with http_session.post(presigned.url, data=form_data) as resp:
+                    ok = resp.status in [200, 201, 204]
+                    body = '' if ok else await resp.text()
+            elapsed = time.monotonic() - start
+            if session_log:
+                session_log.log_upload(file_name, file_size, elapsed, cached=False, success=ok,
+                                       error='' if ok else f"HTTP {resp.status}")
+            if not ok:
+                print(f"  Upload failed: HTTP {resp.status} - {body[:200]}")
+                return None
+            print(f"  Uploaded {file_name} to cloud session ({file_size} bytes, {elapsed:.1f}s)")
+            if uploaded is not None:
+                uploaded[digest] = presigned.file_name
+            return presigned.file_name
 
+        except Exception as e:
+            print(f"  Cloud upload error: {e}")
+            if session_log:
+                session_log.log_upload(file_name, file_size, time.monotonic() - start,
+                                       cached=False, success=False, error=str(e)[:200])
+            return None
 
-async def send_to_factory_async(job: dict) -> dict | None:
-    """Send job to n8n resume factory (async version)"""
-    payload = {
-        'title': str(job.get('title', 'Unknown')),
-        'company': str(job.get('company', 'Unknown')),
-        'description': str(job.get('description', '')),
-        'url': str(job.get('url', '')),
-        'location': str(job.get('location', '')),
-    }
+    async def upload_many(self, session_id: str, file_paths: list, uploaded: dict | None = None) -> list:
+        """Upload several files concurrently. Cloud names in the same order (None = not uploaded)."""
+        return list(await asyncio.gather(*(
+            self.upload(session_id, path, uploaded) if path else asyncio.sleep(0, result=None)
+            for path in file_paths
+        )))
 
-    try:
-        print(f"  Sending to n8n factory for resume generation...")
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                N8N_WEBHOOK_URL,
-                json=payload,
-                headers={'Content-Type': 'application/json'},
-                timeout=aiohttp.ClientTimeout(total=180)
-            ) as response:
-                if response.status in [200, 202]:
-                    result = await response.json()
-                    print(f"  Factory success: app #{result.get('application_number')}")
-                    return result
-                else:
-                    print(f"  Factory error: HTTP {response.status}")
-                    return None
-    except asyncio.TimeoutError:
-        print(f"  Factory timeout (180s)")
-        return None
-    except Exception as e:
-        print(f"  Factory connection failed: {e}")
-        return None
+    async def close(self):
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+        self._client = None  # Its HTTP client belongs to this run's event loop too
 
 
-def get_resume_path(job: dict) -> str | None:
-    """Find resume PDF for this job"""
-    company = str(job.get('company', '')).replace(' ', '_').replace('/', '_')[:30]
-    app_num = job.get('application_number', '')
+_uploader = CloudUploader()
 
-    patterns = [
-        f"{company}_{app_num}_Resume.pdf",
-        f"{company}_*_Resume.pdf",
-        f"*_{app_num}_Resume.pdf",
-    ]
 
-    for pattern in patterns:
-        matches = list(OUTPUT_DIR.glob(pattern))
-        if matches:
-            return str(sorted(matches, key=lambda x: x.stat().st_mtime, reverse=True)[0])
-    return None
+def get_resume_path(job: dict) -> str | None:
+    """Find resume PDF for this job (artifact index: application number, then company)"""
+    return get_artifact_index().find(job, 'resume')
 
 
 def get_cover_letter_path(job: dict) -> str | None:
-    """Find cover letter PDF for this job"""
-    company = str(job.get('company', '')).replace(' ', '_').replace('/', '_')[:30]
-    app_num = job.get('application_number', '')
-
-    patterns = [
-        f"{company}_{app_num}_CoverLetter.pdf",
-        f"{company}_*_CoverLetter.pdf",
-        f"*_{app_num}_CoverLetter.pdf",
-    ]
-
-    for pattern in patterns:
-        matches = list(OUTPUT_DIR.glob(pattern))
-        if matches:
-            return str(sorted(matches, key=lambda x: x.stat().st_mtime, reverse=True)[0])
-    return None
+    """Find cover letter PDF for this job (artifact index: application number, then company)"""
+    return get_artifact_index().find(job, 'cover')
 
 
 def is_indeed_url(url: str) -> bool:
@@ -2189,15 +2398,133 @@ Say "SUCCESS" on confirmation. "EXTERNAL_SITE" on redirect. "JOB_UNAVAILABLE" if
     return task
 
 
-async def apply_to_job(job: dict) -> tuple[bool, str]:
-    """Apply to a single job using Browser-Use Cloud"""
-    global _captcha_attempt_count, _rescue_attempt_count, _active_logger
-    # Reset CAPTCHA and rescue counters for fresh session
-    _captcha_attempt_count.clear()
-    _rescue_attempt_count.clear()
+# ============ DOCUMENT PREFETCH ============
+class DocumentPrefetcher:
+    """Generates resumes for jobs the workers will claim next.
 
-    # Initialize session logger
-    _active_logger = SessionLogger(job)
+    scan() looks PREFETCH_LOOKAHEAD jobs into the pending queue (claim order)
+    and starts a background factory call for each one without a resume,
+    unless triage has already ruled it out. Calls in flight are keyed by job,
+    so documents() - what apply_to_job() awaits - joins the running call
+    instead of starting a second one, and only starts one itself on a miss.
+    Background calls share one HTTP session and the factory's pacing and run
+    PREFETCH_MAX_IN_FLIGHT at a time; a worker's own call skips that queue.
+    """
+
+    def __init__(self, lookahead: int = PREFETCH_LOOKAHEAD, max_in_flight: int = PREFETCH_MAX_IN_FLIGHT,
+                 triage: JobTriage | None = None):
+        self.lookahead = lookahead
+        self.triage = triage
+        self._slots = asyncio.Semaphore(max(1, max_in_flight))
+        self._bucket = get_factory_bucket()
+        self._http: aiohttp.ClientSession | None = None
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._done: set[str] = set()  # Jobs already attempted this run (success or not)
+        self.stats = {'prefetched': 0, 'ready': 0, 'joined': 0, 'missed': 0, 'failed': 0, 'wait_s': 0.0}
+
+    def _session(self) -> aiohttp.ClientSession:
+        if self._http is None:
+            self._http = aiohttp.ClientSession()
+        return self._http
+
+    async def _generate(self, job: dict, urgent: bool = False) -> dict | None:
+        if urgent:
+            result = await send_with_retry(self._session(), job, FACTORY_RETRIES, self._bucket)
+        else:
+            async with self._slots:
+                result = await send_with_retry(self._session(), job, FACTORY_RETRIES, self._bucket)
+        if not (result and result.get('files', {}).get('resume')):
+            self.stats['failed'] += 1
+            return None
+        get_artifact_index().record_result(result)
+        number = str(result.get('application_number') or '')
+        if number:
+            job['application_number'] = number
+            # Still pending: persist it so any worker (or a later run) finds the PDFs by number
+            queue_store.get_store().update(job, "pending", application_number=number)
+        return result
+
+    def _start(self, job: dict, urgent: bool = False) -> asyncio.Task:
+        self._done.add(queue_store.job_key(job))
+        return asyncio.create_task(self._generate(dict(job), urgent))
+
+    @staticmethod
+    async def _result(task: asyncio.Task) -> dict | None:
+        try:
+            return await task
+        except Exception as e:
+            print(f"  Factory error: {e}")
+            return None
+
+    def scan(self) -> int:
+        """Start background generation for the next pending jobs missing a resume. Returns how many started."""
+        started = 0
+        for job in queue_store.get_store().iter_jobs("pending", limit=self.lookahead):
+            key = queue_store.job_key(job)
+            if key in self._done or get_resume_path(job):
+                continue
+            if self.triage is not None:
+                cached = self.triage.verdicts.get(job.get('url', ''))
+                if cached and cached[0] not in (EASY_APPLY, UNKNOWN):
+                    continue  # Triage will move it out of pending - don't pay for documents
+            self._tasks[key] = self._start(job)
+            self.stats['prefetched'] += 1
+            started += 1
+        return started
+
+    async def documents(self, job: dict) -> dict | None:
+        """Factory result for a job without a resume: the prefetched one if it is
+        ready or in flight, else generated now. A failed prefetch gets one inline
+        call, as a job without prefetching would. Time spent waiting is recorded."""
+        key = queue_store.job_key(job)
+        task = self._tasks.pop(key, None)
+        prefetched = task is not None
+        if not prefetched:
+            self.stats['missed'] += 1
+            task = self._start(job, urgent=True)
+        elif task.done():
+            self.stats['ready'] += 1
+        else:
+            self.stats['joined'] += 1
+        start = time.monotonic()
+        result = await self._result(task)
+        if result is None and prefetched:
+            print("  Prefetch failed, calling the factory inline")
+            result = await self._result(self._start(job, urgent=True))
+        waited = time.monotonic() - start
+        self.stats['wait_s'] += waited
+        session_log = active_logger()
+        if session_log:
+            session_log.log_step(0, 'factory_wait', f"{waited:.1f}s", error='' if result else 'factory_failed')
+        if result and result.get('application_number'):
+            job['application_number'] = str(result['application_number'])
+        return result
+
+    async def close(self):
+        """Cancel background calls for jobs no worker reached, and close the HTTP sessions."""
+        tasks, self._tasks = list(self._tasks.values()), {}
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+        await release_backend()
+
+    def report(self) -> str:
+        s = self.stats
+        return (f"{s['prefetched']} prefetched, {s['ready']} ready, {s['joined']} joined in flight, "
+                f"{s['missed']} generated inline, {s['failed']} failed; "
+                f"workers waited {s['wait_s']:.0f}s on the factory")
+
+
+async def apply_to_job(job: dict, prefetcher: DocumentPrefetcher | None = None) -> tuple[bool, str]:
+    """Apply to a single job using Browser-Use Cloud. `prefetcher` supplies
+    missing documents (run_workers() shares one; a throwaway one otherwise)."""
+    # Fresh logger and CAPTCHA/rescue counters, private to this job's task
+    state = JobRunState(job)
+    _job_state.set(state)
+    session_log = state.logger
 
     job_url = job.get('url', '')
     job_title = job.get('title', 'Unknown')
@@ -2213,8 +2540,13 @@ async def apply_to_job(job: dict) -> tuple[bool, str]:
     # Get or generate resume
     resume_path = get_resume_path(job)
     if not resume_path:
-        print("No resume found — sending to n8n factory...")
-        factory_result = await send_to_factory_async(job)
+        print("No resume found — waiting on n8n factory (prefetched if possible)...")
+        if prefetcher is None:
+            prefetcher = DocumentPrefetcher()
+            factory_result = await prefetcher.documents(job)
+            await prefetcher.close()
+        else:
+            factory_result = await prefetcher.documents(job)
         if factory_result and factory_result.get('files', {}).get('resume'):
             resume_filename = factory_result['files']['resume']
             resume_path = str(OUTPUT_DIR / resume_filename)
@@ -2231,124 +2563,108 @@ async def apply_to_job(job: dict) -> tuple[bool, str]:
     cover_letter_path = get_cover_letter_path(job)
     if cover_letter_path:
         print(f"Cover letter: {cover_letter_path}")
-        if _active_logger:
-            _active_logger.cover_letter_available = True
+        if session_log:
+            session_log.cover_letter_available = True
     else:
         print("Cover letter: None found")
 
-    # Create cloud browser session with persistent profile
+    # Cloud browser session with persistent profile - warm from a previous job when possible
     browser_use_api_key = os.getenv("BROWSER_USE_API_KEY")
     os.environ["BROWSER_USE_API_KEY"] = browser_use_api_key
 
     print(f"Using cloud profile: {CLOUD_PROFILE_ID}")
-    browser = BrowserSession(
-        use_cloud=True,
-        cloud_proxy_country_code='us',
-        cloud_profile_id=CLOUD_PROFILE_ID,
-    )
-
-    # Rate limit retry logic (Gemini Priority 1.3 recommendation)
-    max_retries = 3
-    for attempt in range(max_retries):
-        try:
-            await browser.start()
-            break  # Success
-        except Exception as e:
-            error_str = str(e).lower()
-            if "429" in error_str or "too many" in error_str or "rate limit" in error_str:
-                wait_time = 30 * (attempt + 1)  # Exponential: 30s, 60s, 90s
-                print(f"  [RATE LIMIT] Browser-Use 429 error. Waiting {wait_time}s... (attempt {attempt + 1}/{max_retries})")
-                await asyncio.sleep(wait_time)
-                if attempt == max_retries - 1:
-                    return False, "rate_limit_exceeded"
-            else:
-                raise  # Re-raise non-rate-limit errors
-
-    # Upload resume and cover letter to cloud
-    cloud_resume_name = None
-    cloud_cover_letter_name = None
-    cdp_url = browser.browser_profile.cdp_url or ""
-    session_match = re.search(r'wss://([^.]+)\.cdp', cdp_url)
-    cloud_session_id = session_match.group(1) if session_match else None
-    if cloud_session_id:
-        print(f"Cloud session: {cloud_session_id}")
-        if resume_path:
-            cloud_resume_name = await upload_file_to_cloud_session(cloud_session_id, resume_path)
-        if cover_letter_path:
-            cloud_cover_letter_name = await upload_file_to_cloud_session(cloud_session_id, cover_letter_path)
-
-    file_paths = []
-    if cloud_resume_name:
-        file_paths.append(cloud_resume_name)
-    elif resume_path:
-        file_paths.append(resume_path)
-    if cloud_cover_letter_name:
-        file_paths.append(cloud_cover_letter_name)
-    elif cover_letter_path:
-        file_paths.append(cover_letter_path)
-
-    agent_resume_path = cloud_resume_name if cloud_resume_name else resume_path
-    agent_cover_letter_path = cloud_cover_letter_name if cloud_cover_letter_name else cover_letter_path
-    if cloud_resume_name:
-        print(f"Using cloud resume path for agent: {cloud_resume_name}")
-    if cloud_cover_letter_name:
-        print(f"Using cloud cover letter path for agent: {cloud_cover_letter_name}")
-    task = build_task(job, agent_resume_path, agent_cover_letter_path)
-
-    # Create screenshots directory
-    screenshots_dir = Path("/root/job_bot/screenshots")
-    screenshots_dir.mkdir(exist_ok=True)
-    job_id = job.get('id', job.get('application_number', 'unknown'))
-    gif_path = str(screenshots_dir / f"{job_company.replace(' ', '_')[:20]}_{job_id}.gif")
-
-    # ============ STEP BUDGETS (ATS-aware) ============
-    # External ATS sites (Greenhouse, Lever) are harder → more steps per phase
-    # Indeed Easy Apply is standardized → tighter budgets
-    if is_external:
-        p1_steps, p2_steps, p3_steps, p4_steps = 50, 15, 10, 10
-    else:
-        p1_steps, p2_steps, p3_steps, p4_steps = 40, 10, 10, 10
-    # De-escalation budget: cheap steps to continue after bu-2-0 breaks through
-    deesc_steps = 15
-
-    # ============ ORCHESTRATOR: Escalation + De-escalation Pipeline ============
-    #
-    # Phase 1: bu-1-0 (p1_steps) — cheap workhorse
-    # Phase 2: bu-1-0 nudge (p2_steps) — same model, fresh prompt ("just needs a nudge")
-    # Phase 3: bu-2-0 Blocker-Buster (p3_steps) — 3x cost, smarter model, short burst
-    #   → 3a: If bu-2-0 made PROGRESS but not done → DE-ESCALATE to bu-1-0 (deesc_steps)
-    #   → 3b: If bu-2-0 still STUCK → escalate to Phase 4
-    # Phase 4: Gemini 3 Pro advisory + bu-2-0 (p4_steps) — last resort
-    #   → 4a: If Gemini+bu-2-0 made PROGRESS → DE-ESCALATE to bu-1-0 (deesc_steps)
-    # Anti-thrashing: bu-1-0 after de-escalation gets ONE chance. If stuck again → fail.
-    #
-    stuck = StuckDetector(window=3)
-    all_agents = []  # Track all agents for history combining
-
-    def _total_steps() -> int:
-        """Total steps across all agents so far (for cost-aware decisions)."""
-        return sum(
-            len(ag.history.history) if ag.history and ag.history.history else 0
-            for _, ag in all_agents
-        )
+    lease = await _session_pool.acquire()
+    if lease is None:
+        return False, "rate_limit_exceeded"
+    browser = lease.browser
+    lease_reason = "exception"  # Set by _finish(); anything else taints the session
+
+    # Nothing below may leak the started keep_alive session: hand it back on any error
+    try:
+        # Upload resume and cover letter to cloud (together; skipped if the warm session has them)
+        cloud_resume_name = None
+        cloud_cover_letter_name = None
+        cloud_session_id = lease.cloud_session_id
+        if cloud_session_id:
+            print(f"Cloud session: {cloud_session_id}")
+            cloud_resume_name, cloud_cover_letter_name = await _uploader.upload_many(
+                cloud_session_id, [resume_path, cover_letter_path], lease.uploaded)
+
+        file_paths = []
+        if cloud_resume_name:
+            file_paths.append(cloud_resume_name)
+        elif resume_path:
+            file_paths.append(resume_path)
+        if cloud_cover_letter_name:
+            file_paths.append(cloud_cover_letter_name)
+        elif cover_letter_path:
+            file_paths.append(cover_letter_path)
+
+        agent_resume_path = cloud_resume_name if cloud_resume_name else resume_path
+        agent_cover_letter_path = cloud_cover_letter_name if cloud_cover_letter_name else cover_letter_path
+        if cloud_resume_name:
+            print(f"Using cloud resume path for agent: {cloud_resume_name}")
+        if cloud_cover_letter_name:
+            print(f"Using cloud cover letter path for agent: {cloud_cover_letter_name}")
+        task = build_task(job, agent_resume_path, agent_cover_letter_path)
+
+        # Create screenshots directory
+        screenshots_dir = Path("/root/job_bot/screenshots")
+        screenshots_dir.mkdir(exist_ok=True)
+        job_id = job.get('id', job.get('application_number', 'unknown'))
+        gif_path = str(screenshots_dir / f"{job_company.replace(' ', '_')[:20]}_{job_id}.gif")
+
+        # ============ STEP BUDGETS (ATS-aware) ============
+        # External ATS sites (Greenhouse, Lever) are harder → more steps per phase
+        # Indeed Easy Apply is standardized → tighter budgets
+        if is_external:
+            p1_steps, p2_steps, p3_steps, p4_steps = 50, 15, 10, 10
+        else:
+            p1_steps, p2_steps, p3_steps, p4_steps = 40, 10, 10, 10
+        # De-escalation budget: cheap steps to continue after bu-2-0 breaks through
+        deesc_steps = 15
+
+        # ============ ORCHESTRATOR: Escalation + De-escalation Pipeline ============
+        #
+        # Phase 1: bu-1-0 (p1_steps) — cheap workhorse
+        # Phase 2: bu-1-0 nudge (p2_steps) — same model, fresh prompt ("just needs a nudge")
+        # Phase 3: bu-2-0 Blocker-Buster (p3_steps) — 3x cost, smarter model, short burst
+        #   → 3a: If bu-2-0 made PROGRESS but not done → DE-ESCALATE to bu-1-0 (deesc_steps)
+        #   → 3b: If bu-2-0 still STUCK → escalate to Phase 4
+        # Phase 4: Gemini 3 Pro advisory + bu-2-0 (p4_steps) — last resort
+        #   → 4a: If Gemini+bu-2-0 made PROGRESS → DE-ESCALATE to bu-1-0 (deesc_steps)
+        # Anti-thrashing: bu-1-0 after de-escalation gets ONE chance. If stuck again → fail.
+        #
+        stuck = StuckDetector(window=3)
+        all_agents = []  # Track all agents for history combining
+
+        def _total_steps() -> int:
+            """Total steps across all agents so far (for cost-aware decisions)."""
+            return sum(
+                len(ag.history.history) if ag.history and ag.history.history else 0
+                for _, ag in all_agents
+            )
 
-    # Cost-aware threshold: if we've already spent this many steps, don't de-escalate.
-    # At 60+ steps (~$0.30+), the context switch penalty ($0.01-0.02) isn't worth
-    # the savings — just let the expensive model finish.
-    DEEP_SESSION_THRESHOLD = 60
-
-    agent = Agent(
-        task=task,
-        browser_session=browser,
-        controller=controller,
-        use_vision=True,
-        available_file_paths=file_paths,
-        max_failures=10,
-        max_actions_per_step=5,
-        max_steps=p1_steps,
-        generate_gif=gif_path,
-    )
-    print(f"Recording session to: {gif_path}")
+        # Cost-aware threshold: if we've already spent this many steps, don't de-escalate.
+        # At 60+ steps (~$0.30+), the context switch penalty ($0.01-0.02) isn't worth
+        # the savings — just let the expensive model finish.
+        DEEP_SESSION_THRESHOLD = 60
+
+        agent = Agent(
+            task=task,
+            browser_session=browser,
+            controller=controller,
+            use_vision=True,
+            available_file_paths=file_paths,
+            max_failures=10,
+            max_actions_per_step=5,
+            max_steps=p1_steps,
+            generate_gif=gif_path,
+        )
+        print(f"Recording session to: {gif_path}")
+    except BaseException:
+        await _session_pool.release(lease, lease_reason)
+        raise
 
     try:
         print(f"Starting Browser-Use Cloud agent (bu-1-0, {p1_steps} steps)...")
@@ -2365,10 +2681,10 @@ async def apply_to_job(job: dict) -> tuple[bool, str]:
         if not _latest_done():
             p1_reason = stuck.trigger_reason if stuck.triggered else f"incomplete@step{agent.state.n_steps}"
             print(f"  [ORCHESTRATOR] Phase 1 failed ({p1_reason}). Phase 2: bu-1-0 nudge ({p2_steps} steps)...")
-            if _active_logger:
-                _active_logger.stuck_rescued = True
-                _active_logger.rescue_reason = p1_reason
-                _active_logger.log_step(agent.state.n_steps, 'phase1_failed', p1_reason)
+            if session_log:
+                session_log.stuck_rescued = True
+                session_log.rescue_reason = p1_reason
+                session_log.log_step(agent.state.n_steps, 'phase1_failed', p1_reason)
 
             nudge_task = f"""Continue this job application. The browser is already on the correct page.
 The previous attempt failed — analyze the current page state carefully.
@@ -2392,8 +2708,8 @@ Do NOT re-navigate to the job URL. Fix the immediate blocker and continue.
             result = await nudge_agent.run(on_step_end=stuck_nudge.on_step_end)
             all_agents.append(('bu-1-0:nudge', nudge_agent))
 
-            if _active_logger:
-                _active_logger.log_step(agent.state.n_steps + 1, 'nudge_complete',
+            if session_log:
+                session_log.log_step(agent.state.n_steps + 1, 'nudge_complete',
                     f"Done={nudge_agent.history.is_done()}")
 
         # ============ PHASE 3: bu-2-0 Blocker-Buster (short burst) ============
@@ -2403,8 +2719,8 @@ Do NOT re-navigate to the job URL. Fix the immediate blocker and continue.
             prev = all_agents[-1]
             p2_reason = "incomplete"
             print(f"  [ORCHESTRATOR] {prev[0]} failed. Phase 3: bu-2-0 Blocker-Buster ({p3_steps} steps)...")
-            if _active_logger:
-                _active_logger.log_step(agent.state.n_steps + 2, 'escalating_bu2', p2_reason)
+            if session_log:
+                session_log.log_step(agent.state.n_steps + 2, 'escalating_bu2', p2_reason)
 
             escalation_task = f"""Continue this job application. Previous attempts got stuck on this page.
 The browser is already positioned — do NOT re-navigate.
@@ -2455,8 +2771,8 @@ or different form interaction methods. Focus on getting PAST the current blocker
 
                     if not skip_deesc:
                         print(f"  [ORCHESTRATOR] bu-2-0 broke through blocker. DE-ESCALATING to bu-1-0 ({deesc_steps} steps)...")
-                        if _active_logger:
-                            _active_logger.log_step(agent.state.n_steps + 3, 'de_escalate', 'bu2_progress_detected')
+                        if session_log:
+                            session_log.log_step(agent.state.n_steps + 3, 'de_escalate', 'bu2_progress_detected')
 
                         # Context distillation: structured handoff instead of generic prompt
                         handoff = build_handoff_context(pre_bu2_state, post_bu2_state, "bu-2-0")
@@ -2482,8 +2798,8 @@ or different form interaction methods. Focus on getting PAST the current blocker
                         # Anti-thrashing: if bu-1-0 gets stuck AGAIN, go straight to Gemini
                         if not deesc_agent.history.is_done() and stuck_deesc.triggered:
                             print(f"  [ORCHESTRATOR] De-escalated bu-1-0 stuck again ({stuck_deesc.trigger_reason}). → Gemini")
-                            if _active_logger:
-                                _active_logger.log_step(agent.state.n_steps + 4, 'deesc_stuck', stuck_deesc.trigger_reason)
+                            if session_log:
+                                session_log.log_step(agent.state.n_steps + 4, 'deesc_stuck', stuck_deesc.trigger_reason)
                             # Fall through to Phase 4 below
                 else:
                     # No progress detected — bu-2-0 used all steps without getting stuck
@@ -2503,8 +2819,8 @@ or different form interaction methods. Focus on getting PAST the current blocker
             )
             if latest_stuck:
                 print(f"  [ORCHESTRATOR] Phase 4: Gemini 3 Pro advisory + bu-2-0 ({p4_steps} steps)...")
-                if _active_logger:
-                    _active_logger.log_step(agent.state.n_steps + 5, 'gemini_advisory', latest_name)
+                if session_log:
+                    session_log.log_step(agent.state.n_steps + 5, 'gemini_advisory', latest_name)
 
                 # Snapshot BEFORE Gemini+bu-2-0 intervention
                 pre_gemini_state = await snapshot_browser_state(browser)
@@ -2580,10 +2896,10 @@ The browser is on the correct page. Fix the issue described above and complete t
                             all_agents.append(('bu-1-0:final_deesc', final_deesc))
 
         # Log pipeline completion
-        if _active_logger and len(all_agents) > 1:
+        if session_log and len(all_agents) > 1:
             final_agent = all_agents[-1][1]
             phase_names = [name for name, _ in all_agents]
-            _active_logger.log_step(agent.state.n_steps + 6, 'pipeline_complete',
+            session_log.log_step(agent.state.n_steps + 6, 'pipeline_complete',
                 f"Phases: {' → '.join(phase_names)}. Done={final_agent.history.is_done()}")
 
         final_content = ""
@@ -2606,7 +2922,7 @@ The browser is on the correct page. Fix the issue described above and complete t
                         rescue_steps += ag_steps
 
             # Calculate proportional timestamps
-            session_start = _active_logger.start_time if _active_logger else datetime.now()
+            session_start = session_log.start_time if session_log else datetime.now()
             session_end = datetime.now()
             duration = (session_end - session_start).total_seconds()
             num_history = max(len(all_history), 1)
@@ -2623,8 +2939,8 @@ The browser is on the correct page. Fix the issue described above and complete t
                 for action_result in (step.result or []):
                     content = action_result.extracted_content or ''
                     if content and len(content) > 4:
-                        if _active_logger:
-                            _active_logger.log_step(total_steps, 'agent_action', content, url=step_url, ts=step_ts)
+                        if session_log:
+                            session_log.log_step(total_steps, 'agent_action', content, url=step_url, ts=step_ts)
                     # Check for done action
                     for action_result in (step.result or []):
                         if action_result.is_done and action_result.extracted_content:
@@ -2636,8 +2952,8 @@ The browser is on the correct page. Fix the issue described above and complete t
             total_steps = len(step_matches) if step_matches else 0
             step_contents = re.findall(r'extracted_content=[\'"]([^\'"]{5,200})[\'"]', result_str)
             for i, content in enumerate(step_contents):
-                if _active_logger:
-                    _active_logger.log_step(i + 1, 'agent_action', content)
+                if session_log:
+                    session_log.log_step(i + 1, 'agent_action', content)
 
         # Extract final result if not found from history API
         if not final_content:
@@ -2658,8 +2974,10 @@ The browser is on the correct page. Fix the issue described above and complete t
 
         # Helper to save log and return
         def _finish(success: bool, reason: str) -> tuple[bool, str]:
-            if _active_logger:
-                _active_logger.save(reason, success, total_steps)
+            nonlocal lease_reason
+            lease_reason = reason
+            if session_log:
+                session_log.save(reason, success, total_steps)
             return success, reason
 
         # ============ IMPROVED SUCCESS DETECTION (Phase 2) ============
@@ -2732,78 +3050,266 @@ The browser is on the correct page. Fix the issue described above and complete t
             else:
                 reason = "incomplete"
                 print(f"  [DEBUG] Incomplete after {total_steps} steps. Raw result tail: {result_str[-300:]}")
-            if _active_logger:
-                _active_logger.log_step(total_steps, 'incomplete_debug', result_str[-500:])
+            if session_log:
+                session_log.log_step(total_steps, 'incomplete_debug', result_str[-500:])
             return _finish(False, reason)
 
     except Exception as e:
         print(f"Error: {e}")
-        if _active_logger:
-            _active_logger.log_step(0, 'exception', str(e)[:300], error=str(e)[:200])
-            _active_logger.save(str(e)[:200], False)
+        if session_log:
+            session_log.log_step(0, 'exception', str(e)[:300], error=str(e)[:200])
+            session_log.save(str(e)[:200], False)
         return False, str(e)[:200]
 
     finally:
+        await _session_pool.release(lease, lease_reason)
+
+
+async def process_job(job: dict, skip_blocked: bool, worker_id: int = 1,
+                      triage: JobTriage | None = None, prefetcher: DocumentPrefetcher | None = None) -> str:
+    """Validate, apply to and file one claimed job. Returns the queue it was moved to."""
+    tag = f"[W{worker_id}] "
+
+    # ============ VALIDATION CHECKS ============
+    valid, reason = is_valid_job(job)
+    if not valid:
+        print(f"\n{tag}[SKIP] Invalid job data: {reason} - {job.get('title', 'Unknown')}")
+        move_job(job, "skipped", src=APPLYING_QUEUE, skip_reason=reason)
+        return "skipped"
+
+    if skip_blocked:
+        blocked, domain = is_blocked_ats(job.get('url', ''))
+        if blocked:
+            print(f"\n{tag}[SKIP] Blocked ATS ({domain}): {job.get('title', 'Unknown')}")
+            move_job(job, "skipped", src=APPLYING_QUEUE, skip_reason=f"blocked_ats:{domain}")
+            return "skipped"
+
+    # ============ DEDUP: never apply twice to the same posting ============
+    if get_dedup_index().was_applied(job):
+        print(f"\n{tag}[SKIP] Already applied (same URL or company+title): {job.get('title', 'Unknown')}")
+        move_job(job, "skipped", src=APPLYING_QUEUE, skip_reason="duplicate_applied")
+        return "skipped"
+
+    # ============ PRE-FLIGHT TRIAGE (skip without browser) ============
+    # Usually answered from the sweep's stored verdict; fetched here only if
+    # this job was claimed before the sweep reached it
+    if triage is not None and job.get('url'):
+        verdict, detail = await triage.verdict(job)
+        if verdict == EXTERNAL:
+            print(f"\n{tag}[TRIAGE] {job.get('company')}: External ATS detected (skipped browser launch)")
+            move_job(job, "external", src=APPLYING_QUEUE, apply_result='external_site',
+                     apply_timestamp=time.strftime('%Y-%m-%d %H:%M:%S'), triage=verdict)
+            return "external"
+        if verdict == EXPIRED:
+            print(f"\n{tag}[TRIAGE] {job.get('company')}: Job unavailable ({detail}) - skipped browser launch")
+            move_job(job, "skipped", src=APPLYING_QUEUE, skip_reason="job_unavailable", triage=verdict)
+            return "skipped"
+        if verdict == BLOCKED_ATS and skip_blocked:
+            print(f"\n{tag}[TRIAGE] {job.get('company')}: Blocked ATS ({detail}) - skipped browser launch")
+            move_job(job, "skipped", src=APPLYING_QUEUE, skip_reason=f"blocked_ats:{detail}", triage=verdict)
+            return "skipped"
+
+    # ============ APPLY ============
+    success, result_reason = await apply_to_job(job, prefetcher)
+
+    if success:
+        print(f"\n{tag}[SUCCESS] Applied to {job.get('company')}")
+        destination = "applied"
+    elif result_reason == "external_site":
+        print(f"\n{tag}[EXTERNAL] {job.get('company')}: Redirects to external ATS (saved for later)")
+        destination = "external"
+    else:
+        print(f"\n{tag}[FAILED] {job.get('company')}: {result_reason}")
+        destination = "failed"
+
+    move_job(job, destination, src=APPLYING_QUEUE, apply_result=result_reason,
+             apply_timestamp=time.strftime('%Y-%m-%d %H:%M:%S'))
+    if success:
+        get_dedup_index().mark_applied(job)
+    return destination
+
+
+@dataclass
+class ApplyResult:
+    """Outcome of one run_workers() call - returned to the orchestrator instead of parsed from stdout."""
+    processed: int = 0   # Jobs that reached applied/external/failed
+    skipped: int = 0
+    applied: int = 0
+    external: int = 0
+    failed: int = 0
+    duration: float = 0.0
+    factory_wait: float = 0.0  # Worker seconds spent waiting on resume generation
+
+
+async def session_health_check() -> bool:
+    """Check the cloud profile's Indeed login before a batch. Never blocks the run.
+    The session comes from the pool and goes back warm, so the first job reuses it."""
+    print("\n[HEALTH CHECK] Validating Indeed session via cloud profile...")
+    try:
+        lease = await _session_pool.acquire()
+        if lease is None:
+            raise RuntimeError("rate limited")
+        session_valid = False
         try:
-            await browser.close()
-        except:
-            pass
+            page = await lease.browser.get_current_page()
+            session_valid = await check_cookie_health(page)
+        finally:
+            # An expired login would fail every job on this session anyway
+            await _session_pool.release(lease, "" if session_valid else "needs_login", served=False)
+
+        if not session_valid:
+            print("\n" + "!"*60)
+            print("WARNING: Indeed session appears EXPIRED in cloud profile!")
+            print("Action required: Update cloud profile with fresh login")
+            print(f"Profile ID: {CLOUD_PROFILE_ID}")
+            print("!"*60)
+            print("\nContinuing anyway (some jobs may fail with needs_login)...")
+        else:
+            print("[HEALTH CHECK] Session VALID - Cloud profile is fresh")
+        return session_valid
+    except Exception as e:
+        print(f"[HEALTH CHECK] Could not validate: {e}")
+        print("Continuing anyway...")
+        return False
+
+
+async def run_workers(max_jobs: int, workers: int = APPLIER_WORKERS, skip_blocked: bool = True,
+                      producer: asyncio.Future | None = None) -> ApplyResult:
+    """Apply to up to `max_jobs` pending jobs with `workers` concurrent sessions.
+
+    Each worker claims one job at a time from the store (pending -> applying),
+    so concurrent workers and separate applier processes never share a job.
+    With `producer` (e.g. the hunter running alongside), an empty pending
+    queue only ends a worker once the producer has finished.
+
+    A triage task sweeps the pending queue alongside the workers (again every
+    PENDING_POLL_SECONDS while the producer runs), moving external, expired
+    and blocked jobs out before a worker spends a browser session on them.
+    Browser sessions stay warm between a worker's jobs and are closed here.
+    After each claim, the prefetcher starts resume generation for the next
+    PREFETCH_LOOKAHEAD pending jobs that have none, so a worker rarely waits
+    on the factory.
+    """
+    start_time = time.time()
+    store = queue_store.get_store()
+    stale = store.requeue(APPLYING_QUEUE, "pending", older_than_s=STALE_CLAIM_SECONDS)
+    if stale:
+        print(f"\n[QUEUE] Returned {stale} stale claimed jobs to pending")
+
+    workers = max(1, min(workers, max_jobs))
+    result = ApplyResult()
+    reserved = 0  # processed + in flight
+    print(f"\nStarting {workers} worker(s) for up to {max_jobs} jobs")
+
+    async def worker(worker_id: int):
+        nonlocal reserved
+        while reserved < max_jobs:
+            job = store.claim("pending", APPLYING_QUEUE)
+            if job is None:
+                if producer is None or producer.done():
+                    return
+                await asyncio.wait({producer}, timeout=PENDING_POLL_SECONDS)
+                continue
+            reserved += 1
+            prefetcher.scan()
+            try:
+                outcome = await process_job(job, skip_blocked, worker_id, triage, prefetcher)
+            except Exception as e:
+                print(f"\n[W{worker_id}] [FAILED] {job.get('company')}: worker error {e}")
+                move_job(job, "failed", src=APPLYING_QUEUE, apply_result=f"worker_error: {str(e)[:150]}",
+                         apply_timestamp=time.strftime('%Y-%m-%d %H:%M:%S'))
+                outcome = "failed"
+            if outcome == "skipped":
+                reserved -= 1
+                result.skipped += 1
+            else:
+                result.processed += 1
+                setattr(result, outcome, getattr(result, outcome) + 1)
 
+    async with JobTriage(skip_blocked=skip_blocked) as triage:
+        sweeper = asyncio.create_task(sweep_until(triage, producer, interval=PENDING_POLL_SECONDS))
+        prefetcher = DocumentPrefetcher(triage=triage)
+        prefetcher.scan()
+        try:
+            await asyncio.gather(*(worker(i + 1) for i in range(workers)))
+        finally:
+            sweeper.cancel()
+            await asyncio.gather(sweeper, return_exceptions=True)
+            await prefetcher.close()
+            await _session_pool.close_all()
+            await _uploader.close()
+    if triage.counts:
+        print(f"\n[TRIAGE] {dict(triage.counts)}")
+    print(f"\n[SESSION] {_session_pool.report()}")
+    print(f"[PREFETCH] {prefetcher.report()}")
+    result.factory_wait = prefetcher.stats['wait_s']
+    result.duration = time.time() - start_time
+    return result
+
+
+def write_batch_summary(jobs_processed: int):
+    """Generate session summary markdown for 6-step MCP analysis"""
+    session_logs = list(LOG_DIR.glob("*.json"))
+    if session_logs:
+        recent_logs = sorted(session_logs, key=lambda p: p.stat().st_mtime, reverse=True)[:jobs_processed]
+        summary_file = LOG_DIR / f"batch_summary_{time.strftime('%Y%m%d_%H%M%S')}.md"
+        lines = [f"# Batch Session Summary\n", f"**Date:** {time.strftime('%Y-%m-%d %H:%M:%S')}\n",
+                 f"**Version:** v5\n", f"**Jobs processed:** {jobs_processed}\n\n",
+                 "| # | Company | Type | Result | Steps | CAPTCHA | Errors |\n",
+                 "|---|---------|------|--------|-------|---------|--------|\n"]
+        for i, log_path in enumerate(reversed(recent_logs), 1):
+            try:
+                data = json.loads(log_path.read_text())
+                company = data['job'].get('company', '?')
+                result = data['session'].get('result', '?')
+                steps = data['session'].get('total_steps', 0)
+                success = data['session'].get('success', False)
+                captcha_count = len(data.get('captcha', []))
+                captcha_ok = sum(1 for c in data.get('captcha', []) if c.get('success'))
+                error_count = len(data.get('errors', []))
+                result_icon = 'SUCCESS' if success else result.upper()[:15]
+                captcha_str = f"{captcha_ok}/{captcha_count}" if captcha_count else "N/A"
+                lines.append(f"| {i} | {company} | Easy Apply | {result_icon} | {steps} | {captcha_str} | {error_count} |\n")
+            except Exception:
+                pass
+        prompts = get_prompt_stats().report()
+        if prompts:
+            lines.append(f"\n**Prompt tokens billed at full rate:** {format_prompt_report(prompts)}\n")
+        lines.append(f"\n**Browser sessions:** {_session_pool.report()}\n")
+        lines.append(f"\n**Session logs:** `{LOG_DIR}/`\n")
+        summary_file.write_text(''.join(lines))
+        print(f"\nSession summary: {summary_file}")
 
-async def main(max_jobs: int = 1, dry_run: bool = False, skip_blocked: bool = True, skip_health_check: bool = False):
+
+async def main(max_jobs: int = 1, dry_run: bool = False, skip_blocked: bool = True, skip_health_check: bool = False,
+               workers: int = APPLIER_WORKERS):
     """Main entry point"""
 
     print("\n" + "="*60)
     print("Indeed Easy Apply Bot v5.0")
-    print("Features: JS form injection, pre-detect external, footer click, improved logging")
+    print("Features: JS form injection, pre-flight triage, footer click, improved logging")
     print("="*60)
 
-    pending = load_queue("pending")
-    applied = load_queue("applied")
-    failed = load_queue("failed")
-    skipped = load_queue("skipped")
-    external = load_queue("external")  # Separate queue for external ATS jobs
+    counts = queue_store.queue_counts()  # external = separate queue for external ATS jobs
 
     print(f"\nQueue status:")
-    print(f"  Pending: {len(pending)}")
-    print(f"  Applied: {len(applied)}")
-    print(f"  Failed: {len(failed)}")
-    print(f"  Skipped: {len(skipped)}")
-    print(f"  External: {len(external)}")
+    print(f"  Pending: {counts['pending']}")
+    print(f"  Applied: {counts['applied']}")
+    print(f"  Failed: {counts['failed']}")
+    print(f"  Skipped: {counts['skipped']}")
+    print(f"  External: {counts['external']}")
 
-    if not pending:
+    if not counts['pending']:
         print("\nNo jobs in pending queue!")
         return
 
     # ============ SESSION HEALTH CHECK ============
     if not dry_run and not skip_health_check:
-        print("\n[HEALTH CHECK] Validating Indeed session via cloud profile...")
-        try:
-            health_browser = BrowserSession(
-                use_cloud=True,
-                cloud_profile_id=CLOUD_PROFILE_ID,
-            )
-            await health_browser.start()
-            page = await health_browser.get_current_page()
-            session_valid = await check_cookie_health(page)
-            await health_browser.stop()
-
-            if not session_valid:
-                print("\n" + "!"*60)
-                print("WARNING: Indeed session appears EXPIRED in cloud profile!")
-                print("Action required: Update cloud profile with fresh login")
-                print(f"Profile ID: {CLOUD_PROFILE_ID}")
-                print("!"*60)
-                print("\nContinuing anyway (some jobs may fail with needs_login)...")
-            else:
-                print("[HEALTH CHECK] Session VALID - Cloud profile is fresh")
-        except Exception as e:
-            print(f"[HEALTH CHECK] Could not validate: {e}")
-            print("Continuing anyway...")
+        await session_health_check()
 
     if dry_run:
         print("\n[DRY RUN MODE - No actual applications]")
-        for job in pending[:max_jobs]:
+        for job in load_queue("pending")[:max_jobs]:
             valid, reason = is_valid_job(job)
             blocked, domain = is_blocked_ats(job.get('url', ''))
             print(f"\n{job.get('title')} at {job.get('company')}")
@@ -2813,112 +3319,23 @@ async def main(max_jobs: int = 1, dry_run: bool = False, skip_blocked: bool = Tr
             print(f"  Resume: {get_resume_path(job) or 'None found'}")
         return
 
-    jobs_processed = 0
-    jobs_skipped = 0
-
-    while pending and jobs_processed < max_jobs:
-        job = pending.pop(0)
-
-        # ============ VALIDATION CHECKS ============
-        valid, reason = is_valid_job(job)
-        if not valid:
-            print(f"\n[SKIP] Invalid job data: {reason} - {job.get('title', 'Unknown')}")
-            job['skip_reason'] = reason
-            skipped.append(job)
-            save_queue("pending", pending)
-            save_queue("skipped", skipped)
-            jobs_skipped += 1
-            continue
-
-        if skip_blocked:
-            blocked, domain = is_blocked_ats(job.get('url', ''))
-            if blocked:
-                print(f"\n[SKIP] Blocked ATS ({domain}): {job.get('title', 'Unknown')}")
-                job['skip_reason'] = f"blocked_ats:{domain}"
-                skipped.append(job)
-                save_queue("pending", pending)
-                save_queue("skipped", skipped)
-                jobs_skipped += 1
-                continue
-
-        # ============ PRE-DETECT EXTERNAL (skip without browser) ============
-        job_url = job.get('url', '')
-        if job_url and 'indeed.com' in job_url:
-            pre_check = pre_detect_easy_apply(job_url)
-            if pre_check == 'external':
-                print(f"\n[PRE-DETECT] {job.get('company')}: External ATS detected (skipped browser launch)")
-                job['apply_result'] = 'external_site'
-                job['apply_timestamp'] = time.strftime('%Y-%m-%d %H:%M:%S')
-                external.append(job)
-                save_queue("pending", pending)
-                save_queue("external", external)
-                jobs_processed += 1
-                continue
-
-        # ============ APPLY ============
-        success, result_reason = await apply_to_job(job)
-
-        job['apply_result'] = result_reason
-        job['apply_timestamp'] = time.strftime('%Y-%m-%d %H:%M:%S')
-
-        if success:
-            print(f"\n[SUCCESS] Applied to {job.get('company')}")
-            applied.append(job)
-        elif result_reason == "external_site":
-            print(f"\n[EXTERNAL] {job.get('company')}: Redirects to external ATS (saved for later)")
-            external.append(job)
-        else:
-            print(f"\n[FAILED] {job.get('company')}: {result_reason}")
-            failed.append(job)
-
-        save_queue("pending", pending)
-        save_queue("applied", applied)
-        save_queue("failed", failed)
-        save_queue("external", external)
-
-        jobs_processed += 1
-
-        if pending and jobs_processed < max_jobs:
-            print(f"\nWaiting {DELAY_BETWEEN_JOBS}s before next job...")
-            await asyncio.sleep(DELAY_BETWEEN_JOBS)
+    result = await run_workers(max_jobs, workers=workers, skip_blocked=skip_blocked)
+    jobs_processed = result.processed
+    jobs_skipped = result.skipped
 
     print("\n" + "="*60)
     print("Session Complete")
     print("="*60)
+    counts = queue_store.queue_counts()
     print(f"Processed: {jobs_processed}")
+    print(f"Factory wait: {result.factory_wait:.0f}s")
     print(f"Skipped: {jobs_skipped}")
-    print(f"Applied: {len(applied)}")
-    print(f"External: {len(external)} (saved for later - need different approach)")
-    print(f"Failed: {len(failed)}")
-    print(f"Remaining: {len(pending)}")
+    print(f"Applied: {counts['applied']}")
+    print(f"External: {counts['external']} (saved for later - need different approach)")
+    print(f"Failed: {counts['failed']}")
+    print(f"Remaining: {counts['pending']}")
 
-    # Generate session summary markdown for 6-step MCP analysis
-    session_logs = list(LOG_DIR.glob("*.json"))
-    if session_logs:
-        recent_logs = sorted(session_logs, key=lambda p: p.stat().st_mtime, reverse=True)[:jobs_processed]
-        summary_file = LOG_DIR / f"batch_summary_{time.strftime('%Y%m%d_%H%M%S')}.md"
-        lines = [f"# Batch Session Summary\n", f"**Date:** {time.strftime('%Y-%m-%d %H:%M:%S')}\n",
-                 f"**Version:** v5\n", f"**Jobs processed:** {jobs_processed}\n\n",
-                 "| # | Company | Type | Result | Steps | CAPTCHA | Errors |\n",
-                 "|---|---------|------|--------|-------|---------|--------|\n"]
-        for i, log_path in enumerate(reversed(recent_logs), 1):
-            try:
-                data = json.loads(log_path.read_text())
-                company = data['job'].get('company', '?')
-                result = data['session'].get('result', '?')
-                steps = data['session'].get('total_steps', 0)
-                success = data['session'].get('success', False)
-                captcha_count = len(data.get('captcha', []))
-                captcha_ok = sum(1 for c in data.get('captcha', []) if c.get('success'))
-                error_count = len(data.get('errors', []))
-                result_icon = 'SUCCESS' if success else result.upper()[:15]
-                captcha_str = f"{captcha_ok}/{captcha_count}" if captcha_count else "N/A"
-                lines.append(f"| {i} | {company} | Easy Apply | {result_icon} | {steps} | {captcha_str} | {error_count} |\n")
-            except Exception:
-                pass
-        lines.append(f"\n**Session logs:** `{LOG_DIR}/`\n")
-        summary_file.write_text(''.join(lines))
-        print(f"\nSession summary: {summary_file}")
+    write_batch_summary(jobs_processed)
 
 
 if __name__ == "__main__":
@@ -2929,11 +3346,14 @@ if __name__ == "__main__":
     parser.add_argument("--dry-run", action="store_true", help="Preview without applying")
     parser.add_argument("--no-skip", action="store_true", help="Don't skip blocked ATS domains")
     parser.add_argument("--skip-health-check", action="store_true", help="Skip cookie health check at startup")
+    parser.add_argument("--workers", type=int, default=APPLIER_WORKERS,
+                        help="Concurrent browser sessions (default: APPLIER_WORKERS or 1)")
     args = parser.parse_args()
 
     asyncio.run(main(
         max_jobs=args.max,
         dry_run=args.dry_run,
         skip_blocked=not args.no_skip,
-        skip_health_check=args.skip_health_check
+        skip_health_check=args.skip_health_check,
+        workers=args.workers,
     ))
@@ -16,6 +16,3 @@ CANDIDATE = {
 
 # Paths
 ACCOUNTS_FILE = "/root/job_bot/agent/accounts.json"
-PENDING_FILE = "/root/job_bot/queue/pending.json"
-APPLIED_FILE = "/root/job_bot/queue/applied.json"
-FAILED_FILE = "/root/job_bot/queue/failed.json"
@@ -1,10 +1,15 @@
+import sys
 import json
 import time
 from pathlib import Path
 from datetime import datetime
-from config import ACCOUNTS_FILE, PENDING_FILE, APPLIED_FILE, FAILED_FILE
+from config import ACCOUNTS_FILE
 from agent import Agent
 
+# Appended (not inserted) so bot/config.py keeps priority over the root config.py
+sys.path.append("/root/job_bot")
+import queue_store
+
 def load_json(path):
     p = Path(path)
     return json.loads(p.read_text()) if p.exists() else []
@@ -21,9 +26,7 @@ def get_available_account(accounts):
 
 def run(max_jobs=None):
     accounts = load_json(ACCOUNTS_FILE)
-    pending = load_json(PENDING_FILE)
-    applied = load_json(APPLIED_FILE)
-    failed = load_json(FAILED_FILE)
+    pending = queue_store.load_queue("pending")
     
     if not pending:
         print("No pending jobs")
@@ -48,32 +51,27 @@ def run(max_jobs=None):
         agent = Agent(account)
         success, message = agent.run(job)
         
-        job['applied_at'] = datetime.now().isoformat()
-        job['message'] = message
+        updates = {'applied_at': datetime.now().isoformat(), 'message': message}
         
         if success:
             print(f"✅ {message}")
-            applied.append(job)
+            queue_store.move_job(job, "pending", "applied", **updates)
         else:
             print(f"❌ {message}")
-            failed.append(job)
+            queue_store.move_job(job, "pending", "failed", **updates)
             
             # Mark account if blocked
             if "blocked" in message.lower():
                 account['status'] = 'blocked'
                 save_json(ACCOUNTS_FILE, accounts)
         
-        # Save after each job
-        save_json(PENDING_FILE, pending)
-        save_json(APPLIED_FILE, applied)
-        save_json(FAILED_FILE, failed)
-        
         jobs_done += 1
         
         # Delay between jobs
         time.sleep(5)
     
-    print(f"\nDone. Applied: {len(applied)}, Failed: {len(failed)}")
+    counts = queue_store.queue_counts()
+    print(f"\nDone. Applied: {counts['applied']}, Failed: {counts['failed']}")
 
 if __name__ == "__main__":
     import argparse
@@ -1,7 +1,13 @@
 """
 Central config for job application system
 Both test scripts and production applier use this
+
+Importing this module is free: RESUME_PATH and API_KEY are evaluated on
+first access (see Settings) and then cached. Env overrides:
+    RESUME_PATH           Use this resume instead of the newest factory PDF
+    OPENROUTER_API_KEY    Skip reading agent/.env
 """
+from functools import cached_property
 from pathlib import Path
 import json
 import os
@@ -33,15 +39,11 @@ APPLICANT = {
 # ============ RESUME ============
 # Use most recent resume, or set a specific one
 def get_resume_path():
-    """Get most recent resume PDF"""
-    resumes = sorted(OUTPUT_DIR.glob("*_Resume.pdf"), key=lambda x: x.stat().st_mtime, reverse=True)
-    if resumes:
-        return str(resumes[0])
-    # Fallback - any PDF
-    pdfs = sorted(OUTPUT_DIR.glob("*.pdf"), key=lambda x: x.stat().st_mtime, reverse=True)
-    return str(pdfs[0]) if pdfs else None
-
-RESUME_PATH = get_resume_path()
+    """Get most recent resume PDF (from the artifact index, not a directory walk)"""
+    from artifact_index import get_artifact_index
+    index = get_artifact_index()
+    # Fallback - any factory PDF
+    return index.latest('resume') or index.latest()
 
 # ============ MODELS (LEGACY - used by bot/agent.py and bot/test_easy_apply.py only) ============
 # NOTE: The active applier (bot/applier.py) uses Browser-Use Cloud directly
@@ -69,11 +71,41 @@ def get_api_key():
                 return line.split("=", 1)[1].strip().strip('"')
     raise ValueError("No API key found in .env")
 
-API_KEY = get_api_key()
+
+# ============ LAZY SETTINGS ============
+class Settings:
+    """Values that cost I/O, computed on first access and cached.
+    reset() drops the cache (e.g. after new PDFs or a .env change)."""
+
+    @cached_property
+    def resume_path(self):
+        return os.getenv("RESUME_PATH") or get_resume_path()
+
+    @cached_property
+    def api_key(self):
+        return os.getenv("OPENROUTER_API_KEY") or get_api_key()
+
+    def reset(self):
+        for name in ("resume_path", "api_key"):
+            self.__dict__.pop(name, None)
+
+
+settings = Settings()
+
+# Module attributes kept for `from config import RESUME_PATH, API_KEY` (PEP 562):
+# only importers that ask for them pay for the lookup (and a missing key raises there)
+_LAZY = {"RESUME_PATH": "resume_path", "API_KEY": "api_key"}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        return getattr(settings, _LAZY[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # ============ PRINT CONFIG ============
 if __name__ == "__main__":
-    print(f"Resume: {RESUME_PATH}")
+    print(f"Resume: {settings.resume_path}")
     print(f"Applicant: {APPLICANT['name']} <{APPLICANT['email']}>")
     print(f"Models: {[m['name'] for m in MODELS]}")
-    print(f"API Key: {API_KEY[:20]}...")
+    print(f"API Key: {settings.api_key[:20]}...")
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Dedup Index - persistent "have we seen this job?" lookups
+=========================================================
+Shared by the hunter (URL dedup), the scorer (company+title dedup) and the
+applier (never apply twice to the same posting).
+
+Keys live in the same SQLite file as the queue store:
+    url:<normalized url>     Indeed postings normalize to url:indeed:<jk>
+    hash:<job_hash>          company+title key from job_hash()
+
+Near-duplicates (same description reposted by an agency or for another
+location, under a different company string or title) are caught by a
+64-bit SimHash of the description's word shingles. Hashes are bucketed by
+NEAR_DUP_BANDS 8-bit bands, so any two within NEAR_DUP_BANDS - 1 bits of
+each other share a bucket and a lookup only compares one bucket per band.
+
+Lookups are primary-key probes, so hunt startup no longer parses every queue
+to build a set of URLs. The index is filled incrementally as jobs land in a queue;
+an empty index is backfilled once from the queue store.
+
+Usage:
+    python3 dedup_index.py --stats
+    python3 dedup_index.py --rebuild      # Re-backfill from every queue
+"""
+
+import hashlib
+import re
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from queue_store import DB_PATH, QUEUE_NAMES, SQLiteStore, get_store
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen_jobs (
+    key TEXT PRIMARY KEY,
+    status TEXT NOT NULL DEFAULT 'seen',
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS near_dupes (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    simhash INTEGER NOT NULL,
+    rep TEXT NOT NULL,
+    first_seen TEXT NOT NULL,
+    PRIMARY KEY (band, bucket, simhash)
+) WITHOUT ROWID;
+"""
+
+# SQLite's default host-parameter limit is 999
+_CHUNK = 900
+
+# SimHash near-duplicates
+NEAR_DUP_BANDS = 8          # 8 x 8-bit bands: finds every pair within 7 bits
+SHINGLE_WORDS = 3           # Features are 3-word shingles
+MIN_SHINGLES = 30           # Shorter descriptions are too generic to compare
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+# ============================================
+# KEYS
+# ============================================
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a job URL. Indeed postings collapse to their jk= id."""
+    url = str(url or '').strip()
+    if not url or url.lower() == 'nan':
+        return ''
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if 'indeed.' in host:
+        jk = parse_qs(parts.query).get('jk') or parse_qs(parts.query).get('vjk')
+        if jk:
+            return f"indeed:{jk[0].lower()}"
+    return f"{host}{parts.path.rstrip('/')}"
+
+
+def job_hash(company: str, title: str) -> str:
+    """Create a normalized hash for company+title dedup."""
+    key = f"{str(company).lower().strip()}|{str(title).lower().strip()}"
+    return hashlib.md5(key.encode()).hexdigest()[:12]
+
+
+def url_key(url: str) -> str:
+    norm = normalize_url(url)
+    return f"url:{norm}" if norm else ''
+
+
+def hash_key(company: str, title: str) -> str:
+    return f"hash:{job_hash(company, title)}"
+
+
+def description_simhash(description: str) -> Optional[int]:
+    """64-bit SimHash of the description's word shingles (None if too short)."""
+    words = _WORD.findall(str(description or '').lower())
+    shingles = {' '.join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+    if len(shingles) < MIN_SHINGLES:
+        return None
+    digests = b''.join(hashlib.blake2b(s.encode(), digest_size=8).digest() for s in shingles)
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8)).reshape(len(shingles), 64)
+    votes = bits.sum(axis=0) * 2 > len(shingles)
+    return int.from_bytes(np.packbits(votes).tobytes(), 'big')
+
+
+def simhash_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+def _signed(h: int) -> int:
+    """SQLite INTEGER is signed 64-bit."""
+    return h - (1 << 64) if h >= (1 << 63) else h
+
+
+def _bands(h: int) -> List[Tuple[int, int]]:
+    width = 64 // NEAR_DUP_BANDS
+    return [(band, (h >> (band * width)) & ((1 << width) - 1)) for band in range(NEAR_DUP_BANDS)]
+
+
+# ============================================
+# INDEX
+# ============================================
+
+class DedupIndex(SQLiteStore):
+    """Persistent set of seen URL / company+title keys."""
+
+    def __init__(self, db_path: Path = DB_PATH):
+        super().__init__(db_path, SCHEMA)
+
+    def _has(self, key: str, status: Optional[str] = None) -> bool:
+        if not key:
+            return False
+        sql = "SELECT 1 FROM seen_jobs WHERE key = ?"
+        params = [key]
+        if status:
+            sql += " AND status = ?"
+            params.append(status)
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone() is not None
+
+    def _add(self, keys: Iterable[str], status: str = 'seen'):
+        """Insert keys; an existing 'applied' entry is never downgraded to 'seen'."""
+        now = datetime.now().isoformat()
+        rows = [(k, status, now, now) for k in set(keys) if k]
+        if not rows:
+            return
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO seen_jobs (key, status, first_seen, last_seen) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET last_seen = excluded.last_seen, "
+                "status = CASE WHEN seen_jobs.status = 'applied' THEN 'applied' ELSE excluded.status END",
+                rows,
+            )
+
+    # ---------- URLs ----------
+
+    def seen_url(self, url: str) -> bool:
+        return self._has(url_key(url))
+
+    def add_url(self, url: str):
+        self._add([url_key(url)])
+
+    def add_urls(self, urls: Iterable[str]):
+        self._add(url_key(u) for u in urls)
+
+    def unseen_urls(self, urls: Iterable[str]) -> Set[str]:
+        """Subset of `urls` not in the index (one query per chunk, not per URL)."""
+        by_key = {}
+        for url in urls:
+            key = url_key(url)
+            if key:
+                by_key.setdefault(key, url)
+        keys = list(by_key)
+        seen = set()
+        with self._lock:
+            for i in range(0, len(keys), _CHUNK):
+                chunk = keys[i:i + _CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                seen.update(k for (k,) in self._conn.execute(
+                    f"SELECT key FROM seen_jobs WHERE key IN ({placeholders})", chunk))
+        return {url for key, url in by_key.items() if key not in seen}
+
+    # ---------- company + title ----------
+
+    def seen_hash(self, company: str, title: str) -> bool:
+        return self._has(hash_key(company, title))
+
+    def seen_hashes(self, hashes: Iterable[str]) -> Set[str]:
+        """The job_hash() values of `hashes` already in the index."""
+        keys = list({f"hash:{h}" for h in hashes if h})
+        seen = set()
+        with self._lock:
+            for i in range(0, len(keys), _CHUNK):
+                chunk = keys[i:i + _CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                seen.update(k for (k,) in self._conn.execute(
+                    f"SELECT key FROM seen_jobs WHERE key IN ({placeholders})", chunk))
+        return {k[len("hash:"):] for k in seen}
+
+    def add_hashes(self, hashes: Iterable[str]):
+        self._add(f"hash:{h}" for h in hashes if h)
+
+    def check_and_add(self, company: str, title: str) -> bool:
+        """True if company+title was already seen; records it otherwise."""
+        key = hash_key(company, title)
+        with self._transaction() as conn:
+            if conn.execute("SELECT 1 FROM seen_jobs WHERE key = ?", (key,)).fetchone():
+                return True
+            now = datetime.now().isoformat()
+            conn.execute(
+                "INSERT INTO seen_jobs (key, status, first_seen, last_seen) VALUES (?, 'seen', ?, ?)",
+                (key, now, now),
+            )
+        return False
+
+    # ---------- near-duplicate descriptions ----------
+
+    def _near_match(self, h: int, max_distance: int, own: str) -> Optional[str]:
+        for band, bucket in _bands(h):
+            for other, rep in self._conn.execute(
+                    "SELECT simhash, rep FROM near_dupes WHERE band = ? AND bucket = ? AND rep != ?",
+                    (band, bucket, own)):
+                if simhash_distance(h, other % (1 << 64)) <= max_distance:
+                    return rep
+        return None
+
+    def near_dupes(self, items: Iterable[Tuple[int, str]], max_distance: int = 3,
+                   taken: Optional[List[Tuple[int, str]]] = None) -> Dict[str, str]:
+        """{rep: earlier rep} for the (simhash, rep) pairs within max_distance bits
+        of an indexed representative or of one in `taken` (this batch included).
+        Read-only: the others are appended to `taken`; add_simhashes() stores them."""
+        max_distance = min(max_distance, NEAR_DUP_BANDS - 1)
+        taken = [] if taken is None else taken
+        matches = {}
+        with self._lock:
+            for h, rep in items:
+                match = self._near_match(h, max_distance, rep)
+                if match is None:
+                    match = next((other_rep for other, other_rep in taken
+                                  if other_rep != rep and simhash_distance(h, other) <= max_distance), None)
+                if match is not None:
+                    matches[rep] = match
+                else:
+                    taken.append((h, rep))
+        return matches
+
+    def add_simhashes(self, items: Iterable[Tuple[int, str]]):
+        """Store (simhash, rep) pairs as near-duplicate cluster representatives."""
+        now = datetime.now().isoformat()
+        rows = [(band, bucket, _signed(h), rep, now) for h, rep in items for band, bucket in _bands(h)]
+        if not rows:
+            return
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO near_dupes (band, bucket, simhash, rep, first_seen) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def prune_near_dupes(self, max_age_days: int) -> int:
+        """Forget cluster representatives first seen more than max_age_days ago."""
+        cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat()
+        with self._transaction() as conn:
+            return conn.execute("DELETE FROM near_dupes WHERE first_seen < ?", (cutoff,)).rowcount // NEAR_DUP_BANDS
+
+    def near_dupe_count(self) -> int:
+        with self._lock:
+            (n,) = self._conn.execute(
+                "SELECT COUNT(*) FROM near_dupes WHERE band = 0").fetchone()
+        return n
+
+    # ---------- applier ----------
+
+    def mark_applied(self, job: dict):
+        self._add([url_key(job.get('url', '')),
+                   hash_key(job.get('company', ''), job.get('title', ''))], status='applied')
+
+    def was_applied(self, job: dict) -> bool:
+        """True if this posting (same URL, or same company+title) was already applied to."""
+        return (self._has(url_key(job.get('url', '')), 'applied')
+                or self._has(hash_key(job.get('company', ''), job.get('title', '')), 'applied'))
+
+    # ---------- maintenance ----------
+
+    def count(self) -> int:
+        with self._lock:
+            (n,) = self._conn.execute("SELECT COUNT(*) FROM seen_jobs").fetchone()
+        return n
+
+    def rebuild_from_queues(self) -> int:
+        """Backfill from every queue in the store. Applied jobs are marked 'applied'."""
+        store = get_store()
+        for name in QUEUE_NAMES:
+            jobs = store.load(name)
+            keys = [url_key(j.get('url', '')) for j in jobs]
+            keys += [hash_key(j.get('company', ''), j.get('title', '')) for j in jobs]
+            self._add(keys, status='applied' if name == 'applied' else 'seen')
+        return self.count()
+
+
+_index: Optional[DedupIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> DedupIndex:
+    """Process-wide index. An empty index is backfilled once from the queue store."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = DedupIndex()
+                if index.count() == 0:
+                    index.rebuild_from_queues()
+                _index = index
+    return _index
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Persistent job dedup index")
+    parser.add_argument("--rebuild", action="store_true", help="Backfill from all queues")
+    parser.add_argument("--stats", action="store_true", help="Print index size")
+    args = parser.parse_args()
+
+    index = get_index()
+    if args.rebuild:
+        print(f"Index rebuilt: {index.rebuild_from_queues()} keys")
+    else:
+        print(f"Dedup index: {index.count()} keys, {index.near_dupe_count()} description clusters")
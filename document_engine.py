@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Document Engine - local resume / cover letter generation
+========================================================
+In-process stand-in for the n8n factory (webhook -> LLM -> HTML -> Gotenberg
+-> /output). Same input (factory_payload) and the same response contract:
+
+    {'success': True, 'application_number': ..., 'company': ...,
+     'files': {'resume': <Company>_<n>_Resume.pdf, 'cover': <Company>_<n>_CoverLetter.pdf},
+     'stats': {'llm_s': ..., 'render_s': ..., 'total_s': ...}}
+
+so the hunter, the applier and the artifact index can't tell the two apart.
+Select it with FACTORY_BACKEND=local (factory_dispatcher routes to it).
+
+Pipeline per job: both documents are written concurrently by the LLM from the
+system prompts in prompts/ (the same instructions as the n8n writers), the
+HTML is cleaned exactly like n8n's "Prepare HTML" node, then both pages are
+rendered as one batch through a pooled renderer:
+
+    gotenberg    POST to the Gotenberg container directly (one keep-alive
+                 session, DOC_RENDER_WORKERS connections) - skips n8n only
+    weasyprint   Local rendering in a pool of DOC_RENDER_WORKERS processes,
+                 no container needed (pip install weasyprint)
+
+DOC_ENGINE_LLM=stub swaps the LLM for a template writer (optionally delayed
+by DOC_STUB_LATENCY seconds), so the whole path runs offline - for tests and
+for scripts/bench_documents.py.
+
+Settings (env):
+    DOC_ENGINE_LLM             'gemini' (default) or 'stub'
+    DOC_ENGINE_MODEL           Gemini model for the writers (default gemini-2.5-flash)
+    DOC_RENDERER               'gotenberg' (default) or 'weasyprint'
+    DOC_RENDER_WORKERS         Renderer connections / processes (default 4)
+    GOTENBERG_URL              Gotenberg base URL (default http://localhost:3000)
+    DOC_STUB_LATENCY           Seconds the stub writer sleeps per document (default 0)
+"""
+
+import asyncio
+import html
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import aiohttp
+
+from artifact_index import OUTPUT_DIR
+from factory_dispatcher import FactoryError, factory_payload
+from prompt_assembly import PromptPrefix, get_prompt_stats
+
+logger = logging.getLogger(__name__)
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+DOC_ENGINE_LLM = os.getenv('DOC_ENGINE_LLM', 'gemini')
+DOC_ENGINE_MODEL = os.getenv('DOC_ENGINE_MODEL', 'gemini-2.5-flash')
+DOC_RENDERER = os.getenv('DOC_RENDERER', 'gotenberg')
+DOC_RENDER_WORKERS = int(os.getenv('DOC_RENDER_WORKERS', '4'))
+GOTENBERG_URL = os.getenv('GOTENBERG_URL', 'http://localhost:3000')
+DOC_STUB_LATENCY = float(os.getenv('DOC_STUB_LATENCY', '0'))
+LLM_TIMEOUT = 120     # seconds per document (n8n's writer nodes allow about the same)
+RENDER_TIMEOUT = 60   # seconds per PDF
+
+PROMPTS_DIR = Path(__file__).resolve().parent / 'prompts'
+
+# kind -> (system prompt file, filename suffix, user instruction) - mirrors the n8n writer nodes
+DOCUMENTS = {
+    'resume': ('resume_system.txt', 'Resume',
+               "Create a 1-page tailored resume for this specific job. Match my experience to their "
+               "requirements. Emphasize relevant skills and projects. Quantify achievements. Return ONLY "
+               "valid HTML with inline CSS. No markdown. No code blocks."),
+    'cover': ('cover_letter_system.txt', 'CoverLetter',
+              "Write a compelling 1-page cover letter for this specific job. Show why I'm a great fit. "
+              "Include the meta-play: mention this application was generated by my autonomous job agent. "
+              "Be genuine, not generic. End with: \"Full transparency: This application was generated by "
+              "an autonomous job agent I built.\" Return ONLY valid HTML with inline CSS. No markdown. "
+              "No code blocks."),
+}
+
+# (system prompt, user prompt) -> HTML
+Writer = Callable[[PromptPrefix, str], Awaitable[str]]
+
+
+# ============================================
+# PROMPTS + HTML
+# ============================================
+
+_prefixes: Dict[str, PromptPrefix] = {}
+
+
+def document_prefix(kind: str) -> PromptPrefix:
+    """System prompt for a document kind, read from prompts/ once."""
+    if kind not in _prefixes:
+        filename = DOCUMENTS[kind][0]
+        _prefixes[kind] = PromptPrefix(f"doc_{kind}", (PROMPTS_DIR / filename).read_text().strip())
+    return _prefixes[kind]
+
+
+def document_prompt(kind: str, payload: dict, application_number: str) -> str:
+    """Per-job user prompt: the n8n writers' TARGET JOB block plus instructions."""
+    text = (f"=== TARGET JOB ===\n"
+            f"Company: {payload['company']}\n"
+            f"Title: {payload['title']}\n"
+            f"Location: {payload['location']}\n"
+            f"Description: {payload['description']}\n\n"
+            f"=== INSTRUCTIONS ===\n{DOCUMENTS[kind][2]}")
+    if kind == 'cover':
+        text += f"\nThis is employer #{application_number}."
+    return text
+
+
+def clean_html(raw: str, title: str) -> str:
+    """Strip markdown fences and wrap bare fragments (n8n 'Prepare HTML' node)."""
+    text = re.sub(r"```html\n?", "", raw or "", flags=re.IGNORECASE)
+    text = re.sub(r"```\n?", "", text).strip()
+    lower = text.lower()
+    if '<!doctype' not in lower and '<html' not in lower:
+        text = (f'<!DOCTYPE html><html><head><meta charset="UTF-8"><title>{html.escape(title)}</title>'
+                f'</head><body>{text}</body></html>')
+    return text
+
+
+def file_company(company: str) -> str:
+    """Company as n8n writes it into filenames (punctuation dropped, '_' joined, 30 chars)."""
+    name = re.sub(r"[^a-zA-Z0-9\s]", "", company or "Unknown")
+    return re.sub(r"\s+", "_", name)[:30]
+
+
+_number_lock = threading.Lock()
+_last_number = 0
+
+
+def next_application_number() -> str:
+    """Millisecond timestamp like n8n's Date.now(), but never repeated within a process."""
+    global _last_number
+    with _number_lock:
+        _last_number = max(_last_number + 1, int(time.time() * 1000))
+        return str(_last_number)
+
+
+# ============================================
+# WRITERS (LLM)
+# ============================================
+
+class GeminiWriter:
+    """Gemini writer; one model per system prompt, built on first use."""
+
+    def __init__(self, model: str = DOC_ENGINE_MODEL):
+        self.model_name = model
+        self._models = {}
+        self._loop = None
+
+    def _model(self, prefix: PromptPrefix):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._models, self._loop = {}, loop  # Async gRPC channels belong to one event loop
+        if prefix.kind not in self._models:
+            import google.generativeai as genai  # Heavy gRPC import - only when a document is written
+            genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+            self._models[prefix.kind] = genai.GenerativeModel(self.model_name, system_instruction=prefix.text)
+        return self._models[prefix.kind]
+
+    async def __call__(self, prefix: PromptPrefix, prompt: str) -> str:
+        response = await asyncio.wait_for(self._model(prefix).generate_content_async(prompt), LLM_TIMEOUT)
+        get_prompt_stats().record(prefix, prompt, response)
+        return response.text
+
+
+async def stub_writer(prefix: PromptPrefix, prompt: str) -> str:
+    """Offline writer: a plain document built from the prompt, after DOC_STUB_LATENCY seconds."""
+    if DOC_STUB_LATENCY > 0:
+        await asyncio.sleep(DOC_STUB_LATENCY)
+    job = dict(re.findall(r"^(Company|Title|Location): (.*)$", prompt, re.MULTILINE))
+    heading = 'Resume' if prefix.kind == 'doc_resume' else 'Cover Letter'
+    return (f"```html\n<h1 style=\"color:#2c3e50\">Brandon Ruiz - {heading}</h1>"
+            f"<p>{html.escape(job.get('Title', ''))} at {html.escape(job.get('Company', ''))}, "
+            f"{html.escape(job.get('Location', ''))}</p>\n```")
+
+
+def make_writer(name: str = DOC_ENGINE_LLM) -> Writer:
+    return stub_writer if name == 'stub' else GeminiWriter()
+
+
+# ============================================
+# RENDERERS (HTML -> PDF)
+# ============================================
+
+class GotenbergRenderer:
+    """Direct Gotenberg calls over one keep-alive session per event loop."""
+
+    def __init__(self, base_url: str = GOTENBERG_URL, workers: int = DOC_RENDER_WORKERS):
+        self.url = base_url.rstrip('/') + '/forms/chromium/convert/html'
+        self.workers = max(1, workers)
+        self._http: Optional[aiohttp.ClientSession] = None
+        self._loop = None
+
+    def _session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._http is None or self._loop is not loop:
+            # dispatch_jobs() runs a fresh loop per batch and a session can't cross
+            # loops; release() closes it before each loop ends
+            if self._http is not None:
+                logger.warning("Gotenberg session from an earlier event loop was never released")
+            self._http = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.workers),
+                timeout=aiohttp.ClientTimeout(total=RENDER_TIMEOUT),
+            )
+            self._loop = loop
+        return self._http
+
+    async def render(self, page: str) -> bytes:
+        form = aiohttp.FormData()
+        form.add_field('files', page.encode('utf-8'), filename='index.html', content_type='text/html')
+        try:
+            async with self._session().post(self.url, data=form) as response:
+                if response.status != 200:
+                    raise FactoryError(f"Gotenberg HTTP {response.status}", response.status >= 500)
+                return await response.read()
+        except asyncio.TimeoutError:
+            raise FactoryError(f"Gotenberg timeout ({RENDER_TIMEOUT}s)")
+        except aiohttp.ClientError as e:
+            raise FactoryError(f"Gotenberg connection failed: {e}")
+
+    async def render_many(self, pages: List[str]) -> List[bytes]:
+        return list(await asyncio.gather(*(self.render(page) for page in pages)))
+
+    async def close(self):
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+
+    async def release(self):
+        await self.close()
+
+
+def _weasyprint_pdf(page: str) -> bytes:
+    from weasyprint import HTML  # Optional dependency, imported in the worker process
+    return HTML(string=page).write_pdf()
+
+
+class WeasyPrintRenderer:
+    """Local rendering in a process pool (WeasyPrint is CPU-bound and not thread-safe)."""
+
+    def __init__(self, workers: int = DOC_RENDER_WORKERS):
+        self.workers = max(1, workers)
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    async def render_many(self, pages: List[str]) -> List[bytes]:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        loop = asyncio.get_running_loop()
+        try:
+            return list(await asyncio.gather(*(loop.run_in_executor(self._pool, _weasyprint_pdf, page)
+                                               for page in pages)))
+        except ImportError:
+            raise FactoryError("DOC_RENDERER=weasyprint needs `pip install weasyprint`", retryable=False)
+        except BrokenProcessPool as e:
+            # A worker died (OOM, segfault); start a fresh pool on the retry
+            self._pool = None
+            raise FactoryError(f"WeasyPrint worker died: {e}")
+        except Exception as e:
+            raise FactoryError(f"WeasyPrint render failed: {e}")
+
+    async def render(self, page: str) -> bytes:
+        return (await self.render_many([page]))[0]
+
+    async def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def release(self):
+        pass  # The pool isn't tied to an event loop; keep it for the next batch
+
+
+def make_renderer(name: str = DOC_RENDERER):
+    if name == 'weasyprint':
+        return WeasyPrintRenderer()
+    if name == 'gotenberg':
+        return GotenbergRenderer()
+    raise ValueError(f"Unknown DOC_RENDERER: {name}")
+
+
+# ============================================
+# ENGINE
+# ============================================
+
+class DocumentEngine:
+    """Writes and renders one job's resume + cover letter into `output_dir`."""
+
+    def __init__(self, writer: Optional[Writer] = None, renderer=None, output_dir: Path = OUTPUT_DIR):
+        self.writer = writer or make_writer()
+        self.renderer = renderer or make_renderer()
+        self.output_dir = Path(output_dir)
+
+    async def _write(self, kind: str, payload: dict, number: str) -> str:
+        prefix = document_prefix(kind)
+        try:
+            raw = await self.writer(prefix, document_prompt(kind, payload, number))
+        except asyncio.TimeoutError:
+            raise FactoryError(f"{kind} writer timeout ({LLM_TIMEOUT}s)")
+        except FactoryError:
+            raise
+        except Exception as e:
+            raise FactoryError(f"{kind} writer failed: {e}")
+        if not raw or not raw.strip():
+            raise FactoryError(f"{kind} writer returned nothing")
+        title = 'Resume - Brandon Ruiz' if kind == 'resume' else 'Cover Letter - Brandon Ruiz'
+        return clean_html(raw, title)
+
+    async def write(self, job: dict) -> dict:
+        """LLM stage only: {'payload', 'application_number', 'company', 'pages': {kind: html}, 'llm_s'}."""
+        payload = factory_payload(job)
+        number = str(job.get('application_number') or next_application_number())
+        start = time.monotonic()
+        pages = await asyncio.gather(*(self._write(kind, payload, number) for kind in DOCUMENTS))
+        return {'payload': payload, 'application_number': number, 'company': file_company(payload['company']),
+                'pages': dict(zip(DOCUMENTS, pages)), 'llm_s': time.monotonic() - start}
+
+    async def _save(self, drafts: List[dict]) -> List[dict]:
+        """Render every page of `drafts` as one batch, write the PDFs, build the responses."""
+        pages = [page for draft in drafts for page in draft['pages'].values()]
+        start = time.monotonic()
+        try:
+            pdfs = iter(await self.renderer.render_many(pages))
+        except FactoryError:
+            raise
+        except Exception as e:
+            raise FactoryError(f"render failed: {e}")
+        render_s = time.monotonic() - start
+        results = []
+        try:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            for draft in drafts:
+                files = {}
+                for kind in draft['pages']:
+                    filename = f"{draft['company']}_{draft['application_number']}_{DOCUMENTS[kind][1]}.pdf"
+                    await asyncio.to_thread((self.output_dir / filename).write_bytes, next(pdfs))
+                    files[kind] = filename
+                results.append({
+                    'success': True,
+                    'application_number': draft['application_number'],
+                    'company': draft['company'],
+                    'files': files,
+                    'stats': {'llm_s': round(draft['llm_s'], 2), 'render_s': round(render_s, 2),
+                              'total_s': round(draft['llm_s'] + render_s, 2), 'engine': 'local'},
+                })
+        except OSError as e:
+            raise FactoryError(f"saving PDFs to {self.output_dir} failed: {e}", retryable=False)
+        return results
+
+    async def generate(self, job: dict) -> dict:
+        """One job -> webhook-shaped response. Raises FactoryError."""
+        return (await self._save([await self.write(job)]))[0]
+
+    async def generate_many(self, jobs: List[dict]) -> List[Optional[dict]]:
+        """Write all jobs concurrently, then render every page in one batch.
+        None for jobs whose writing failed (logged)."""
+        drafts = await asyncio.gather(*(self.write(job) for job in jobs), return_exceptions=True)
+        ok = [draft for draft in drafts if not isinstance(draft, BaseException)]
+        for job, draft in zip(jobs, drafts):
+            if isinstance(draft, BaseException):
+                logger.error(f"  Document engine failed for {str(job.get('company', ''))[:25]}: {draft}")
+        saved = iter(await self._save(ok)) if ok else iter(())
+        return [None if isinstance(draft, BaseException) else next(saved) for draft in drafts]
+
+    async def release(self):
+        """Free what is tied to the running event loop (the Gotenberg session); call before it ends."""
+        await self.renderer.release()
+
+    async def close(self):
+        await self.renderer.close()
+
+
+_engine: Optional[DocumentEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_document_engine() -> DocumentEngine:
+    """Process-wide engine (writer and renderer pool reused across jobs)."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = DocumentEngine()
+    return _engine
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+    parser = argparse.ArgumentParser(description="Generate a resume + cover letter locally")
+    parser.add_argument("--company", default="Acme Corp")
+    parser.add_argument("--title", default="IT Support Specialist")
+    parser.add_argument("--location", default="Anaheim, CA")
+    parser.add_argument("--description", default="Help desk, Active Directory, Windows 11 support.")
+    parser.add_argument("--output", default=str(OUTPUT_DIR), help="Directory for the PDFs")
+    args = parser.parse_args()
+
+    async def _main():
+        engine = DocumentEngine(output_dir=Path(args.output))
+        try:
+            return await engine.generate(vars(args))
+        finally:
+            await engine.close()
+
+    print(json.dumps(asyncio.run(_main()), indent=2))
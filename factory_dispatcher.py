@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Factory Dispatcher - concurrent, rate-limited n8n resume generation
+===================================================================
+Sends jobs to the n8n resume factory webhook. Shared by the hunter (bulk
+dispatch of every passing job) and the applier (one-off generation when a
+pending job has no resume on disk).
+
+Instead of one blocking request followed by a fixed sleep per job, the
+dispatcher keeps up to FACTORY_MAX_IN_FLIGHT requests open, paces new
+requests with a token bucket, retries transient failures with exponential
+backoff and hands each result to a callback as soon as it finishes.
+
+FACTORY_BACKEND=local swaps the webhook for document_engine.py (LLM +
+pooled PDF renderer in-process, same response contract); retries, pacing
+and the in-flight cap apply to both.
+
+Settings (env):
+    FACTORY_BACKEND            'n8n' (default) or 'local'
+    N8N_WEBHOOK_URL            Factory webhook
+    FACTORY_MAX_IN_FLIGHT      Concurrent factory requests (default 3)
+    FACTORY_RATE_PER_MIN       Sustained request rate (default 6 = one per 10s)
+    FACTORY_BURST              Requests allowed back-to-back (default 2)
+    FACTORY_RETRIES            Retries per job after the first attempt (default 2)
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Callable, Iterable, List, Optional, Tuple
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+FACTORY_BACKEND = os.getenv('FACTORY_BACKEND', 'n8n')
+N8N_WEBHOOK_URL = os.getenv('N8N_WEBHOOK_URL', 'http://localhost:5678/webhook/incoming-job')
+FACTORY_TIMEOUT = 180  # seconds per request (n8n renders two PDFs)
+FACTORY_MAX_IN_FLIGHT = int(os.getenv('FACTORY_MAX_IN_FLIGHT', '3'))
+FACTORY_RATE_PER_MIN = float(os.getenv('FACTORY_RATE_PER_MIN', '6'))
+FACTORY_BURST = int(os.getenv('FACTORY_BURST', '2'))
+FACTORY_RETRIES = int(os.getenv('FACTORY_RETRIES', '2'))
+FACTORY_BACKOFF = 5.0  # seconds, doubled per retry
+
+# HTTP statuses worth retrying (n8n restarts, queue full, gateway hiccups)
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class FactoryError(Exception):
+    """Factory request failed. `retryable` is False for permanent errors."""
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+# ============================================
+# PAYLOAD
+# ============================================
+
+def clean_description(desc: str) -> str:
+    """Clean job description for n8n - normalize whitespace and fix escapes"""
+    if not desc:
+        return ""
+    # Fix escaped markdown characters
+    desc = desc.replace('\\-', '-').replace('\\*', '*').replace('\\_', '_')
+    # Normalize all whitespace to single spaces (fixes n8n JSON parsing issues)
+    desc = ' '.join(desc.split())
+    return desc[:3000]  # Truncate to 3000 chars
+
+
+def factory_payload(job: dict) -> dict:
+    """Webhook body. Accepts hunter rows (job_url) and queue entries (url)."""
+    return {
+        'title': str(job.get('title', 'Unknown')),
+        'company': str(job.get('company', 'Unknown')),
+        'description': clean_description(str(job.get('description', ''))),
+        'url': str(job.get('url') or job.get('job_url') or ''),
+        'location': str(job.get('location', '')),
+    }
+
+
+# ============================================
+# RATE LIMITING
+# ============================================
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens/second, holding at most `capacity`.
+
+    Thread-safe, so one bucket can pace callers on several event loops (the
+    hunter's dispatch thread and the applier's prefetcher run side by side).
+    A caller that finds no token reserves one by going into debt and sleeps
+    off its share outside the lock.
+    """
+
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                with self._lock:
+                    self._tokens += 1  # Hand the reserved token back
+                raise
+
+
+_bucket: Optional[TokenBucket] = None
+_bucket_lock = threading.Lock()
+
+
+def get_factory_bucket() -> TokenBucket:
+    """Process-wide FACTORY_RATE_PER_MIN bucket shared by every factory caller."""
+    global _bucket
+    if _bucket is None:
+        with _bucket_lock:
+            if _bucket is None:
+                _bucket = TokenBucket(FACTORY_RATE_PER_MIN / 60.0, FACTORY_BURST)
+    return _bucket
+
+
+# ============================================
+# REQUESTS
+# ============================================
+
+async def _post_job(session: aiohttp.ClientSession, job: dict) -> dict:
+    """One webhook call (or local generation). Raises FactoryError on any failure."""
+    if FACTORY_BACKEND == 'local':
+        from document_engine import get_document_engine  # Imports this module; load on demand
+        return await get_document_engine().generate(job)
+    try:
+        async with session.post(
+            N8N_WEBHOOK_URL,
+            json=factory_payload(job),
+            timeout=aiohttp.ClientTimeout(total=FACTORY_TIMEOUT),
+        ) as response:
+            if response.status not in (200, 202):
+                raise FactoryError(f"HTTP {response.status}", response.status in RETRYABLE_STATUS)
+            result = await response.json(content_type=None)
+    except asyncio.TimeoutError:
+        raise FactoryError(f"timeout ({FACTORY_TIMEOUT}s)")
+    except aiohttp.ClientError as e:
+        raise FactoryError(f"connection failed: {e}")
+    except ValueError as e:
+        raise FactoryError(f"bad response: {e}", retryable=False)
+    if not result:
+        raise FactoryError("empty response")
+    return result
+
+
+async def release_backend():
+    """Close the local engine's per-loop resources; call before the event loop ends."""
+    if FACTORY_BACKEND == 'local':
+        from document_engine import get_document_engine
+        await get_document_engine().release()
+
+
+async def send_with_retry(session: aiohttp.ClientSession, job: dict,
+                          retries: int = FACTORY_RETRIES,
+                          bucket: Optional[TokenBucket] = None) -> Optional[dict]:
+    """Send one job, retrying transient failures with exponential backoff."""
+    label = f"{str(job.get('company', ''))[:25]} - {str(job.get('title', ''))[:40]}"
+    for attempt in range(retries + 1):
+        if bucket:
+            await bucket.acquire()
+        try:
+            result = await _post_job(session, job)
+            logger.info(f"  Factory success: {label} (app #{result.get('application_number')})")
+            return result
+        except FactoryError as e:
+            if not e.retryable or attempt == retries:
+                logger.error(f"  Factory failed: {label}: {e}")
+                return None
+            delay = FACTORY_BACKOFF * (2 ** attempt)
+            logger.warning(f"  Factory {e} for {label}, retry {attempt + 1}/{retries} in {delay:.0f}s")
+            await asyncio.sleep(delay)
+    return None
+
+
+async def send_to_factory_async(job: dict, retries: int = FACTORY_RETRIES) -> Optional[dict]:
+    """Send a single job to the n8n resume factory (async version)"""
+    try:
+        async with aiohttp.ClientSession() as session:
+            return await send_with_retry(session, job, retries, get_factory_bucket())
+    finally:
+        await release_backend()
+
+
+# ============================================
+# DISPATCHER
+# ============================================
+
+class FactoryDispatcher:
+    """Concurrent dispatch of many jobs with an in-flight cap and a token bucket.
+
+    `on_result(job, result)` is called as each job succeeds, in completion
+    order, so callers can persist results without waiting for the batch.
+    With `limit`, at most that many jobs succeed: a job is only started while
+    successes + in-flight requests are below the limit. `jobs` may be a lazy or
+    blocking iterator; the dispatch ends when it is exhausted.
+    """
+
+    def __init__(self, max_in_flight: int = FACTORY_MAX_IN_FLIGHT,
+                 rate_per_min: float = FACTORY_RATE_PER_MIN,
+                 burst: int = FACTORY_BURST, retries: int = FACTORY_RETRIES):
+        self.max_in_flight = max(1, max_in_flight)
+        self.rate_per_min = rate_per_min
+        self.burst = burst
+        self.retries = retries
+        self.sent = 0
+        self.failed = 0
+
+    async def dispatch(self, jobs: Iterable[dict],
+                       on_result: Optional[Callable[[dict, dict], None]] = None,
+                       limit: Optional[int] = None) -> List[Tuple[dict, dict]]:
+        pending = iter(jobs)
+        results: List[Tuple[dict, dict]] = []
+        if (self.rate_per_min, self.burst) == (FACTORY_RATE_PER_MIN, FACTORY_BURST):
+            bucket = get_factory_bucket()  # Shared with the applier's prefetcher
+        else:
+            bucket = TokenBucket(self.rate_per_min / 60.0, self.burst)
+        reserved = 0  # successes + in-flight
+
+        pull_lock = asyncio.Lock()
+
+        async def worker(session):
+            nonlocal reserved
+            while limit is None or reserved < limit:
+                # `jobs` may be a blocking iterator (e.g. a queue fed while the
+                # hunter is still scoring), so pull from it off the event loop
+                async with pull_lock:
+                    if limit is not None and reserved >= limit:
+                        return
+                    job = await asyncio.to_thread(next, pending, None)
+                if job is None:
+                    return
+                reserved += 1
+                result = await send_with_retry(session, job, self.retries, bucket)
+                if not result:
+                    reserved -= 1
+                    self.failed += 1
+                    continue
+                self.sent += 1
+                results.append((job, result))
+                if on_result:
+                    try:
+                        on_result(job, result)
+                    except Exception as e:
+                        logger.error(f"  Factory result handler failed: {e}")
+
+        try:
+            async with aiohttp.ClientSession() as session:
+                await asyncio.gather(*(worker(session) for _ in range(self.max_in_flight)))
+        finally:
+            await release_backend()
+        return results
+
+
+def dispatch_jobs(jobs: Iterable[dict],
+                  on_result: Optional[Callable[[dict, dict], None]] = None,
+                  limit: Optional[int] = None, **kwargs) -> List[Tuple[dict, dict]]:
+    """Blocking wrapper for callers outside an event loop (e.g. the hunter)."""
+    return asyncio.run(FactoryDispatcher(**kwargs).dispatch(jobs, on_result, limit))
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Job Triage - pre-flight HTTP check of the pending queue
+=======================================================
+A cloud browser session is the most expensive thing the applier does, and
+used to be the first place a dead or external posting was discovered: one
+blocking requests.get per job, right before launch, with no connection
+reuse. Triage sweeps the pending queue ahead of the workers with one pooled
+aiohttp session (keep-alive, a total and a per-host connection cap) and
+classifies each posting:
+
+    easy_apply    Indeed apply widget present         -> stays pending
+    external      'Apply on company site' / redirect  -> external queue
+    expired       404/410 or JOB_UNAVAILABLE_KEYWORDS -> skipped (job_unavailable)
+    blocked_ats   URL or redirect on BLOCKED_ATS_DOMAINS -> skipped (blocked_ats:<domain>)
+    unknown       CAPTCHA, non-200, network error,    -> stays pending, browser decides
+                  any non-Indeed URL (never fetched)
+
+Verdicts are stored per normalized URL with a TTL (long for easy_apply,
+short for unknown), so a worker that claims an already-swept job launches
+the browser without another request, and a later sweep only re-checks
+jobs whose verdict expired. Queue moves only happen while the job is
+still pending, so a sweep never races a worker that claimed it.
+
+Settings (env):
+    TRIAGE_CONCURRENCY         Open connections in total (default 10)
+    TRIAGE_PER_HOST            Open connections per host (default 3)
+    TRIAGE_TIMEOUT             Seconds per request (default 10)
+    TRIAGE_TTL_HOURS           Lifetime of a definite verdict (default 12)
+    TRIAGE_UNKNOWN_TTL_HOURS   Lifetime of an 'unknown' verdict (default 1)
+
+Usage:
+    python3 job_triage.py --sweep          # Triage the pending queue now
+    python3 job_triage.py --stats          # Fresh verdicts by type
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+
+from dedup_index import url_key
+from queue_store import DB_PATH, SQLiteStore, get_store
+
+logger = logging.getLogger(__name__)
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+TRIAGE_CONCURRENCY = int(os.getenv('TRIAGE_CONCURRENCY', '10'))
+TRIAGE_PER_HOST = int(os.getenv('TRIAGE_PER_HOST', '3'))
+TRIAGE_TIMEOUT = float(os.getenv('TRIAGE_TIMEOUT', '10'))
+TRIAGE_TTL_HOURS = float(os.getenv('TRIAGE_TTL_HOURS', '12'))
+TRIAGE_UNKNOWN_TTL_HOURS = float(os.getenv('TRIAGE_UNKNOWN_TTL_HOURS', '1'))
+
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36')
+
+EASY_APPLY = 'easy_apply'
+EXTERNAL = 'external'
+EXPIRED = 'expired'
+BLOCKED_ATS = 'blocked_ats'
+UNKNOWN = 'unknown'
+
+# ============ BLOCKED DOMAINS (Complex ATS - skip these) ============
+BLOCKED_ATS_DOMAINS = [
+    'myworkdayjobs.com',
+    'myworkday.com',
+    'wd1.myworkdayjobs.com',
+    'wd3.myworkdayjobs.com',
+    'wd5.myworkdayjobs.com',
+    'icims.com',
+    'taleo.net',
+    'oraclecloud.com',
+    'brassring.com',
+    'ultipro.com',
+    'successfactors.com',  # Can work but often problematic
+]
+
+# Job unavailable indicators (fast-fail)
+JOB_UNAVAILABLE_KEYWORDS = [
+    'job has expired',
+    'job is no longer available',
+    'no longer accepting applications',
+    'job not found',
+    'this job post is no longer available',
+    'position has been filled',
+    'job listing has expired',
+    'this position is closed',
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS triage_verdicts (
+    url_key TEXT PRIMARY KEY,
+    verdict TEXT NOT NULL,
+    detail TEXT NOT NULL DEFAULT '',
+    checked_at TEXT NOT NULL,
+    expires_at TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+# ============================================
+# CLASSIFICATION
+# ============================================
+
+def blocked_domain(url: str) -> str:
+    """The BLOCKED_ATS_DOMAINS entry `url` is on, else ''."""
+    url_lower = (url or '').lower()
+    for domain in BLOCKED_ATS_DOMAINS:
+        if domain in url_lower:
+            return domain
+    return ''
+
+
+def classify(url: str, status: Optional[int] = None, final_url: str = '',
+             text: str = '') -> Tuple[str, str]:
+    """(verdict, detail) for a posting. Conservative: only strong signals give
+    external/expired; anything ambiguous is 'unknown' and left to the browser.
+    Call with just `url` to classify without fetching. Non-Indeed postings
+    (LinkedIn, direct ATS links) are always 'unknown': apply_to_job() handles
+    them with the external-site credentials, so triage must not route them."""
+    for candidate in (url, final_url):
+        domain = blocked_domain(candidate)
+        if domain:
+            return BLOCKED_ATS, domain
+    if 'indeed.com' not in (url or ''):
+        return UNKNOWN, 'not an Indeed URL'
+    if status is None:
+        return UNKNOWN, 'not fetched'
+    if status in (404, 410):
+        return EXPIRED, f'HTTP {status}'
+    if status != 200:
+        return UNKNOWN, f'HTTP {status}'
+    text_lower = text.lower()
+    # CAPTCHA / bot detection page = uncertain
+    if 'verify you are human' in text_lower or 'captcha' in text_lower:
+        return UNKNOWN, 'captcha'
+    for keyword in JOB_UNAVAILABLE_KEYWORDS:
+        if keyword in text_lower:
+            return EXPIRED, keyword
+    # Redirected away from Indeed
+    if final_url and 'indeed.com' not in final_url:
+        return EXTERNAL, f'redirect to {final_url[:100]}'
+    # Exact widget ids avoid false positives from footer/sidebar text
+    has_widget = 'indeedapplybutton' in text_lower or 'indeed-apply-widget' in text_lower
+    if 'apply on company site' in text_lower and not has_widget:
+        return EXTERNAL, 'apply on company site'
+    if has_widget:
+        return EASY_APPLY, ''
+    return UNKNOWN, 'no apply button found'
+
+
+# ============================================
+# VERDICT STORE
+# ============================================
+
+class VerdictStore(SQLiteStore):
+    """Per-URL triage verdicts with expiry, in the queue store's SQLite file."""
+
+    def __init__(self, db_path: Path = DB_PATH):
+        super().__init__(db_path, SCHEMA)
+
+    def get(self, url: str) -> Optional[Tuple[str, str]]:
+        """Unexpired (verdict, detail) for a URL, else None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT verdict, detail FROM triage_verdicts WHERE url_key = ? AND expires_at > ?",
+                (url_key(url), datetime.now().isoformat())).fetchone()
+        return tuple(row) if row else None
+
+    def put_many(self, verdicts: Iterable[Tuple[str, str, str]]):
+        """Store (url, verdict, detail) triples; 'unknown' expires sooner."""
+        now = datetime.now()
+        rows = []
+        for url, verdict, detail in verdicts:
+            hours = TRIAGE_UNKNOWN_TTL_HOURS if verdict == UNKNOWN else TRIAGE_TTL_HOURS
+            rows.append((url_key(url), verdict, detail, now.isoformat(),
+                         (now + timedelta(hours=hours)).isoformat()))
+        if rows:
+            with self._transaction() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO triage_verdicts (url_key, verdict, detail, checked_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?)", rows)
+
+    def prune(self) -> int:
+        with self._transaction() as conn:
+            return conn.execute("DELETE FROM triage_verdicts WHERE expires_at <= ?",
+                                (datetime.now().isoformat(),)).rowcount
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT verdict, COUNT(*) FROM triage_verdicts WHERE expires_at > ? GROUP BY verdict",
+                (datetime.now().isoformat(),)).fetchall()
+        return dict(rows)
+
+
+_verdicts: Optional[VerdictStore] = None
+_verdicts_lock = threading.Lock()
+
+
+def get_verdict_store() -> VerdictStore:
+    global _verdicts
+    if _verdicts is None:
+        with _verdicts_lock:
+            if _verdicts is None:
+                _verdicts = VerdictStore()
+    return _verdicts
+
+
+# ============================================
+# TRIAGE
+# ============================================
+
+class JobTriage:
+    """Pooled HTTP triage for one event loop. Use as `async with JobTriage() as triage:`."""
+
+    def __init__(self, concurrency: int = TRIAGE_CONCURRENCY, per_host: int = TRIAGE_PER_HOST,
+                 timeout: float = TRIAGE_TIMEOUT, skip_blocked: bool = True):
+        self.concurrency = max(1, concurrency)
+        self.per_host = max(1, per_host)
+        self.timeout = timeout
+        self.skip_blocked = skip_blocked
+        self.verdicts = get_verdict_store()
+        self.counts: Counter = Counter()
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self):
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={'User-Agent': USER_AGENT},
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        if self._session:
+            await self._session.close()
+            self._session = None
+
+    async def fetch(self, url: str) -> Tuple[str, str]:
+        """One GET (connection reused from the pool) -> (verdict, detail)."""
+        offline = classify(url)
+        if offline[0] != UNKNOWN or 'indeed.com' not in (url or ''):
+            return offline
+        try:
+            async with self._session.get(url, allow_redirects=True) as response:
+                text = await response.text(errors='replace') if response.status == 200 else ''
+                return classify(url, response.status, str(response.url), text)
+        except asyncio.TimeoutError:
+            return UNKNOWN, 'timeout'
+        except aiohttp.ClientError as e:
+            return UNKNOWN, f'{type(e).__name__}'
+
+    async def check(self, jobs: List[dict], refresh: bool = False) -> List[Tuple[dict, str, str]]:
+        """(job, verdict, detail) for each job: stored verdicts unless `refresh`,
+        the rest fetched concurrently and stored."""
+        results = []
+        to_fetch = []
+        for job in jobs:
+            cached = None if refresh else self.verdicts.get(job.get('url', ''))
+            if cached:
+                results.append((job, *cached))
+            else:
+                to_fetch.append(job)
+        fetched = await asyncio.gather(*(self.fetch(job.get('url', '')) for job in to_fetch))
+        self.verdicts.put_many((job.get('url', ''), verdict, detail)
+                               for job, (verdict, detail) in zip(to_fetch, fetched))
+        results.extend((job, verdict, detail) for job, (verdict, detail) in zip(to_fetch, fetched))
+        self.counts['fetched'] += len(to_fetch)
+        return results
+
+    async def verdict(self, job: dict) -> Tuple[str, str]:
+        """Stored verdict for one job, fetched now if missing or expired."""
+        (_, verdict, detail), = await self.check([job])
+        return verdict, detail
+
+    def route(self, job: dict, verdict: str, detail: str, src: str = 'pending') -> Optional[str]:
+        """Move a disqualified job out of `src`. Returns the destination queue,
+        or None when the job stays (qualified, unknown, or no longer in src)."""
+        stamp = time.strftime('%Y-%m-%d %H:%M:%S')
+        if verdict == EXTERNAL:
+            dst, updates = 'external', {'apply_result': 'external_site', 'apply_timestamp': stamp}
+        elif verdict == EXPIRED:
+            dst, updates = 'skipped', {'skip_reason': 'job_unavailable', 'apply_timestamp': stamp}
+        elif verdict == BLOCKED_ATS and self.skip_blocked:
+            dst, updates = 'skipped', {'skip_reason': f'blocked_ats:{detail}'}
+        else:
+            return None
+        if not get_store().transition(job, src, dst, triage=verdict, triage_detail=detail, **updates):
+            return None
+        return dst
+
+    async def sweep_pending(self, limit: Optional[int] = None) -> Counter:
+        """Triage every pending job without a fresh verdict and route the
+        disqualified ones. Returns verdict counts for this sweep."""
+        jobs = list(get_store().iter_jobs('pending', limit=limit))
+        swept = Counter()
+        for job, verdict, detail in await self.check(jobs):
+            swept[verdict] += 1
+            if self.route(job, verdict, detail):
+                swept['moved'] += 1
+        self.counts.update(swept)
+        return swept
+
+
+async def sweep_until(triage: JobTriage, producer: Optional[asyncio.Future] = None,
+                      interval: float = 30.0):
+    """Sweep now, then again every `interval` seconds while `producer` (the
+    hunter feeding the pending queue) runs. Cancel to stop early."""
+    while True:
+        swept = await triage.sweep_pending()
+        if swept:
+            logger.info(f"Triage: {dict(swept)}")
+        if producer is None or producer.done():
+            return
+        await asyncio.wait({producer}, timeout=interval)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+    parser = argparse.ArgumentParser(description="Pre-flight HTTP triage of the pending queue")
+    parser.add_argument("--sweep", action="store_true", help="Triage the pending queue now")
+    parser.add_argument("--limit", type=int, default=None, help="Only the oldest N pending jobs")
+    parser.add_argument("--no-skip", action="store_true", help="Leave blocked-ATS jobs pending")
+    parser.add_argument("--stats", action="store_true", help="Fresh verdicts by type")
+    args = parser.parse_args()
+
+    if args.sweep:
+        async def _sweep():
+            async with JobTriage(skip_blocked=not args.no_skip) as triage:
+                return await triage.sweep_pending(args.limit)
+        start = time.time()
+        swept = asyncio.run(_sweep())
+        print(f"Swept in {time.time() - start:.1f}s: {dict(swept)}")
+    get_verdict_store().prune()
+    print(f"Fresh verdicts: {get_verdict_store().counts()}")
@@ -8,6 +8,10 @@ Runs the complete job application pipeline:
   3. Send to n8n factory for resume generation (Gemini)
   4. Apply via Browser-Use Cloud
 
+The hunter and applier run in this process as pipeline stages. In live runs
+the applier starts on the first jobs the factory queues while later jobs
+are still being scored.
+
 Usage:
     python3 orchestrator.py --dry-run              # Scrape + score only
     python3 orchestrator.py --max-factory 20       # Cap jobs sent to factory
@@ -19,27 +23,28 @@ Usage:
 
 import asyncio
 import argparse
-import json
 import logging
-import subprocess
 import sys
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List
+from typing import Callable, Dict, Optional, Tuple
+
+from queue_store import queue_counts
 
 # ============================================
 # CONFIGURATION
 # ============================================
 
 QUEUE_DIR = Path("/root/job_bot/queue")
+AGENT_DIR = "/root/job_bot/agent"
+BOT_DIR = "/root/job_bot/bot"
 LOG_DIR = Path("/root/job_bot/logs")
 OUTPUT_DIR = Path("/root/output")
 STATUS_FILE = Path("/root/job_bot/PROJECT_STATUS.md")
 
 # Cost estimates
 COSTS = {
-    "haiku_per_job": 0.001,      # Scoring
     "opus_per_job": 0.30,        # Resume generation
     "browser_use_per_job": 0.08, # Application
 }
@@ -65,199 +70,131 @@ logger = logging.getLogger(__name__)
 # QUEUE HELPERS
 # ============================================
 
-def load_queue(name: str) -> list:
-    path = QUEUE_DIR / f"{name}.json"
-    if path.exists():
-        try:
-            return json.loads(path.read_text())
-        except (json.JSONDecodeError, ValueError):
-            return []
-    return []
+def get_queue_stats() -> Dict:
+    return queue_counts()
 
+# ============================================
+# PIPELINE STAGES (in-process)
+# ============================================
+# The hunter and applier are imported and awaited as library stages; results
+# come back as HuntResult / ApplyResult objects instead of parsed stdout. The
+# heavy imports (jobspy, pandas, browser_use, genai) are paid once, and only
+# for the stages a run actually uses.
 
-def save_queue(name: str, data: list):
-    path = QUEUE_DIR / f"{name}.json"
-    path.write_text(json.dumps(data, indent=2))
+def load_hunter(remote_only: bool = False, local_only: bool = False):
+    if AGENT_DIR not in sys.path:
+        sys.path.insert(0, AGENT_DIR)
+    import simple_hunter
+    simple_hunter.set_search_mode(remote_only=remote_only, local_only=local_only)
+    return simple_hunter
 
 
-def get_queue_stats() -> Dict:
-    return {
-        "pending": len(load_queue("pending")),
-        "applied": len(load_queue("applied")),
-        "failed": len(load_queue("failed")),
-        "skipped": len(load_queue("skipped")),
-    }
+def load_applier():
+    if BOT_DIR not in sys.path:
+        sys.path.insert(0, BOT_DIR)  # applier imports bot/utils.py as `utils`
+    import applier
+    return applier
 
-# ============================================
-# PHASE 1: SCRAPER + SCORER
-# ============================================
 
-def run_scraper(
+async def run_scraper(
     dry_run: bool = False,
     max_factory: int = None,
     remote_only: bool = False,
     local_only: bool = False,
-) -> Dict:
-    """Run the job scraper (simple_hunter.py)"""
+    on_pending: Optional[Callable[[dict], None]] = None,
+):
+    """Scrape + score + factory (simple_hunter.run_hunt) in a worker thread. Returns a HuntResult."""
+    hunter = load_hunter(remote_only=remote_only, local_only=local_only)
     logger.info("=" * 60)
     logger.info("PHASE 1: SCRAPING & SCORING")
     logger.info("=" * 60)
+    result = await asyncio.to_thread(
+        hunter.run_hunt, dry_run=dry_run, max_factory=max_factory, on_pending=on_pending,
+    )
+    logger.info(f"Scraper completed in {result.duration:.1f}s")
+    return result
 
-    cmd = ["python3", "/root/job_bot/agent/simple_hunter.py"]
-
-    if dry_run:
-        cmd.append("--dry-run")
-    if max_factory:
-        cmd.extend(["--max", str(max_factory)])
-    if remote_only:
-        cmd.append("--remote-only")
-    elif local_only:
-        cmd.append("--local-only")
-
-    logger.info(f"Running: {' '.join(cmd)}")
-    start_time = time.time()
-
-    try:
-        result = subprocess.run(
-            cmd,
-            cwd="/root/job_bot/agent",
-            capture_output=True,
-            text=True,
-            timeout=1800,  # 30 minute timeout
-        )
-
-        duration = time.time() - start_time
-        logger.info(f"Scraper completed in {duration:.1f}s")
-
-        # Parse output for stats
-        output = result.stdout + result.stderr
-        scored = 0
-        passed = 0
-        skipped = 0
-
-        for line in output.split("\n"):
-            if "Scored:" in line:
-                try:
-                    scored = int(line.split("Scored:")[1].split()[0])
-                except:
-                    pass
-            if "Passed" in line and "YES/MAYBE" in line:
-                try:
-                    passed = int(line.split(":")[1].split()[0])
-                except:
-                    pass
-            if "Skipped" in line and "NO" in line:
-                try:
-                    skipped = int(line.split(":")[1].split()[0])
-                except:
-                    pass
-
-        return {
-            "success": result.returncode == 0,
-            "duration": duration,
-            "scored": scored,
-            "passed": passed,
-            "skipped": skipped,
-            "cost_estimate": scored * COSTS["haiku_per_job"],
-        }
-
-    except subprocess.TimeoutExpired:
-        logger.error("Scraper timed out after 30 minutes")
-        return {"success": False, "error": "timeout"}
-    except Exception as e:
-        logger.error(f"Scraper failed: {e}")
-        return {"success": False, "error": str(e)}
-
-# ============================================
-# PHASE 2: APPLIER
-# ============================================
 
 async def run_applier(
     max_apply: int = 10,
     parallel: int = 1,
-) -> Dict:
-    """Run the job applier (applier.py)"""
+    producer: Optional[asyncio.Future] = None,
+):
+    """Apply with `parallel` concurrent browser sessions. Returns an ApplyResult.
+
+    With `producer` (the running scraper stage), workers start on the first
+    pending jobs and keep waiting for more until the scraper finishes.
+    """
+    applier = load_applier()
     logger.info("=" * 60)
-    logger.info("PHASE 2: APPLYING")
+    logger.info("PHASE 2: APPLYING" + (" (overlapped with scoring)" if producer else ""))
     logger.info("=" * 60)
 
-    pending = load_queue("pending")
-    if not pending:
+    if producer is None and not queue_counts()["pending"]:
         logger.info("No jobs in pending queue - skipping apply phase")
-        return {"success": True, "applied": 0, "failed": 0}
-
-    jobs_to_process = min(len(pending), max_apply)
-    logger.info(f"Processing {jobs_to_process} jobs (parallel: {parallel})")
-
-    start_time = time.time()
-    applied_count = 0
-    failed_count = 0
-
-    # Run in batches based on parallelism
-    for batch_start in range(0, jobs_to_process, parallel):
-        batch_size = min(parallel, jobs_to_process - batch_start)
-        logger.info(f"Batch {batch_start//parallel + 1}: Processing {batch_size} jobs...")
-
-        # Run applier for this batch
-        cmd = [
-            "python3", "/root/job_bot/bot/applier.py",
-            "--max", str(batch_size),
-        ]
-
-        try:
-            result = subprocess.run(
-                cmd,
-                cwd="/root/job_bot",
-                capture_output=True,
-                text=True,
-                timeout=600,  # 10 minute timeout per batch
-            )
-
-            # Count results
-            output = result.stdout + result.stderr
-            if "[SUCCESS]" in output:
-                applied_count += output.count("[SUCCESS]")
-            if "[FAILED]" in output:
-                failed_count += output.count("[FAILED]")
-
-            logger.info(f"Batch complete: {applied_count} applied, {failed_count} failed so far")
-
-        except subprocess.TimeoutExpired:
-            logger.error("Applier batch timed out")
-            failed_count += batch_size
-        except Exception as e:
-            logger.error(f"Applier error: {e}")
-            failed_count += batch_size
-
-        # Brief pause between batches
-        if batch_start + batch_size < jobs_to_process:
-            await asyncio.sleep(5)
-
-    duration = time.time() - start_time
+        return applier.ApplyResult()
+
+    logger.info(f"Processing up to {max_apply} jobs (parallel: {parallel})")
+    await applier.session_health_check()
+    result = await applier.run_workers(max_apply, workers=parallel, producer=producer)
+    applier.write_batch_summary(result.processed)
+    logger.info(f"Applier complete: {result.applied} applied, {result.external} external, "
+                f"{result.failed} failed, {result.skipped} skipped in {result.duration:.0f}s")
+    return result
 
-    return {
-        "success": True,
-        "duration": duration,
-        "applied": applied_count,
-        "failed": failed_count,
-        "cost_estimate": (applied_count + failed_count) * COSTS["browser_use_per_job"],
-    }
+
+async def run_pipeline(args: argparse.Namespace) -> Tuple[Optional[object], Optional[object]]:
+    """Run the requested stages. Live runs overlap scoring/factory with applying."""
+    hunt_task = None
+    if not args.skip_scrape:
+        first_pending = {}
+        start_time = time.time()
+
+        def on_pending(entry: dict):
+            if not first_pending:
+                first_pending['at'] = time.time() - start_time
+                logger.info(f"First job queued for applying after {first_pending['at']:.0f}s")
+
+        hunt_task = asyncio.create_task(run_scraper(
+            dry_run=args.dry_run,
+            max_factory=args.max_factory if not args.dry_run else None,
+            remote_only=args.remote_only,
+            local_only=args.local_only,
+            on_pending=on_pending,
+        ))
+    else:
+        logger.info("Skipping scrape phase (--skip-scrape)")
+
+    applier_result = None
+    if not args.dry_run:
+        applier_result = await run_applier(
+            max_apply=args.max_apply,
+            parallel=args.parallel,
+            producer=hunt_task,
+        )
+    else:
+        logger.info("Skipping apply phase (--dry-run)")
+
+    scraper_result = await hunt_task if hunt_task else None
+    return scraper_result, applier_result
 
 # ============================================
 # COST TRACKING
 # ============================================
 
-def calculate_run_costs(scraper_result: Dict, applier_result: Dict) -> Dict:
-    """Calculate total costs for this run"""
+def calculate_run_costs(scraper_result, applier_result) -> Dict:
+    """Calculate total costs for this run (either result may be None if its stage was skipped)"""
 
-    haiku_cost = scraper_result.get("cost_estimate", 0)
+    # Scoring: measured by the scorer's token ledger
+    haiku_cost = scraper_result.llm_cost if scraper_result else 0
 
-    # Factory cost (Opus) - estimate based on passed jobs
-    factory_jobs = scraper_result.get("passed", 0)
+    # Factory cost (Opus) - jobs actually sent to the factory
+    factory_jobs = scraper_result.sent_to_factory if scraper_result else 0
     opus_cost = factory_jobs * COSTS["opus_per_job"]
 
-    # Browser-Use cost
-    browser_cost = applier_result.get("cost_estimate", 0)
+    # Browser-Use cost - every job that got a browser session
+    browser_jobs = applier_result.applied + applier_result.failed if applier_result else 0
+    browser_cost = browser_jobs * COSTS["browser_use_per_job"]
 
     total = haiku_cost + opus_cost + browser_cost
 
@@ -270,8 +207,8 @@ def calculate_run_costs(scraper_result: Dict, applier_result: Dict) -> Dict:
 
 
 def log_run_summary(
-    scraper_result: Dict,
-    applier_result: Dict,
+    scraper_result,
+    applier_result,
     costs: Dict,
     args: argparse.Namespace,
 ):
@@ -288,15 +225,21 @@ def log_run_summary(
 
     logger.info("")
     logger.info("SCRAPING:")
-    logger.info(f"  Jobs scored: {scraper_result.get('scored', 'N/A')}")
-    logger.info(f"  Passed (YES/MAYBE): {scraper_result.get('passed', 'N/A')}")
-    logger.info(f"  Skipped (NO): {scraper_result.get('skipped', 'N/A')}")
+    if scraper_result:
+        logger.info(f"  Jobs scored: {scraper_result.scored}")
+        logger.info(f"  Passed (YES/MAYBE): {scraper_result.passed}")
+        logger.info(f"  Skipped (NO): {scraper_result.skipped}")
+        if not args.dry_run:
+            logger.info(f"  Sent to factory: {scraper_result.sent_to_factory}")
+    else:
+        logger.info("  Skipped (--skip-scrape)")
 
-    if not args.dry_run:
+    if applier_result:
         logger.info("")
         logger.info("APPLYING:")
-        logger.info(f"  Applied: {applier_result.get('applied', 0)}")
-        logger.info(f"  Failed: {applier_result.get('failed', 0)}")
+        logger.info(f"  Applied: {applier_result.applied}")
+        logger.info(f"  External: {applier_result.external}")
+        logger.info(f"  Failed: {applier_result.failed}")
 
     logger.info("")
     logger.info("COSTS:")
@@ -377,34 +320,11 @@ Examples:
     logger.info(f"Log file: {log_file}")
     logger.info("=" * 60)
 
-    scraper_result = {}
-    applier_result = {}
-
-    # Phase 1: Scrape + Score
-    if not args.skip_scrape:
-        scraper_result = run_scraper(
-            dry_run=args.dry_run,
-            max_factory=args.max_factory if not args.dry_run else None,
-            remote_only=args.remote_only,
-            local_only=args.local_only,
-        )
-
-        if not scraper_result.get("success"):
-            logger.error("Scraper failed - aborting")
-            sys.exit(1)
-    else:
-        logger.info("Skipping scrape phase (--skip-scrape)")
-        scraper_result = {"scored": 0, "passed": 0, "skipped": 0, "cost_estimate": 0}
-
-    # Phase 2: Apply (skip in dry run mode)
-    if not args.dry_run:
-        applier_result = await run_applier(
-            max_apply=args.max_apply,
-            parallel=args.parallel,
-        )
-    else:
-        applier_result = {"applied": 0, "failed": 0, "cost_estimate": 0}
-        logger.info("Skipping apply phase (--dry-run)")
+    try:
+        scraper_result, applier_result = await run_pipeline(args)
+    except Exception as e:
+        logger.error(f"Pipeline failed - aborting: {e}")
+        sys.exit(1)
 
     # Calculate costs and log summary
     costs = calculate_run_costs(scraper_result, applier_result)
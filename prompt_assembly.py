@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Prompt Assembly - static cached prefixes, per-call suffixes
+===========================================================
+Most of a scorer or form-mapping prompt is identical on every call: the
+instructions, the rules and the candidate profile. Prompts are split into
+
+    prefix  static text, sent as the model's system instruction so Gemini
+            can cache it (an explicit context cache where the SDK and the
+            prefix size allow it, implicit prefix caching otherwise)
+    suffix  the job or the form fields - the only part that changes
+
+PromptStats records, per prompt kind, tokens per call before (everything
+billed at the full input rate, as the old single-string prompts were) and
+after (prompt tokens minus the cached tokens reported in the response's
+usage metadata). The scorer and the applier share one stats object per
+process, reported per hunt / batch.
+
+profile_digest() trims a profile to a token budget on whole lines, for
+cheap tiers that can't afford the full profile on every call.
+
+Settings (env):
+    PROMPT_CACHE_TTL           Seconds an explicit context cache lives (default 3600)
+    PROFILE_DIGEST_TOKENS      Token budget for profile_digest() (default 600)
+"""
+
+import hashlib
+import os
+import threading
+from typing import Dict, Optional
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+PROMPT_CACHE_TTL = int(os.getenv('PROMPT_CACHE_TTL', '3600'))
+PROFILE_DIGEST_TOKENS = int(os.getenv('PROFILE_DIGEST_TOKENS', '600'))
+CHARS_PER_TOKEN = 4          # Rough English average; only used when the API reports nothing
+MIN_CACHE_TOKENS = 1024      # Smallest prefix Gemini 2.5 will cache (explicitly or implicitly)
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text or '') + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def profile_digest(profile: str, budget_tokens: int = PROFILE_DIGEST_TOKENS) -> str:
+    """First lines of `profile` that fit in `budget_tokens` (blank lines collapsed)."""
+    lines = []
+    used = 0
+    for line in profile.strip().splitlines():
+        line = line.rstrip()
+        if not line and (not lines or not lines[-1]):
+            continue
+        cost = estimate_tokens(line + '\n')
+        if used + cost > budget_tokens:
+            break
+        lines.append(line)
+        used += cost
+    return '\n'.join(lines).strip()
+
+
+# ============================================
+# PREFIX
+# ============================================
+
+class PromptPrefix:
+    """The static part of one prompt kind."""
+
+    def __init__(self, kind: str, text: str):
+        self.kind = kind
+        self.text = text
+        self.tokens = estimate_tokens(text)
+        self.fingerprint = hashlib.sha256(text.encode()).hexdigest()[:16]
+
+    @property
+    def cacheable(self) -> bool:
+        return self.tokens >= MIN_CACHE_TOKENS
+
+    def render(self, suffix: str) -> str:
+        """Whole prompt as one string, for models without a system instruction."""
+        return f"{self.text}\n\n{suffix}"
+
+
+# ============================================
+# STATS
+# ============================================
+
+def new_prompt_meter() -> Dict[str, int]:
+    return {'calls': 0, 'prefix_tokens': 0, 'suffix_tokens': 0,
+            'before_tokens': 0, 'after_tokens': 0, 'cached_tokens': 0}
+
+
+class PromptStats:
+    """Thread-safe tokens-per-call counters, keyed by prompt kind."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._meters: Dict[str, Dict[str, int]] = {}
+
+    def record(self, prefix: PromptPrefix, suffix: str, response=None, kind: Optional[str] = None):
+        """Count one call under `kind` (default: the prefix's). Uses the response's
+        usage metadata when present, estimates from the text otherwise (and then
+        assumes nothing was cached)."""
+        suffix_tokens = estimate_tokens(suffix)
+        usage = getattr(response, 'usage_metadata', None)
+        prompt_tokens = getattr(usage, 'prompt_token_count', 0) or 0
+        cached = getattr(usage, 'cached_content_token_count', 0) or 0
+        before = prompt_tokens or prefix.tokens + suffix_tokens
+        with self._lock:
+            meter = self._meters.setdefault(kind or prefix.kind, new_prompt_meter())
+            meter['calls'] += 1
+            meter['prefix_tokens'] += prefix.tokens
+            meter['suffix_tokens'] += suffix_tokens
+            meter['before_tokens'] += before
+            meter['after_tokens'] += before - cached
+            meter['cached_tokens'] += cached
+
+    def report(self, reset: bool = False) -> Dict[str, Dict[str, float]]:
+        """Per kind: calls plus per-call averages of the counters above."""
+        with self._lock:
+            meters = {kind: dict(meter) for kind, meter in self._meters.items()}
+            if reset:
+                self._meters = {}
+        report = {}
+        for kind, meter in meters.items():
+            calls = max(meter['calls'], 1)
+            report[kind] = {'calls': meter['calls']}
+            for name in ('prefix_tokens', 'suffix_tokens', 'before_tokens', 'after_tokens', 'cached_tokens'):
+                report[kind][name] = round(meter[name] / calls)
+        return report
+
+
+_stats: Optional[PromptStats] = None
+_stats_lock = threading.Lock()
+
+
+def get_prompt_stats() -> PromptStats:
+    global _stats
+    if _stats is None:
+        with _stats_lock:
+            if _stats is None:
+                _stats = PromptStats()
+    return _stats
+
+
+def format_prompt_report(report: Dict[str, Dict[str, float]]) -> str:
+    """One line per kind: 'score 5,210 -> 940 tok/call (x12)'."""
+    return ', '.join(f"{kind} {m['before_tokens']:,} -> {m['after_tokens']:,} tok/call (x{m['calls']})"
+                     for kind, m in sorted(report.items()))
@@ -0,0 +1,564 @@
+#!/usr/bin/env python3
+"""
+Queue Store - SQLite-backed job state machine
+=============================================
+Single store for the pending/applied/failed/skipped/external/manual queues.
+Replaces the per-status JSON files in /root/job_bot/queue/ that were rewritten
+in full on every job move.
+
+Each job is one row with an indexed status column, so a state change is a
+single-row UPDATE inside a transaction instead of re-serializing the whole
+history. WAL mode keeps readers (orchestrator stats, review tooling) from
+blocking the hunter and applier.
+
+Usage:
+    python3 queue_store.py --import              # One-shot import of queue/*.json
+    python3 queue_store.py --stats               # Row counts per status
+    python3 queue_store.py --export skipped      # Dump a queue as JSON (for review)
+    python3 queue_store.py --skipped --reason Pre-filter --limit 50
+    python3 queue_store.py --compact skipped --max-age-days 30
+"""
+
+import atexit
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+QUEUE_DIR = Path("/root/job_bot/queue")
+DB_PATH = QUEUE_DIR / "queue.db"
+
+# Statuses that had their own JSON file before the store existed
+QUEUE_NAMES = ['pending', 'applied', 'failed', 'skipped', 'external', 'manual']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_key TEXT NOT NULL,
+    status TEXT NOT NULL,
+    url TEXT NOT NULL DEFAULT '',
+    data TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, seq);
+CREATE INDEX IF NOT EXISTS idx_jobs_key ON jobs(job_key, status);
+CREATE INDEX IF NOT EXISTS idx_jobs_url ON jobs(url);
+CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs(status, created_at);
+CREATE TABLE IF NOT EXISTS imports (
+    name TEXT PRIMARY KEY,
+    rows INTEGER NOT NULL,
+    imported_at TEXT NOT NULL
+);
+"""
+
+
+def job_key(job: dict) -> str:
+    """Stable identity for a queue entry: hunter id, else URL, else app number."""
+    for field in ('id', 'url', 'application_number'):
+        value = job.get(field)
+        if value:
+            return str(value)
+    return ''
+
+
+# ============================================
+# CONNECTION
+# ============================================
+
+class SQLiteStore:
+    """One WAL connection shared by the threads of a process.
+
+    Base for the tables kept in queue.db (and the score cache): reads take
+    `_lock`, writes go through `_transaction()`.
+    """
+
+    def __init__(self, db_path: Path = DB_PATH, schema: str = ''):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            str(self.db_path),
+            timeout=30,
+            isolation_level=None,  # Explicit BEGIN/COMMIT in _transaction()
+            check_same_thread=False,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        if schema:
+            self._conn.executescript(schema)
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            else:
+                self._conn.execute("COMMIT")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# ============================================
+# STORE
+# ============================================
+
+class QueueStore(SQLiteStore):
+    """Transactional job queue. Safe to share between threads of one process."""
+
+    def __init__(self, db_path: Path = DB_PATH):
+        super().__init__(db_path, SCHEMA)
+
+    # ---------- reads ----------
+
+    def load(self, status: str) -> List[dict]:
+        """All jobs in a status, oldest first (same order as the old JSON lists)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM jobs WHERE status = ? ORDER BY seq", (status,)
+            ).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def count(self, status: str) -> int:
+        with self._lock:
+            (n,) = self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ?", (status,)
+            ).fetchone()
+        return n
+
+    def counts(self) -> Dict[str, int]:
+        """Row count per status. Always includes the classic queue names."""
+        result = {name: 0 for name in QUEUE_NAMES}
+        with self._lock:
+            for status, n in self._conn.execute(
+                "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+            ):
+                result[status] = n
+        return result
+
+    def urls(self, statuses: Iterable[str] = QUEUE_NAMES) -> set:
+        """URLs present in any of the given statuses (index-only scan, no JSON decode)."""
+        statuses = list(statuses)
+        placeholders = ",".join("?" * len(statuses))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT DISTINCT url FROM jobs WHERE status IN ({placeholders}) AND url != ''",
+                statuses,
+            ).fetchall()
+        return {url for (url,) in rows}
+
+    def iter_jobs(self, status: str, since: Optional[str] = None, limit: Optional[int] = None,
+                  newest_first: bool = False) -> Iterator[dict]:
+        """Stream jobs in a status without materializing the whole queue.
+
+        `since` is an ISO timestamp compared against the row's created_at.
+        """
+        sql = "SELECT data FROM jobs WHERE status = ?"
+        params: list = [status]
+        if since:
+            sql += " AND created_at >= ?"
+            params.append(since)
+        sql += " ORDER BY seq DESC" if newest_first else " ORDER BY seq"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        for (data,) in rows:
+            yield json.loads(data)
+
+    # ---------- writes ----------
+
+    def add(self, status: str, job: dict):
+        self.add_many(status, [job])
+
+    def add_many(self, status: str, jobs: List[dict]):
+        """Append jobs to a status in one transaction."""
+        if not jobs:
+            return
+        now = datetime.now().isoformat()
+        rows = [
+            (job_key(job), status, str(job.get('url', '') or ''), json.dumps(job), now, now)
+            for job in jobs
+        ]
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO jobs (job_key, status, url, data, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def move(self, job: dict, src: str, dst: str, **updates) -> dict:
+        """Atomically move a job from src to dst, merging `updates` into its data.
+
+        The caller's dict is the source of truth for the new row contents (it
+        usually carries fresh apply_result/timestamps). If the job is not in
+        src any more it is still recorded in dst, so a move never loses a job.
+        """
+        job.update(updates)
+        key = job_key(job)
+        now = datetime.now().isoformat()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT seq FROM jobs WHERE job_key = ? AND status = ? ORDER BY seq LIMIT 1",
+                (key, src),
+            ).fetchone()
+            if row:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, url = ?, data = ?, updated_at = ? WHERE seq = ?",
+                    (dst, str(job.get('url', '') or ''), json.dumps(job), now, row[0]),
+                )
+            else:
+                conn.execute(
+                    "INSERT INTO jobs (job_key, status, url, data, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, dst, str(job.get('url', '') or ''), json.dumps(job), now, now),
+                )
+        return job
+
+    def transition(self, job: dict, src: str, dst: str, **updates) -> bool:
+        """Like move(), but only if the job is still in src. False (and nothing
+        written) when another worker already took it, e.g. claimed it for applying.
+        """
+        key = job_key(job)
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT seq FROM jobs WHERE job_key = ? AND status = ? ORDER BY seq LIMIT 1",
+                (key, src),
+            ).fetchone()
+            if not row:
+                return False
+            job.update(updates)
+            conn.execute(
+                "UPDATE jobs SET status = ?, url = ?, data = ?, updated_at = ? WHERE seq = ?",
+                (dst, str(job.get('url', '') or ''), json.dumps(job), datetime.now().isoformat(), row[0]),
+            )
+        return True
+
+    def remove(self, job: dict, status: str) -> bool:
+        """Delete one entry for this job from `status`. False if it wasn't there."""
+        with self._transaction() as conn:
+            cur = conn.execute(
+                "DELETE FROM jobs WHERE seq = ("
+                "SELECT seq FROM jobs WHERE job_key = ? AND status = ? ORDER BY seq LIMIT 1)",
+                (job_key(job), status),
+            )
+        return cur.rowcount > 0
+
+    def claim(self, src: str, dst: str) -> Optional[dict]:
+        """Atomically take the oldest job in src and move it to dst.
+
+        Concurrent workers (threads, tasks or separate processes) each get a
+        different job: the select and the status change share one write lock.
+        """
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT seq, data FROM jobs WHERE status = ? ORDER BY seq LIMIT 1", (src,)
+            ).fetchone()
+            if not row:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE seq = ?",
+                (dst, datetime.now().isoformat(), row[0]),
+            )
+        return json.loads(row[1])
+
+    def requeue(self, src: str, dst: str, older_than_s: float = 0) -> int:
+        """Move jobs left in src (e.g. claims from a crashed worker) back to dst."""
+        cutoff = (datetime.now() - timedelta(seconds=older_than_s)).isoformat()
+        with self._transaction() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE status = ? AND updated_at <= ?",
+                (dst, datetime.now().isoformat(), src, cutoff),
+            )
+        return cur.rowcount
+
+    def update(self, job: dict, status: str, **updates) -> bool:
+        """Rewrite a job's data in place without changing its status."""
+        job.update(updates)
+        with self._transaction() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET url = ?, data = ?, updated_at = ? WHERE seq = ("
+                "SELECT seq FROM jobs WHERE job_key = ? AND status = ? ORDER BY seq LIMIT 1)",
+                (str(job.get('url', '') or ''), json.dumps(job), datetime.now().isoformat(), job_key(job), status),
+            )
+        return cur.rowcount > 0
+
+    def replace(self, status: str, jobs: List[dict]):
+        """Replace every job in a status (legacy save_queue semantics), atomically."""
+        now = datetime.now().isoformat()
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM jobs WHERE status = ?", (status,))
+            conn.executemany(
+                "INSERT INTO jobs (job_key, status, url, data, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(job_key(j), status, str(j.get('url', '') or ''), json.dumps(j), now, now) for j in jobs],
+            )
+
+    def compact(self, status: str, max_age_days: Optional[float] = None) -> int:
+        """Drop repeated entries (same job_key, newest kept) and, optionally, rows
+        older than `max_age_days`. Returns the number of rows removed.
+        """
+        with self._transaction() as conn:
+            removed = conn.execute(
+                "DELETE FROM jobs WHERE status = ? AND job_key != '' AND seq NOT IN ("
+                "SELECT MAX(seq) FROM jobs WHERE status = ? GROUP BY job_key)",
+                (status, status),
+            ).rowcount
+            if max_age_days is not None:
+                cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat()
+                removed += conn.execute(
+                    "DELETE FROM jobs WHERE status = ? AND created_at < ?", (status, cutoff)
+                ).rowcount
+        return removed
+
+    def vacuum(self):
+        """Return freed pages to the filesystem (run after a large compact)."""
+        with self._lock:
+            self._conn.execute("VACUUM")
+
+    # ---------- import / export ----------
+
+    def import_json(self, queue_dir: Path = QUEUE_DIR, names: Iterable[str] = QUEUE_NAMES,
+                    force: bool = False) -> Dict[str, int]:
+        """One-shot import of the legacy <name>.json queue files.
+
+        Each file is imported at most once (tracked in the `imports` table) so
+        re-running is harmless. The JSON files are left in place as a backup.
+        """
+        imported = {}
+        for name in names:
+            path = Path(queue_dir) / f"{name}.json"
+            if not path.exists():
+                continue
+            with self._lock:
+                done = self._conn.execute(
+                    "SELECT rows FROM imports WHERE name = ?", (name,)
+                ).fetchone()
+            if done and not force:
+                continue
+            try:
+                jobs = json.loads(path.read_text())
+            except (json.JSONDecodeError, ValueError):
+                print(f"  [QUEUE] Skipping unreadable {path}")
+                continue
+            if not isinstance(jobs, list):
+                continue
+
+            now = datetime.now().isoformat()
+            with self._transaction() as conn:
+                if force:
+                    conn.execute("DELETE FROM jobs WHERE status = ?", (name,))
+                conn.executemany(
+                    "INSERT INTO jobs (job_key, status, url, data, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(job_key(j), name, str(j.get('url', '') or ''), json.dumps(j),
+                      j.get('created_at') or j.get('skipped_at') or now, now)
+                     for j in jobs if isinstance(j, dict)],
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO imports (name, rows, imported_at) VALUES (?, ?, ?)",
+                    (name, len(jobs), now),
+                )
+            imported[name] = len(jobs)
+        return imported
+
+    def export_json(self, status: str, path: Optional[Path] = None) -> str:
+        """Serialize one status as the old JSON list format."""
+        text = json.dumps(self.load(status), indent=2)
+        if path:
+            Path(path).write_text(text)
+        return text
+
+
+# ============================================
+# BUFFERED APPEND LOG
+# ============================================
+
+class BufferedQueueWriter:
+    """Append-only writer for high-volume, write-mostly queues (e.g. skipped).
+
+    Entries are held in memory and inserted with one add_many() transaction
+    once `batch_size` entries are buffered or `flush_interval` seconds have
+    passed. Call flush() at the end of a run; buffers still pending at
+    interpreter exit are flushed by an atexit hook.
+    """
+
+    def __init__(self, status: str, store: Optional[QueueStore] = None,
+                 batch_size: int = 200, flush_interval: float = 30.0):
+        self.status = status
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._store = store
+        self._buffer: List[dict] = []
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self.written = 0
+        atexit.register(self.flush)
+
+    @property
+    def store(self) -> QueueStore:
+        return self._store or get_store()
+
+    def add(self, job: dict):
+        self.extend([job])
+
+    def extend(self, jobs: Iterable[dict]):
+        with self._lock:
+            self._buffer.extend(jobs)
+            due = (len(self._buffer) >= self.batch_size
+                   or time.monotonic() - self._last_flush >= self.flush_interval)
+        if due:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write everything buffered so far. Returns the number of rows written."""
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+            self._last_flush = time.monotonic()
+            if batch:
+                try:
+                    self.store.add_many(self.status, batch)
+                except Exception:
+                    self._buffer[:0] = batch  # Keep them for the next flush
+                    raise
+                self.written += len(batch)
+        return len(batch)
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+
+# ============================================
+# MODULE-LEVEL HELPERS (drop-in for the old JSON helpers)
+# ============================================
+
+_store: Optional[QueueStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> QueueStore:
+    """Process-wide store, opened on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = QueueStore()
+    return _store
+
+
+def load_queue(name: str) -> list:
+    return get_store().load(name)
+
+
+def save_queue(name: str, data: list):
+    get_store().replace(name, data)
+
+
+def add_job(name: str, job: dict):
+    get_store().add(name, job)
+
+
+def move_job(job: dict, src: str, dst: str, **updates) -> dict:
+    return get_store().move(job, src, dst, **updates)
+
+
+def queue_counts() -> Dict[str, int]:
+    return get_store().counts()
+
+
+_skipped_log: Optional[BufferedQueueWriter] = None
+
+
+def get_skipped_log() -> BufferedQueueWriter:
+    """Process-wide buffered writer for the skipped queue."""
+    global _skipped_log
+    if _skipped_log is None:
+        with _store_lock:
+            if _skipped_log is None:
+                _skipped_log = BufferedQueueWriter('skipped')
+    return _skipped_log
+
+
+def read_skipped(since: Optional[str] = None, reason: Optional[str] = None,
+                 limit: Optional[int] = None) -> List[dict]:
+    """Newest-first skipped jobs for review, optionally filtered by a reason substring."""
+    jobs = get_store().iter_jobs('skipped', since=since, newest_first=True,
+                                 limit=None if reason else limit)
+    if reason:
+        needle = reason.lower()
+        jobs = (j for j in jobs if needle in str(j.get('reason', '')).lower())
+    result = []
+    for job in jobs:
+        result.append(job)
+        if limit and len(result) >= limit:
+            break
+    return result
+
+
+def compact_queue(name: str, max_age_days: Optional[float] = None) -> int:
+    return get_store().compact(name, max_age_days)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Job queue store (SQLite)")
+    parser.add_argument("--import", dest="do_import", action="store_true",
+                        help="Import legacy queue/*.json files (once per file)")
+    parser.add_argument("--force", action="store_true", help="Re-import even if already imported")
+    parser.add_argument("--stats", action="store_true", help="Print job counts per status")
+    parser.add_argument("--export", type=str, metavar="STATUS", help="Print a queue as JSON")
+    parser.add_argument("--skipped", action="store_true", help="List skipped jobs, newest first")
+    parser.add_argument("--reason", type=str, help="With --skipped: only reasons containing this text")
+    parser.add_argument("--since", type=str, help="With --skipped: ISO date/time lower bound")
+    parser.add_argument("--limit", type=int, default=50, help="With --skipped: max rows (0 = all)")
+    parser.add_argument("--compact", type=str, metavar="STATUS",
+                        help="Drop repeated entries in a queue (newest kept)")
+    parser.add_argument("--max-age-days", type=float, help="With --compact: also drop older rows")
+    args = parser.parse_args()
+
+    store = get_store()
+    if args.do_import:
+        result = store.import_json(force=args.force)
+        if result:
+            for name, n in result.items():
+                print(f"Imported {n} jobs into '{name}'")
+        else:
+            print("Nothing to import (already imported or no JSON files)")
+    if args.export:
+        print(store.export_json(args.export))
+    if args.skipped:
+        for job in read_skipped(since=args.since, reason=args.reason, limit=args.limit or None):
+            print(f"  {job.get('skipped_at', '')[:16]}  {str(job.get('score', 0)):>2}  "
+                  f"{str(job.get('company', ''))[:25]:<25} {str(job.get('title', ''))[:40]:<40} "
+                  f"{job.get('reason', '')}")
+    if args.compact:
+        removed = store.compact(args.compact, args.max_age_days)
+        if removed:
+            store.vacuum()
+        print(f"Compacted '{args.compact}': {removed} rows removed")
+    if args.stats or not (args.do_import or args.export or args.skipped or args.compact):
+        for name, n in store.counts().items():
+            print(f"  {name}: {n}")
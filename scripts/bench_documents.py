@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Document benchmark - n8n factory vs the local document engine
+=============================================================
+Generates documents for the same jobs through each backend and reports
+per-document latency (p50 / p95 of job time / 2, since each job yields a
+resume and a cover letter produced in parallel) and throughput in
+documents per minute at the chosen concurrency.
+
+    n8n      POST to N8N_WEBHOOK_URL (LLM + Gotenberg inside n8n)
+    local    document_engine.py in-process; --llm stub makes it run offline,
+             --renderer picks gotenberg / weasyprint
+
+Jobs come from the pending queue (--source pending) or a built-in sample.
+Local PDFs go to a temporary directory unless --output is given; the n8n
+path writes wherever the workflow writes (/output in the container).
+
+Usage:
+    python3 scripts/bench_documents.py --backends local --llm stub --renderer weasyprint
+    python3 scripts/bench_documents.py --backends n8n,local --jobs 6 --concurrency 3
+    python3 scripts/bench_documents.py --save /tmp/docs.json / --compare /tmp/docs.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+SAMPLE_JOBS = [
+    {'title': 'IT Support Specialist', 'company': 'Acme Logistics', 'location': 'Anaheim, CA',
+     'description': 'Tier 1/2 help desk, Active Directory accounts, Windows 11 imaging, ticket queue.'},
+    {'title': 'Systems Administrator', 'company': 'Harbor Marine Group', 'location': 'Long Beach, CA',
+     'description': 'Windows Server, FortiGate firewall rules, Veeam backups, small on-prem environment.'},
+    {'title': 'Desktop Support Technician', 'company': 'Orange County Health', 'location': 'Irvine, CA',
+     'description': 'Workstation support, printers, onboarding, remote tools, documentation of fixes.'},
+]
+
+
+def load_jobs(source: str, count: int) -> list:
+    jobs = []
+    if source == 'pending':
+        from queue_store import get_store
+        jobs = [job for job in get_store().iter_jobs('pending', limit=count)]
+    while len(jobs) < count:
+        jobs.append(dict(SAMPLE_JOBS[len(jobs) % len(SAMPLE_JOBS)]))
+    # Fresh application numbers for every run, never the queue's own
+    return [{k: v for k, v in job.items() if k != 'application_number'} for job in jobs[:count]]
+
+
+async def run_backend(backend: str, jobs: list, concurrency: int, output: Path) -> dict:
+    """Generate for every job with `concurrency` in flight; returns latencies and totals."""
+    import aiohttp
+    from factory_dispatcher import FactoryError, _post_job
+
+    engine = None
+    if backend == 'local':
+        from document_engine import DocumentEngine
+        engine = DocumentEngine(output_dir=output)
+
+    gate = asyncio.Semaphore(concurrency)
+    latencies, stages, errors = [], [], []
+
+    async def one(session, job):
+        async with gate:
+            start = time.monotonic()
+            try:
+                result = await (engine.generate(job) if engine else _post_job(session, job))
+            except FactoryError as e:
+                errors.append(str(e))
+                return
+            latencies.append(time.monotonic() - start)
+            if result.get('stats', {}).get('engine') == 'local':
+                stages.append(result['stats'])
+
+    start = time.monotonic()
+    try:
+        async with aiohttp.ClientSession() as session:
+            await asyncio.gather(*(one(session, job) for job in jobs))
+    finally:
+        if engine:
+            await engine.close()
+    elapsed = time.monotonic() - start
+
+    per_doc = sorted(t / 2 for t in latencies)
+    result = {'jobs': len(jobs), 'ok': len(latencies), 'errors': errors[:3], 'elapsed_s': round(elapsed, 2)}
+    if per_doc:
+        result.update({
+            'doc_p50_s': round(statistics.median(per_doc), 2),
+            'doc_p95_s': round(per_doc[min(len(per_doc) - 1, int(len(per_doc) * 0.95))], 2),
+            'docs_per_min': round(2 * len(latencies) / elapsed * 60, 1) if elapsed else 0.0,
+        })
+    if stages:
+        result['llm_s'] = round(statistics.mean(s['llm_s'] for s in stages), 2)
+        result['render_s'] = round(statistics.mean(s['render_s'] for s in stages), 2)
+    return result
+
+
+def print_report(results: dict, baseline: dict = None):
+    print(f"{'backend':<8} {'ok':>7} {'doc p50':>9} {'doc p95':>9} {'docs/min':>9}"
+          + (f" {'before':>9} {'change':>8}" if baseline else ""))
+    for name, r in results.items():
+        line = f"{name:<8} {r['ok']:>3}/{r['jobs']:<3}"
+        if 'doc_p50_s' in r:
+            line += f" {r['doc_p50_s']:>8.2f}s {r['doc_p95_s']:>8.2f}s {r['docs_per_min']:>9.1f}"
+            before = (baseline or {}).get(name, {})
+            if before.get('docs_per_min'):
+                change = (r['docs_per_min'] - before['docs_per_min']) / before['docs_per_min'] * 100
+                line += f" {before['docs_per_min']:>9.1f} {change:>+7.0f}%"
+        print(line)
+        if 'llm_s' in r:
+            print(f"         stages: writer {r['llm_s']:.2f}s/job, render {r['render_s']:.2f}s/batch")
+        for error in r['errors']:
+            print(f"         error: {error}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-document latency / throughput: n8n vs local engine")
+    parser.add_argument("--backends", default="n8n,local", help="Comma-separated: n8n, local")
+    parser.add_argument("--jobs", type=int, default=3, help="Jobs per backend (2 documents each)")
+    parser.add_argument("--concurrency", type=int, default=2, help="Jobs in flight")
+    parser.add_argument("--source", choices=['sample', 'pending'], default='sample')
+    parser.add_argument("--llm", choices=['gemini', 'stub'], help="Writer for the local engine")
+    parser.add_argument("--renderer", choices=['gotenberg', 'weasyprint'], help="Renderer for the local engine")
+    parser.add_argument("--output", help="Keep local PDFs here (default: a temp dir)")
+    parser.add_argument("--save", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="JSON file from an earlier --save to compare against")
+    args = parser.parse_args()
+
+    # The engine reads these at import
+    if args.llm:
+        os.environ['DOC_ENGINE_LLM'] = args.llm
+    if args.renderer:
+        os.environ['DOC_RENDERER'] = args.renderer
+
+    jobs = load_jobs(args.source, max(1, args.jobs))
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        output = Path(args.output or tmp)
+        for backend in [b.strip() for b in args.backends.split(',') if b.strip()]:
+            print(f"Running {backend} ({len(jobs)} jobs, {args.concurrency} in flight)...")
+            results[backend] = asyncio.run(run_backend(backend, jobs, max(1, args.concurrency), output))
+
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    print_report(results, baseline)
+    if args.save:
+        Path(args.save).write_text(json.dumps(results, indent=2))
+        print(f"\nSaved: {args.save}")
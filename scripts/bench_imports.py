@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark - startup cost of each entry point
+========================================================
+Imports each entry point in a fresh interpreter with `python -X importtime`
+and reports the median cumulative import time (module body included, so
+work done at import - globbing, reading .env, building clients - counts)
+plus the slowest modules it pulled in.
+
+Before/after: save a run on the old commit, then compare on the new one:
+    git checkout <old> && python3 scripts/bench_imports.py --save /tmp/before.json
+    git checkout <new> && python3 scripts/bench_imports.py --compare /tmp/before.json
+
+Usage:
+    python3 scripts/bench_imports.py [--runs 5] [--top 5] [--only scorer]
+"""
+
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# name -> (directory put on sys.path, module)
+ENTRY_POINTS = {
+    'config': ('.', 'config'),
+    'orchestrator': ('.', 'orchestrator'),
+    'scorer': ('agent', 'scorer'),
+    'simple_hunter': ('agent', 'simple_hunter'),
+    'applier': ('bot', 'applier'),
+}
+
+_IMPORT_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(directory: str, module: str) -> dict:
+    """One fresh-interpreter import. Returns total seconds and the cumulative
+    time of each module it imported directly."""
+    # Repo root too, so root modules resolve in any checkout (not just /root/job_bot)
+    code = (f"import sys; sys.path[:0] = [{str(ROOT / directory)!r}, {str(ROOT)!r}]; "
+            f"import {module}")
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          cwd=ROOT / directory, capture_output=True, text=True)
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"
+        return {'error': error}
+    # importtime prints children before their parent, one indent level deeper
+    rows = [(m[4], int(m[2]), len(m[3])) for m in map(_IMPORT_LINE.match, proc.stderr.splitlines()) if m]
+    total, depth = next(((t, d) for name, t, d in rows if name == module), (0, 0))
+    children = {}
+    for name, cumulative, indent in rows:
+        if indent == depth + 2:
+            children[name] = max(children.get(name, 0), cumulative)
+    return {'seconds': total / 1e6, 'modules': children}
+
+
+def bench(names, runs: int, top: int) -> dict:
+    results = {}
+    for name in names:
+        directory, module = ENTRY_POINTS[name]
+        samples = [measure(directory, module) for _ in range(runs)]
+        failed = [s for s in samples if 'error' in s]
+        if failed:
+            results[name] = {'error': failed[0]['error']}
+            continue
+        last = samples[-1]['modules']
+        slowest = sorted(last.items(), key=lambda item: item[1], reverse=True)[:top]
+        results[name] = {
+            'median_s': round(statistics.median(s['seconds'] for s in samples), 4),
+            'min_s': round(min(s['seconds'] for s in samples), 4),
+            'slowest': [(m, round(t / 1e6, 4)) for m, t in slowest],
+        }
+    return results
+
+
+def print_report(results: dict, baseline: dict = None):
+    print(f"{'entry point':<16} {'median':>9} {'min':>9}" + (f" {'before':>9} {'change':>8}" if baseline else ""))
+    for name, result in results.items():
+        if 'error' in result:
+            print(f"{name:<16} import failed: {result['error']}")
+            continue
+        line = f"{name:<16} {result['median_s']:>8.3f}s {result['min_s']:>8.3f}s"
+        before = (baseline or {}).get(name, {})
+        if 'median_s' in before:
+            change = (result['median_s'] - before['median_s']) / before['median_s'] * 100 if before['median_s'] else 0
+            line += f" {before['median_s']:>8.3f}s {change:>+7.0f}%"
+        elif baseline is not None:
+            line += f" {'n/a':>9}"
+        print(line)
+        if result['slowest']:
+            print("   slowest: " + ", ".join(f"{m} {t:.3f}s" for m, t in result['slowest']))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import-time benchmark for the bot's entry points")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per entry point")
+    parser.add_argument("--top", type=int, default=5, help="Slowest top-level imports to list")
+    parser.add_argument("--only", action="append", choices=sorted(ENTRY_POINTS), help="Entry point(s) to time")
+    parser.add_argument("--save", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="JSON file from an earlier --save to compare against")
+    args = parser.parse_args()
+
+    results = bench(args.only or list(ENTRY_POINTS), max(1, args.runs), args.top)
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    print_report(results, baseline)
+    if args.save:
+        Path(args.save).write_text(json.dumps(results, indent=2))
+        print(f"\nSaved: {args.save}")
@@ -8,7 +8,7 @@ Tests Browser-Use Cloud's ability to apply on external ATS sites
 Usage:
     python3 test_external.py --url "https://indeed.com/viewjob?jk=xxx"
     python3 test_external.py --url "https://indeed.com/viewjob?jk=xxx" --resume /path/to/resume.pdf
-    python3 test_external.py --test-all   # Test all external_site jobs from failed.json
+    python3 test_external.py --test-all   # Test all external_site jobs from the failed queue
 """
 
 import asyncio
@@ -28,6 +28,8 @@ from browser_use.browser.session import BrowserSession
 from browser_use_sdk import AsyncBrowserUse
 import aiohttp
 
+from queue_store import load_queue
+
 # ============ CONFIG ============
 QUEUE_DIR = Path("/root/job_bot/queue")
 OUTPUT_DIR = Path("/root/output")
@@ -361,16 +363,14 @@ async def test_external_job(
 
 
 async def test_all_external_jobs(max_jobs: int = 5):
-    """Test all external_site jobs from failed.json"""
+    """Test all external_site jobs from the failed queue"""
 
     # Load failed jobs
-    failed_path = QUEUE_DIR / "failed.json"
-    if not failed_path.exists():
-        print("No failed.json found")
+    failed_jobs = load_queue("failed")
+    if not failed_jobs:
+        print("No failed jobs in queue")
         return
 
-    failed_jobs = json.loads(failed_path.read_text())
-
     # Filter for external_site jobs
     external_jobs = [
         j for j in failed_jobs
@@ -436,7 +436,7 @@ async def main():
     parser = argparse.ArgumentParser(description="External ATS Site Tester")
     parser.add_argument("--url", type=str, help="Single job URL to test")
     parser.add_argument("--resume", type=str, help="Path to resume PDF")
-    parser.add_argument("--test-all", action="store_true", help="Test all external_site jobs from failed.json")
+    parser.add_argument("--test-all", action="store_true", help="Test all external_site jobs from the failed queue")
     parser.add_argument("--max", type=int, default=5, help="Max jobs to test (with --test-all)")
     args = parser.parse_args()
 
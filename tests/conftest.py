@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# Root and agent/ modules import each other flat, as they do from /root/job_bot
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'agent'))
@@ -0,0 +1,32 @@
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from job_triage import BLOCKED_ATS, EASY_APPLY, EXPIRED, EXTERNAL, UNKNOWN, classify
+
+INDEED = 'https://www.indeed.com/viewjob?jk=abc123'
+
+
+@pytest.mark.parametrize("args, verdict", [
+    # Non-Indeed postings are never routed by triage - the browser handles them
+    (('https://www.linkedin.com/jobs/view/3912345678',), UNKNOWN),
+    (('https://boards.greenhouse.io/acme/jobs/42',), UNKNOWN),
+    (('https://jobs.lever.co/acme/42', 200, 'https://jobs.lever.co/acme/42', 'apply on company site'), UNKNOWN),
+    # Blocked ATS wins, on the URL or the redirect target
+    (('https://acme.wd5.myworkdayjobs.com/en-US/jobs/42',), BLOCKED_ATS),
+    ((INDEED, 200, 'https://acme.icims.com/jobs/42', ''), BLOCKED_ATS),
+    # Indeed URLs
+    ((INDEED,), UNKNOWN),
+    ((INDEED, 404), EXPIRED),
+    ((INDEED, 410), EXPIRED),
+    ((INDEED, 503), UNKNOWN),
+    ((INDEED, 200, INDEED, 'Please verify you are human'), UNKNOWN),
+    ((INDEED, 200, INDEED, 'This job has expired on Indeed'), EXPIRED),
+    ((INDEED, 200, 'https://careers.acme.com/jobs/42', ''), EXTERNAL),
+    ((INDEED, 200, INDEED, '<button>Apply on company site</button>'), EXTERNAL),
+    ((INDEED, 200, INDEED, '<div id="indeedApplyButton">Apply on company site</div>'), EASY_APPLY),
+    ((INDEED, 200, INDEED, '<div class="indeed-apply-widget"></div>'), EASY_APPLY),
+    ((INDEED, 200, INDEED, '<p>no buttons here</p>'), UNKNOWN),
+])
+def test_classify_verdicts(args, verdict):
+    assert classify(*args)[0] == verdict
@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from search_scheduler import FULL_SWEEP_HOURS, FULL_WINDOW_HOURS, OVERLAP_HOURS, SearchScheduler
+
+TARGET = ('indeed', 'help desk', 'Anaheim, CA')
+NOW = datetime(2026, 3, 2, 12, 0)
+
+
+@pytest.fixture
+def scheduler(tmp_path):
+    return SearchScheduler(tmp_path / 'queue.db')
+
+
+def test_no_mark_asks_for_full_window(scheduler):
+    assert scheduler.scrape_window(*TARGET, now=NOW) == FULL_WINDOW_HOURS
+
+
+def test_mark_narrows_next_window(scheduler):
+    scheduler.mark_scraped(*TARGET, NOW - timedelta(hours=3), FULL_WINDOW_HOURS, rows=20, results_wanted=50)
+    assert scheduler.scrape_window(*TARGET, now=NOW) == 3 + OVERLAP_HOURS
+
+
+def test_incremental_scrape_keeps_last_full_sweep(scheduler):
+    scheduler.mark_scraped(*TARGET, NOW - timedelta(hours=5), FULL_WINDOW_HOURS, rows=20, results_wanted=50)
+    scheduler.mark_scraped(*TARGET, NOW - timedelta(hours=1), 7, rows=4, results_wanted=50)
+    assert scheduler.scrape_window(*TARGET, now=NOW) == 1 + OVERLAP_HOURS
+    later = NOW - timedelta(hours=5) + timedelta(hours=FULL_SWEEP_HOURS)
+    assert scheduler.scrape_window(*TARGET, now=later) == FULL_WINDOW_HOURS
+
+
+def test_capped_scrape_leaves_mark(scheduler):
+    scheduler.mark_scraped(*TARGET, NOW - timedelta(hours=6), FULL_WINDOW_HOURS, rows=20, results_wanted=50)
+    # Hit results_wanted: postings older than the cut-off may be missing
+    scheduler.mark_scraped(*TARGET, NOW - timedelta(hours=1), 8, rows=50, results_wanted=50)
+    assert scheduler.scrape_window(*TARGET, now=NOW) == 6 + OVERLAP_HOURS
+
+
+def test_capped_first_scrape_sets_no_mark(scheduler):
+    scheduler.mark_scraped(*TARGET, NOW - timedelta(hours=1), FULL_WINDOW_HOURS, rows=50, results_wanted=50)
+    assert scheduler.scrape_window(*TARGET, now=NOW) == FULL_WINDOW_HOURS
+    report = scheduler.scrape_report()
+    assert report['full'] == 1 and report['rows'] == 50